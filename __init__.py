@@ -18,21 +18,65 @@ import bpy
 
 # Import modules
 from . import data
+from . import rig_profiles
+from . import registry
+from . import system_collections
+from . import modifier_stack
+from . import bbone_muscles
+from . import pins
 from . import panel
 from . import system
+from . import activation
+from . import adaptive_smooth
+from . import dynamics_sleep
+from . import node_muscles
+from . import collision
+from . import scrub_cache
+from . import driver_bake
+from . import sparse_keys
+from . import jiggle_cache
+from . import crowd
 from . import arp_integration
+from . import background_build
+from . import rig_transfer
+from . import benchmark
+from . import memory_report
+from . import corrective_export
+from . import micro_controllers
 
 
 def register():
     data.register()
+    rig_profiles.register()
+    registry.register()
+    system_collections.register()
+    modifier_stack.register()
+    bbone_muscles.register()
+    pins.register()
     system.register()
+    activation.register()
+    adaptive_smooth.register()
+    dynamics_sleep.register()
+    node_muscles.register()
+    collision.register()
+    scrub_cache.register()
+    driver_bake.register()
+    sparse_keys.register()
+    jiggle_cache.register()
+    crowd.register()
     panel.register()
     arp_integration.register()
+    background_build.register()
+    rig_transfer.register()
+    benchmark.register()
+    memory_report.register()
+    corrective_export.register()
+    micro_controllers.register()
 
     print("\n" + "═" * 70)
     print(" BLENDARMORY MUSCLES 3.3 — SUCCESSFULLY LOADED")
     print(" • Full XMuscle vertex data (real shapes)")
-    print(" • Auto-Rig Pro auto-detection & bone mapping")
+    print(" • Auto-Rig Pro / Rigify / Mixamo rig profiles & bone mapping")
     print(" • Bendy bones + volume preservation")
     print(" • Pinning system + micro controllers")
     print(" • Skin shrinkwrap + corrective smooth")
@@ -43,9 +87,31 @@ def register():
 
 
 def unregister():
+    micro_controllers.unregister()
+    corrective_export.unregister()
+    memory_report.unregister()
+    benchmark.unregister()
+    rig_transfer.unregister()
+    background_build.unregister()
     arp_integration.unregister()
     panel.unregister()
+    crowd.unregister()
+    jiggle_cache.unregister()
+    sparse_keys.unregister()
+    driver_bake.unregister()
+    scrub_cache.unregister()
+    collision.unregister()
+    node_muscles.unregister()
+    dynamics_sleep.unregister()
+    adaptive_smooth.unregister()
+    activation.unregister()
     system.unregister()
+    pins.unregister()
+    bbone_muscles.unregister()
+    modifier_stack.unregister()
+    system_collections.unregister()
+    registry.unregister()
+    rig_profiles.unregister()
     data.unregister()
 
 
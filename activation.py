@@ -0,0 +1,163 @@
+# activation.py — Pose-Space Activation Curves
+# BlendArmory Muscles 3.3 — One curve per preset, sampled into every driver
+
+import bpy
+import numpy as np
+from math import pi
+from bpy.app.handlers import persistent
+from .registry import all_muscles
+
+# ===================================================================
+# SETTINGS
+# Profiles are Float Curve nodes in one shared node group, named after the
+# preset that uses them. A curve maps joint angle (0..1 of 180 degrees) to
+# bulge (0..1 of the old max(a,0) response at 180 degrees); the identity
+# line reproduces that response exactly. It is sampled into a lookup table
+# (resampled whenever the curve's points change) and written into each
+# bulge driver's expression as a clamped sum of ramps, which the simple
+# expression evaluator runs without Python. Terms added after it, like the
+# micro controller scale, stay linear and unclamped.
+# ===================================================================
+CURVES_NAME = "BlendArmory Activation Curves"
+LUT_SIZE = 17
+ACTIVATION_RANGE = pi    # radians of ROTATION_DIFF mapped onto the curve's 0..1
+
+_LUT = {}                # profile name -> (curve signature, angles, bulges)
+
+# ===================================================================
+# CURVES
+# ===================================================================
+def curve_group(create=True):
+    ng = bpy.data.node_groups.get(CURVES_NAME)
+    if ng is None and create:
+        ng = bpy.data.node_groups.new(CURVES_NAME, 'ShaderNodeTree')
+        ng.use_fake_user = True
+    return ng
+
+def activation_curve(profile, create=True):
+    """Float Curve node of profile; new profiles start as the identity line"""
+    ng = curve_group(create)
+    node = ng.nodes.get(profile) if ng else None
+    if node is None and create:
+        node = ng.nodes.new("ShaderNodeFloatCurve")
+        node.name = node.label = profile
+        node.location = (0, -300 * (len(ng.nodes) - 1))
+    return node
+
+def _signature(mapping):
+    points = tuple((tuple(p.location), p.handle_type) for p in mapping.curves[0].points)
+    return points, mapping.extend, mapping.use_clip, tuple(mapping.clip_min_x_y), tuple(mapping.clip_max_x_y)
+
+def activation_lut(profile):
+    """(angles, bulges) sampled from profile's curve, resampled after edits"""
+    mapping = activation_curve(profile).mapping
+    signature = _signature(mapping)
+    lut = _LUT.get(profile)
+    if lut is None or lut[0] != signature:
+        mapping.initialize()
+        x = np.linspace(0.0, 1.0, LUT_SIZE, dtype=np.float32)
+        y = np.array([mapping.evaluate(mapping.curves[0], float(v)) for v in x], dtype=np.float32)
+        lut = _LUT[profile] = (signature, x * ACTIVATION_RANGE, y * ACTIVATION_RANGE)
+    return lut[1], lut[2]
+
+def activation_expression(profile, angle):
+    """profile applied to the angle expression, as a clamped sum of ramps"""
+    x, y = (v.astype(np.float64) for v in activation_lut(profile))
+    slopes = np.diff(y) / np.maximum(np.diff(x), 1e-9)
+    t = f"min(max({angle},{x[0]:.5f}),{x[-1]:.5f})"
+    terms = [f"{y[0]:.5f}", f"{slopes[0]:.5f}*({t}-{x[0]:.5f})"]
+    for k in range(1, len(slopes)):
+        bend = slopes[k] - slopes[k - 1]
+        if abs(bend) > 1e-5:
+            terms.append(f"{bend:.5f}*max({t}-{x[k]:.5f},0)")
+    return "(" + "+".join(terms).replace("+-", "-") + ")"
+
+def bulge_expression(muscle, drv):
+    """Bulge driver expression for the muscle type, plus micro controller scale.
+
+    The oriented angle goes through the activation curve (or max(angle,0));
+    the micro term is added after it, so it stays linear and can shrink.
+    """
+    angle = "-a" if muscle.Muscle_Type_INT else "a"
+    if muscle.Muscle_Activation:
+        expr = activation_expression(muscle.Muscle_Activation, angle)
+    else:
+        expr = f"max({angle},0)"
+    if "c" in drv.variables:
+        expr += "+c-1"
+    return expr
+
+def invalidate_luts():
+    _LUT.clear()
+
+@persistent
+def activation_load_post(dummy):
+    invalidate_luts()
+
+# ===================================================================
+# DRIVERS
+# ===================================================================
+def activation_fcurves(muscle):
+    """Driver F-curves carrying the muscle's bulge response"""
+    fcurves = []
+    key = muscle.data.shape_keys if muscle.type == 'MESH' else None
+    if key and key.animation_data:
+        fc = key.animation_data.drivers.find('key_blocks["Bulge"].value')
+        if fc:
+            fcurves.append(fc)
+    # Node-deformer muscles drive the Bulge input on the object instead
+    for fc in muscle.animation_data.drivers if muscle.animation_data else []:
+        var = fc.driver.variables.get("a")
+        if var and var.type == 'ROTATION_DIFF':
+            fcurves.append(fc)
+    return fcurves
+
+def write_activation(fc, muscle):
+    """Rewrite fc's expression with muscle's current curve. Keyframes from
+    files that mapped the curve on the F-curve are dropped."""
+    if len(fc.keyframe_points):
+        fc.keyframe_points.clear()
+        fc.update()
+    fc.driver.expression = bulge_expression(muscle, fc.driver)
+
+def refresh_activation(muscles):
+    """Resample every curve and rewrite the muscles using them"""
+    invalidate_luts()
+    count = 0
+    for muscle in muscles:
+        if muscle.Muscle_Activation:
+            for fc in activation_fcurves(muscle):
+                write_activation(fc, muscle)
+                count += 1
+    return count
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_activation_refresh(bpy.types.Operator):
+    """Resample edited activation curves into every muscle that uses them"""
+    bl_idname = "muscle.activation_refresh"
+    bl_label = "Apply Activation Curves"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        count = refresh_activation(all_muscles(context.scene))
+        self.report({'INFO'}, f"Updated {count} bulge drivers")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_activation_refresh,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.app.handlers.load_post.append(activation_load_post)
+
+def unregister():
+    if activation_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(activation_load_post)
+    invalidate_luts()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,123 @@
+# adaptive_smooth.py — Adaptive Corrective Smooth
+# BlendArmory Muscles 3.3 — Idle muscles smooth (almost) for free
+
+import bpy
+from .system import mirrored, hook_bones
+from .geometry import world_matrix
+from .registry import all_muscles
+from .sparse_keys import key_value_target
+
+# ===================================================================
+# SETTINGS
+# ===================================================================
+STRETCH_GAIN = 4.0       # 25% stretch/squash counts as full activity
+BASE_FACTOR = 0.5        # Corrective Smooth default factor at full activity
+DRIVEN = ("iterations", "factor")
+
+def corrective_of(muscle):
+    return next((m for m in muscle.modifiers if m.type == 'CORRECTIVE_SMOOTH'), None)
+
+# ===================================================================
+# DRIVERS
+# ===================================================================
+def activity_expression(rest_length):
+    """0 at rest, 1 at full bulge or STRETCH_GAIN-scaled stretch"""
+    return f"min(max(b,abs(d/{rest_length:.6f}-1)*{STRETCH_GAIN}),1)"
+
+def install_adaptive_smooth(muscle):
+    """Drive Corrective Smooth iterations/factor from bulge value and hook stretch"""
+    mod = corrective_of(muscle)
+    arm, b1, b2 = hook_bones(muscle)
+    bulge = key_value_target(muscle, "Bulge")    # a shape key, or its packed stand-in
+    if mod is None or arm is None or bulge is None:
+        return False
+
+    aw = world_matrix(arm)
+    rest_length = max((aw @ arm.data.bones[b1].head_local - aw @ arm.data.bones[b2].head_local).length, 1e-6)
+    activity = activity_expression(rest_length)
+    expressions = {
+        "iterations": f"{muscle.Smooth_Max_Iterations}*{activity}",
+        "factor": f"{BASE_FACTOR}*{activity}",
+    }
+    for prop in DRIVEN:
+        fc = mod.driver_add(prop)
+        drv = fc.driver
+        drv.type = 'SCRIPTED'
+        while drv.variables:
+            drv.variables.remove(drv.variables[0])
+        b = drv.variables.new()
+        b.name = "b"
+        b.type = 'SINGLE_PROP'
+        b.targets[0].id_type, b.targets[0].id, b.targets[0].data_path = bulge
+        d = drv.variables.new()
+        d.name = "d"
+        d.type = 'LOC_DIFF'
+        d.targets[0].id = arm
+        d.targets[0].bone_target = b1
+        d.targets[1].id = arm
+        d.targets[1].bone_target = b2
+        drv.expression = expressions[prop]
+    return True
+
+def remove_adaptive_smooth(muscle):
+    mod = corrective_of(muscle)
+    if mod is None:
+        return
+    for prop in DRIVEN:
+        mod.driver_remove(prop)
+    mod.iterations = muscle.Smooth_Max_Iterations
+    mod.factor = BASE_FACTOR
+
+# ===================================================================
+# CALLBACKS
+# ===================================================================
+def update_smooth_adaptive(self, context):
+    if self.Smooth_Adaptive:
+        install_adaptive_smooth(self)
+    else:
+        remove_adaptive_smooth(self)
+
+def update_smooth_max_iterations(self, context):
+    update_smooth_adaptive(self, context)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_adaptive_smooth(bpy.types.Operator):
+    """Switch adaptive smoothing on or off for every muscle in the scene"""
+    bl_idname = "muscle.adaptive_smooth"
+    bl_label = "Adaptive Smoothing"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    enable: bpy.props.BoolProperty(name="Enable", default=True)
+
+    def execute(self, context):
+        muscles = all_muscles(context.scene)
+        for muscle in muscles:
+            muscle.Smooth_Adaptive = self.enable
+        state = "on" if self.enable else "off"
+        self.report({'INFO'}, f"Adaptive smoothing {state} for {len(muscles)} muscles")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_adaptive_smooth,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Object.Smooth_Adaptive = bpy.props.BoolProperty(
+        name="Adaptive Smoothing", default=False,
+        description="Scale Corrective Smooth with bulge and stretch so idle muscles cost almost nothing",
+        update=mirrored("Smooth_Adaptive", update_smooth_adaptive))
+    bpy.types.Object.Smooth_Max_Iterations = bpy.props.IntProperty(
+        name="Max Iterations", default=10, min=1, max=50,
+        update=mirrored("Smooth_Max_Iterations", update_smooth_max_iterations))
+
+def unregister():
+    for prop in ("Smooth_Adaptive", "Smooth_Max_Iterations"):
+        if hasattr(bpy.types.Object, prop):
+            delattr(bpy.types.Object, prop)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
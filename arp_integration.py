@@ -2,45 +2,101 @@
 # BlendArmory Muscles 3.3 — Works perfectly with Auto-Rig Pro
 
 import bpy
+import time
 from .data import PRESETS
+from .rig_profiles import RIG_PROFILES, expand_bone_map, detect_profile, resolve_bone_pairs
+from .system import build_muscle, mirror_muscle, MUSCLE_BUILDERS
+from .bbone_muscles import build_bbone_muscles
+from .registry import muscles_of
 
 # ===================================================================
 # FULL AUTO-RIG PRO BONE MAP (Left + Right + Common Muscles)
+# Expanded from the one-sided ARP profile in rig_profiles.py
 # ===================================================================
-ARP_BONE_MAP = {
-    "Biceps_L":      ("c_upperarm_l", "c_forearm_l"),
-    "Biceps_R":      ("c_upperarm_r", "c_forearm_r"),
-    "Triceps_L":     ("c_upperarm_l", "c_forearm_l"),
-    "Triceps_R":     ("c_upperarm_r", "c_forearm_r"),
-    "Deltoid_L":     ("c_shoulder_l", "c_upperarm_l"),
-    "Deltoid_R":     ("c_shoulder_r", "c_upperarm_r"),
-    "Pectoral_L":    ("c_chest", "c_shoulder_l"),
-    "Pectoral_R":    ("c_chest", "c_shoulder_r"),
-    "Quad_L":        ("c_thigh_l", "c_shin_l"),
-    "Quad_R":        ("c_thigh_r", "c_shin_r"),
-    "Hamstring_L":   ("c_thigh_l", "c_shin_l"),
-    "Hamstring_R":   ("c_thigh_r", "c_shin_r"),
-    "Calf_L":        ("c_shin_l", "c_foot_l"),
-    "Calf_R":        ("c_shin_r", "c_foot_r"),
-    "Lat_L":         ("c_spine_02", "c_shoulder_l"),
-    "Lat_R":         ("c_spine_02", "c_shoulder_r"),
-}
+ARP_BONE_MAP = expand_bone_map("ARP")
 
 def is_arp_rig(armature):
-    """Detect Auto-Rig Pro rigs by bone naming convention or data marker"""
-    if not armature or armature.type != 'ARMATURE':
-        return False
-    # ARP adds this custom property
-    if armature.data.get("arp_rig_type") or armature.data.get("auto_rig"):
-        return True
-    # Fallback: bone naming (c_ prefix is ARP standard)
-    return any(bone.name.startswith("c_") for bone in armature.data.bones)
+    """Detect Auto-Rig Pro rigs by data marker or the cached bone index"""
+    return detect_profile(armature) == "ARP"
+
+def muscle_preset(muscle_key):
+    """Map a bone-map key such as Biceps_L to its preset (Biceps if unknown)"""
+    base = muscle_key.rsplit("_", 1)[0] if muscle_key[-2:] in ("_L", "_R") else muscle_key
+    return base if base in PRESETS else "Biceps"
+
+def pending_muscles(context, arm, muscles, profile, report):
+    """[(key, (origin bone, insertion bone))] still to build on arm.
+
+    Keys whose bones are missing or that already exist are recorded in
+    report["missing"] / report["skipped"] instead.
+    """
+    wanted = set(muscles) if muscles is not None else None
+    pairs = resolve_bone_pairs(arm, wanted, profile)
+    bone_map = expand_bone_map(profile)
+    existing = {m.get("Muscle_Key") for m in muscles_of(context.scene, arm)}
+    existing.update(bone.get("Muscle_Key") for bone in arm.data.bones)
+
+    jobs = []
+    for key, names in pairs.items():
+        if names is None:
+            report["missing"][key] = bone_map[key]
+        elif key in existing:
+            report["skipped"].append(key)
+        else:
+            jobs.append((key, names))
+    return jobs
+
+def auto_muscle_rig(context, arm, muscles=None, profile=None, mirror=False, mode='MESH'):
+    """Create every mapped muscle on arm in one pass, no selection used.
+
+    All bone pairs are validated before anything is built. With mirror, a
+    right-side muscle whose left twin is built in the same run is reflected
+    from it instead of being generated again. mode='BBONE' builds bendy-bone
+    muscles in a single edit-mode pass instead of meshes; other modes use
+    their registered builder. Returns a report:
+    {"created": [...], "skipped": [...], "missing": {muscle: (b1, b2)}, "time": seconds}
+    """
+    start = time.perf_counter()
+    profile = profile or detect_profile(arm)
+    report = {"created": [], "skipped": [], "missing": {}, "time": 0.0}
+    if profile is None:
+        report["time"] = time.perf_counter() - start
+        return report
+
+    jobs = pending_muscles(context, arm, muscles, profile, report)
+
+    if mode == 'BBONE':
+        build_bbone_muscles(context, arm, [(key, n1, n2, muscle_preset(key)) for key, (n1, n2) in jobs])
+        report["created"] = [key for key, _ in jobs]
+        report["time"] = time.perf_counter() - start
+        return report
+
+    pose_bones = arm.pose.bones
+    builder = MUSCLE_BUILDERS.get(mode, build_muscle)
+    mirror = mirror and builder is build_muscle
+    built = {}
+    job_pairs = dict(jobs)
+    for key, (n1, n2) in jobs:
+        left = key[:-2] + "_L" if key.endswith("_R") else None
+        if mirror and left in built:
+            src_names = job_pairs[left]
+            muscle = mirror_muscle(context, built[left], dict(zip(src_names, (n1, n2))),
+                                   name=f"Muscle_{key}")
+        else:
+            muscle = builder(context, arm, pose_bones[n1], pose_bones[n2],
+                             muscle_preset(key), name=f"Muscle_{key}")
+        muscle["Muscle_Key"] = key
+        built[key] = muscle
+        report["created"].append(key)
+
+    report["time"] = time.perf_counter() - start
+    return report
 
 class MUSCLE_OT_arp_auto(bpy.types.Operator):
     """One-Click Muscle Creation on Auto-Rig Pro Rigs"""
     bl_idname = "muscle.arp_auto"
     bl_label = "Auto-Attach to Auto-Rig Pro"
-    bl_description = "Detects ARP rig and attaches selected muscle to correct bones"
+    bl_description = "Detects the rig profile (ARP, Rigify, Mixamo...) and attaches the muscle to the correct bones"
     bl_options = {'REGISTER', 'UNDO'}
 
     preset: bpy.props.EnumProperty(
@@ -55,23 +111,20 @@ class MUSCLE_OT_arp_auto(bpy.types.Operator):
             self.report({'ERROR'}, "Please select an armature")
             return {'CANCELLED'}
 
-        if not is_arp_rig(arm):
-            self.report({'WARNING'}, "Not an Auto-Rig Pro rig — using manual mode")
+        profile = detect_profile(arm, context.scene.Rig_Profile)
+        if profile is None:
+            self.report({'WARNING'}, "Unknown rig type — using manual mode")
             # Fall back to regular creation
-            bpy.ops.muscle.create(preset=self.preset.split("_")[0])
+            bpy.ops.muscle.create(preset=muscle_preset(self.preset))
             return {'FINISHED'}
 
-        bone_names = ARP_BONE_MAP.get(self.preset)
+        bone_names = resolve_bone_pairs(arm, {self.preset}, profile).get(self.preset)
         if not bone_names:
-            self.report({'ERROR'}, "No bone mapping for this preset")
+            self.report({'ERROR'}, f"Bones for {self.preset} not found on {RIG_PROFILES[profile]['label']} rig")
             return {'CANCELLED'}
 
-        b1 = arm.pose.bones.get(bone_names[0])
-        b2 = arm.pose.bones.get(bone_names[1])
-
-        if not b1 or not b2:
-            self.report({'ERROR'}, f"Bones not found: {bone_names}")
-            return {'CANCELLED'}
+        b1 = arm.pose.bones[bone_names[0]]
+        b2 = arm.pose.bones[bone_names[1]]
 
         # Deselect all, select correct bones
         bpy.ops.pose.select_all(action='DESELECT')
@@ -80,18 +133,65 @@ class MUSCLE_OT_arp_auto(bpy.types.Operator):
         arm.data.bones.active = b2.bone
 
         # Create the muscle
-        bpy.ops.muscle.create(preset=self.preset.split("_")[0])
+        bpy.ops.muscle.create(preset=muscle_preset(self.preset))
 
-        self.report({'INFO'}, f"{self.preset} attached to Auto-Rig Pro rig!")
+        self.report({'INFO'}, f"{self.preset} attached to {RIG_PROFILES[profile]['label']} rig!")
         return {'FINISHED'}
 
     def invoke(self, context, event):
         return context.window_manager.invoke_props_dialog(self, width=300)
 
+class MUSCLE_OT_arp_auto_all(bpy.types.Operator):
+    """Auto-muscle the entire rig in one undoable step"""
+    bl_idname = "muscle.arp_auto_all"
+    bl_label = "Auto-Muscle Entire Rig"
+    bl_description = "Create every mapped muscle (or the chosen subset) on the active rig at once"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    muscles: bpy.props.EnumProperty(
+        name="Muscles",
+        items=[(k, k.replace("_", " "), "") for k in ARP_BONE_MAP.keys()],
+        default=set(ARP_BONE_MAP.keys()),
+        options={'ENUM_FLAG'}
+    )
+
+    def execute(self, context):
+        arm = context.active_object
+        if not arm or arm.type != 'ARMATURE':
+            self.report({'ERROR'}, "Please select an armature")
+            return {'CANCELLED'}
+
+        profile = detect_profile(arm, context.scene.Rig_Profile)
+        if profile is None:
+            self.report({'ERROR'}, "Unknown rig type — set a Rig Profile")
+            return {'CANCELLED'}
+        if not self.muscles:
+            self.report({'WARNING'}, "No muscles selected")
+            return {'CANCELLED'}
+
+        scn = context.scene
+        report = auto_muscle_rig(context, arm, self.muscles, profile, scn.Muscle_Mirror_Mode, scn.Muscle_Mode)
+
+        print(f"\nBlendArmory: Auto-Muscle on '{arm.name}' ({RIG_PROFILES[profile]['label']})")
+        for key in report["created"]:
+            print(f"  {key:<14} created")
+        for key in report["skipped"]:
+            print(f"  {key:<14} skipped (already exists)")
+        for key, names in report["missing"].items():
+            print(f"  {key:<14} missing bones {names}")
+        print(f"  Total: {report['time']:.3f}s")
+
+        self.report({'INFO'}, f"Created {len(report['created'])}, skipped {len(report['skipped'])}, "
+                              f"missing {len(report['missing'])} in {report['time']:.2f}s")
+        return {'FINISHED'} if report["created"] else {'CANCELLED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=400)
+
 # ===================================================================
 # REGISTER
 # ===================================================================
-classes = (MUSCLE_OT_arp_auto,)
+classes = (MUSCLE_OT_arp_auto, MUSCLE_OT_arp_auto_all)
 
 def register():
     for cls in classes:
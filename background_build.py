@@ -0,0 +1,176 @@
+# background_build.py — Threaded Muscle Generation
+# BlendArmory Muscles 3.3 — Geometry off the UI thread, bpy in short ticks
+
+import bpy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .rig_profiles import RIG_PROFILES, detect_profile
+from .system import plan_muscle, commit_muscle, mirror_muscle
+from .arp_integration import ARP_BONE_MAP, muscle_preset, pending_muscles
+
+# ===================================================================
+# SETTINGS
+# Planning (plan_muscle) is small NumPy work that mostly holds the GIL,
+# so extra worker threads barely shorten the build (Benchmark Build
+# measures it). The win is responsiveness: geometry is planned while the
+# UI is idle and committed in COMMIT_BUDGET slices.
+# ===================================================================
+TIMER_STEP = 0.05        # seconds between modal ticks
+COMMIT_BUDGET = 0.03     # seconds of bpy writes per tick, keeps the UI live
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_arp_auto_background(bpy.types.Operator):
+    """Auto-muscle the rig without blocking the UI (geometry planned on a worker thread); Esc cancels"""
+    bl_idname = "muscle.arp_auto_background"
+    bl_label = "Auto-Muscle Rig (Background)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    muscles: bpy.props.EnumProperty(
+        name="Muscles",
+        items=[(k, k.replace("_", " "), "") for k in ARP_BONE_MAP.keys()],
+        default=set(ARP_BONE_MAP.keys()),
+        options={'ENUM_FLAG'}
+    )
+    threads: bpy.props.IntProperty(name="Threads", default=1, min=0, max=64,
+                                   description="Worker threads (0 = one per CPU core); planning holds the GIL, "
+                                               "so more than one rarely helps")
+
+    _timer = None
+    _pool = None
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=400)
+
+    def execute(self, context):
+        arm = context.active_object
+        if not arm or arm.type != 'ARMATURE':
+            self.report({'ERROR'}, "Please select an armature")
+            return {'CANCELLED'}
+        if context.scene.Muscle_Mode != 'MESH':
+            self.report({'ERROR'}, "Background generation builds Mesh mode muscles; use Auto-Muscle Entire Rig")
+            return {'CANCELLED'}
+        profile = detect_profile(arm, context.scene.Rig_Profile)
+        if profile is None:
+            self.report({'ERROR'}, "Unknown rig type — set a Rig Profile")
+            return {'CANCELLED'}
+        if not self.muscles:
+            self.report({'WARNING'}, "No muscles selected")
+            return {'CANCELLED'}
+
+        self._arm = arm
+        self._profile = profile
+        self._start = time.perf_counter()
+        self._report = {"created": [], "skipped": [], "missing": {}, "failed": {}}
+        jobs = pending_muscles(context, arm, self.muscles, profile, self._report)
+        if not jobs:
+            self.report({'INFO'}, "Nothing to build")
+            return {'CANCELLED'}
+
+        # Pose reads stay here; workers only ever see floats and preset names
+        self._pool = ThreadPoolExecutor(max_workers=self.threads or os.cpu_count())
+        mirror = context.scene.Muscle_Mirror_Mode
+        keys = {key for key, _ in jobs}
+        mw = arm.matrix_world
+        self._queue = []
+        for key, (n1, n2) in jobs:
+            left = key[:-2] + "_L" if key.endswith("_R") else None
+            preset = muscle_preset(key)
+            if mirror and left in keys:
+                future = None   # reflected from its left twin at commit time
+            else:
+                length = ((mw @ arm.pose.bones[n2].head) - (mw @ arm.pose.bones[n1].head)).length
+                future = self._pool.submit(plan_muscle, preset, length)
+            self._queue.append((key, n1, n2, preset, future))
+        self._total = len(self._queue)
+        self._built = {}
+        self._names = dict(jobs)
+
+        wm = context.window_manager
+        wm.progress_begin(0, self._total)
+        self._timer = wm.event_timer_add(TIMER_STEP, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self._finish(context, cancelled=True)
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        tick = time.perf_counter()
+        while self._queue and time.perf_counter() - tick < COMMIT_BUDGET:
+            key, n1, n2, preset, future = self._queue[0]
+            if future is not None and not future.done():
+                break
+            self._queue.pop(0)
+            self._commit(context, key, n1, n2, preset, future)
+
+        done = self._total - len(self._queue)
+        context.window_manager.progress_update(done)
+        context.workspace.status_text_set(f"Building muscles {done}/{self._total} — Esc to cancel")
+        if not self._queue:
+            return self._finish(context)
+        return {'PASS_THROUGH'}
+
+    def _commit(self, context, key, n1, n2, preset, future):
+        arm = self._arm
+        name = f"Muscle_{key}"
+        try:
+            if future is None:
+                left = key[:-2] + "_L"
+                if left not in self._built:
+                    raise RuntimeError(f"left twin {left} was not built")
+                muscle = mirror_muscle(context, self._built[left],
+                                       dict(zip(self._names[left], (n1, n2))), name=name)
+            else:
+                muscle = commit_muscle(context, arm, arm.pose.bones[n1], arm.pose.bones[n2],
+                                       preset, future.result(), name)
+        except Exception as e:
+            self._report["failed"][key] = str(e)
+            return
+        muscle["Muscle_Key"] = key
+        self._built[key] = muscle
+        self._report["created"].append(key)
+
+    def _finish(self, context, cancelled=False):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+        r = self._report
+        elapsed = time.perf_counter() - self._start
+        label = RIG_PROFILES[self._profile]['label']
+        print(f"\nBlendArmory: Background Auto-Muscle on '{self._arm.name}' ({label})")
+        for key in r["created"]:
+            print(f"  {key:<14} created")
+        for key in r["skipped"]:
+            print(f"  {key:<14} skipped (already exists)")
+        for key, names in r["missing"].items():
+            print(f"  {key:<14} missing bones {names}")
+        for key, error in r["failed"].items():
+            print(f"  {key:<14} failed: {error}")
+        print(f"  Total: {elapsed:.3f}s{' (cancelled)' if cancelled else ''}")
+
+        verb = "Cancelled after" if cancelled else "Created"
+        self.report({'WARNING'} if cancelled or r["failed"] else {'INFO'},
+                    f"{verb} {len(r['created'])} of {self._total} muscles in {elapsed:.2f}s")
+        # Anything already committed stays and gets its undo step
+        return {'FINISHED'} if r["created"] else {'CANCELLED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_arp_auto_background,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
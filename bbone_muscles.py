@@ -0,0 +1,171 @@
+# bbone_muscles.py — Bendy-Bone Muscles (lightweight mode for crowds)
+# BlendArmory Muscles 3.3 — Muscle motion at plain armature-deform cost
+
+import bpy
+import numpy as np
+from .data import PRESETS
+from .geometry import mesh_coords, write_group_weights
+
+# ===================================================================
+# SETTINGS
+# ===================================================================
+BBONE_SEGMENTS = 8
+BBONE_OFFSET = 0.08      # Belly offset from the joint line, fraction of length
+WEIGHT_LEVELS = 20       # Quantized weight steps -> one vertex_groups.add per step
+
+def is_bbone_muscle(bone):
+    return bool(bone.get("Muscle_XID"))
+
+# ===================================================================
+# BUILD (one edit-mode round trip for any number of muscles)
+# ===================================================================
+def build_bbone_muscles(context, arm, jobs):
+    """Add a deforming bendy bone per job and drive its ease/scale bulge.
+
+    jobs: [(key, origin_bone, insertion_bone, preset), ...]
+    Returns the list of created bone names.
+    """
+    if not jobs:
+        return []
+    prev_active = context.view_layer.objects.active
+    prev_mode = arm.mode
+    context.view_layer.objects.active = arm
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    ebones = arm.data.edit_bones
+    created = []
+    for key, n1, n2, preset in jobs:
+        pr = PRESETS[preset]
+        e1, e2 = ebones[n1], ebones[n2]
+        side = -1.0 if pr["type"] == "EXTENSOR" else 1.0
+        offset = e1.z_axis * (e2.head - e1.head).length * BBONE_OFFSET * side
+        eb = ebones.new(f"MSL_{key}")
+        eb.head = e1.head + offset
+        eb.tail = e2.head + offset
+        eb.roll = e1.roll
+        eb.parent = e1
+        eb.use_connect = False
+        eb.use_deform = True
+        eb.bbone_segments = BBONE_SEGMENTS
+        created.append((eb.name, key, n1, n2, pr))
+
+    bpy.ops.object.mode_set(mode='POSE')
+
+    names = []
+    for name, key, n1, n2, pr in created:
+        bone = arm.data.bones[name]
+        bone["Muscle_XID"] = True
+        bone["Muscle_Key"] = key
+        pb = arm.pose.bones[name]
+
+        stretch = pb.constraints.new('STRETCH_TO')
+        stretch.target = arm
+        stretch.subtarget = n2
+        stretch.volume = 'VOLUME_XZX'
+
+        sign = "-a" if pr["type"] == "EXTENSOR" else "a"
+        _drive(pb, "bbone_easein", -1, arm, n1, n2, f"{pr['bulge']}*max({sign},0)")
+        _drive(pb, "bbone_easeout", -1, arm, n1, n2, f"{pr['bulge']}*max({sign},0)")
+        for prop in ("bbone_scalein", "bbone_scaleout"):
+            for axis in (0, 2):
+                _drive(pb, prop, axis, arm, n1, n2, f"1+{pr['bulge']}*max({sign},0)")
+        names.append(name)
+
+    bpy.ops.object.mode_set(mode=prev_mode)
+    context.view_layer.objects.active = prev_active
+    return names
+
+def _drive(pb, prop, index, arm, n1, n2, expression):
+    drv = pb.driver_add(prop, index).driver
+    drv.type = 'SCRIPTED'
+    var = drv.variables.new()
+    var.name = "a"
+    var.type = 'ROTATION_DIFF'
+    var.targets[0].id = arm
+    var.targets[0].bone_target = n1
+    var.targets[1].id = arm
+    var.targets[1].bone_target = n2
+    drv.expression = expression
+
+# ===================================================================
+# WEIGHT BAKE (skin picks up the muscle bones through its Armature mod)
+# ===================================================================
+def bake_bbone_weights(skin, arm, bone_names=None, radius=0.3):
+    """Write a falloff vertex group per bendy-bone muscle onto skin.
+
+    The Armature modifier normalizes by total weight, so the muscle groups
+    blend with the existing skin weights without rewriting them.
+    radius is relative to each muscle bone's length. Returns {bone: verts}.
+    """
+    if bone_names is None:
+        bone_names = [b.name for b in arm.data.bones if is_bbone_muscle(b)]
+
+    co = mesh_coords(skin.data)
+    to_arm = np.array(arm.matrix_world.inverted() @ skin.matrix_world, dtype=np.float32)
+    co = co @ to_arm[:3, :3].T + to_arm[:3, 3]
+
+    result = {}
+    for name in bone_names:
+        bone = arm.data.bones[name]
+        head = np.array(bone.head_local, dtype=np.float32)
+        axis = np.array(bone.tail_local, dtype=np.float32) - head
+        length_sq = float(axis @ axis) or 1e-8
+        t = np.clip((co - head) @ axis / length_sq, 0.0, 1.0)
+        dist = np.linalg.norm(co - (head + t[:, None] * axis), axis=1)
+        reach = radius * length_sq ** 0.5
+        # Smooth falloff across the radius, tapering to zero at the tendons
+        w = np.clip(1.0 - dist / reach, 0.0, 1.0) ** 2 * np.sin(np.pi * t)
+
+        vg = skin.vertex_groups.get(name) or skin.vertex_groups.new(name=name)
+        result[name] = write_group_weights(vg, w, WEIGHT_LEVELS)
+    return result
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_bbone_bake(bpy.types.Operator):
+    """Bake bendy-bone muscle influence into the skin's armature weights"""
+    bl_idname = "muscle.bbone_bake"
+    bl_label = "Bake Bendy Muscles to Skin"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    radius: bpy.props.FloatProperty(name="Radius", default=0.3, min=0.01, max=2.0,
+                                    description="Influence radius relative to muscle length")
+
+    def execute(self, context):
+        arm = context.active_object
+        if not arm or arm.type != 'ARMATURE':
+            self.report({'ERROR'}, "Make the armature active and select the skin meshes")
+            return {'CANCELLED'}
+        skins = [o for o in context.selected_objects if o.type == 'MESH' and
+                 any(m.type == 'ARMATURE' and m.object == arm for m in o.modifiers)]
+        if not skins:
+            self.report({'ERROR'}, "Select skin meshes deformed by this armature")
+            return {'CANCELLED'}
+
+        total = 0
+        for skin in skins:
+            total += sum(bake_bbone_weights(skin, arm, radius=self.radius).values())
+        self.report({'INFO'}, f"Baked bendy muscles into {len(skins)} skin(s), {total} weights")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_bbone_bake,)
+
+def register():
+    bpy.types.Scene.Muscle_Mode = bpy.props.EnumProperty(
+        name="Muscle Mode",
+        items=[('MESH', "Mesh", "Full mesh muscle with hooks, jiggle and corrective smooth"),
+               ('BBONE', "Bendy Bone", "Lightweight bendy-bone muscle baked into skin weights"),
+               ('NODES', "Geometry Nodes", "Mesh muscle deformed by one shared node group (no jiggle)")],
+        default='MESH')
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    if hasattr(bpy.types.Scene, "Muscle_Mode"):
+        del bpy.types.Scene.Muscle_Mode
@@ -0,0 +1,539 @@
+# benchmark.py — Playback Timing for Muscle Systems
+# BlendArmory Muscles 3.3 — Measure, don't guess
+
+import bpy
+import os
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from .geometry import mesh_coords
+from .pins import add_pins, remove_pin, bindings_along_axis
+from .registry import muscles_of, all_muscles, unregister_muscle
+from .system import MUSCLE_BUILDERS, plan_muscle
+from .data import PRESETS
+from .driver_bake import bake_drivers, unbake_drivers
+from .sparse_keys import pack_muscle, unpack_muscle, dense_key_bytes, sparse_keys
+from .jiggle_cache import CACHE_KEY, JiggleCacheReader
+from .crowd import crowd_cycle, create_crowd, remove_crowd, AGENT_BYTES
+from .memory_report import memory_report, mesh_bytes
+
+# ===================================================================
+# TIMING
+# ===================================================================
+def time_playback(scene, frame_start=None, frame_end=None, passes=2):
+    """Step the scene frame by frame and return the mean ms per frame.
+
+    The first pass warms caches (soft body, drivers) and is discarded when
+    more than one pass is requested.
+    """
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    original = scene.frame_current
+    frames = range(frame_start, frame_end + 1)
+    timings = []
+    for _ in range(passes):
+        start = time.perf_counter()
+        for f in frames:
+            scene.frame_set(f)
+        timings.append((time.perf_counter() - start) * 1000.0 / max(len(frames), 1))
+    scene.frame_set(original)
+    return min(timings[1:] or timings)
+
+def compare_muscle_modes(context, arm, frame_start=None, frame_end=None):
+    """Time playback with the mesh muscles of arm evaluated vs. hidden.
+
+    Hidden mesh muscles leave only armature deform (and any bendy-bone
+    muscles baked into the skin) in the depsgraph. Returns a dict of ms/frame.
+    """
+    scene = context.scene
+    muscles = [o for o in muscles_of(scene, arm) if not o.hide_viewport]
+    result = {"mesh_muscles": len(muscles),
+              "bbone_muscles": sum(1 for b in arm.data.bones if b.get("Muscle_XID"))}
+    result["with_mesh"] = time_playback(scene, frame_start, frame_end)
+    for o in muscles:
+        o.hide_viewport = True
+    try:
+        result["without_mesh"] = time_playback(scene, frame_start, frame_end)
+    finally:
+        for o in muscles:
+            o.hide_viewport = False
+    return result
+
+def measure_pin_overhead(context, muscle, counts=(0, 1, 4, 16, 64), frame_start=None, frame_end=None):
+    """Playback ms/frame of the scene with muscle carrying each pin count.
+
+    Pins are added in bulk, timed and removed again, leaving the muscle's
+    own pins untouched. Returns [(count, ms_per_frame), ...].
+    """
+    scene = context.scene
+    co = mesh_coords(muscle.data)
+    keep = len(muscle.custom)
+    result = []
+    for count in counts:
+        if count:
+            add_pins(context, muscle, bindings_along_axis(co, count))
+        try:
+            result.append((count, time_playback(scene, frame_start, frame_end)))
+        finally:
+            while len(muscle.custom) > keep:
+                remove_pin(muscle, len(muscle.custom) - 1)
+    return result
+
+def compare_adaptive_smoothing(context, muscles=None, frame_start=None, frame_end=None):
+    """Time playback with fixed vs. adaptive Corrective Smooth on muscles.
+
+    Run it on an idle-heavy shot: the gain is what resting muscles save.
+    Each muscle's own setting is restored afterwards. Returns ms/frame.
+    """
+    scene = context.scene
+    muscles = all_muscles(scene) if muscles is None else muscles
+    saved = [(m, m.Smooth_Adaptive) for m in muscles]
+    result = {"muscles": len(muscles)}
+    try:
+        for m in muscles:
+            m.Smooth_Adaptive = False
+        result["fixed"] = time_playback(scene, frame_start, frame_end)
+        for m in muscles:
+            m.Smooth_Adaptive = True
+        result["adaptive"] = time_playback(scene, frame_start, frame_end)
+    finally:
+        for m, state in saved:
+            m.Smooth_Adaptive = state
+    return result
+
+def compare_dynamics_sleep(context, frame_start=None, frame_end=None):
+    """Time playback with jiggle sleeping off vs. on. Returns ms/frame."""
+    scene = context.scene
+    saved = scene.Muscle_Sleep
+    result = {}
+    try:
+        scene.Muscle_Sleep = False
+        result["awake"] = time_playback(scene, frame_start, frame_end)
+        scene.Muscle_Sleep = True
+        result["sleeping"] = time_playback(scene, frame_start, frame_end)
+    finally:
+        scene.Muscle_Sleep = saved
+    return result
+
+def compare_deformers(context, arm, counts=(100, 500), preset="Biceps", frame_start=None, frame_end=None):
+    """Playback ms/frame of count throwaway muscles per deformer mode.
+
+    Muscles are spread over arm's parent/child bone pairs, timed with the
+    rest of the scene, then deleted. Returns {mode: [(count, ms), ...]}.
+    """
+    scene = context.scene
+    pairs = [(pb.parent, pb) for pb in arm.pose.bones if pb.parent]
+    result = {}
+    for mode in ('MESH', 'NODES'):
+        builder = MUSCLE_BUILDERS.get(mode)
+        if builder is None or not pairs:
+            continue
+        rows = result[mode] = []
+        for count in counts:
+            built = []
+            try:
+                for i in range(count):
+                    b1, b2 = pairs[i % len(pairs)]
+                    built.append(builder(context, arm, b1, b2, preset, name=f"Bench_{mode}_{i:04d}"))
+                rows.append((count, time_playback(scene, frame_start, frame_end)))
+            finally:
+                for muscle in built:
+                    mesh = muscle.data
+                    unregister_muscle(scene, muscle)
+                    bpy.data.objects.remove(muscle)
+                    bpy.data.meshes.remove(mesh)
+    return result
+
+def compare_collision(context, frame_start=None, frame_end=None):
+    """Playback ms/frame with soft body self collision vs. the muscle
+    collision stage (self collision off). Scene settings are restored."""
+    scene = context.scene
+    saved = scene.Muscle_Self_Collision, scene.Muscle_Collision
+    result = {}
+    try:
+        scene.Muscle_Self_Collision, scene.Muscle_Collision = True, False
+        result["self_collision"] = time_playback(scene, frame_start, frame_end)
+        scene.Muscle_Self_Collision, scene.Muscle_Collision = False, True
+        result["muscle_collision"] = time_playback(scene, frame_start, frame_end)
+    finally:
+        scene.Muscle_Self_Collision, scene.Muscle_Collision = saved
+    return result
+
+def compare_driver_bake(context, frame_start=None, frame_end=None):
+    """Playback ms/frame with live muscle drivers vs. baked F-curves.
+
+    Bakes over the timed range, measures, then restores the drivers.
+    """
+    scene = context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    muscles = all_muscles(scene)
+    result = {"drivers_live": time_playback(scene, frame_start, frame_end)}
+    count, keys = bake_drivers(scene, muscles, frame_start, frame_end)
+    try:
+        result["drivers_baked"] = time_playback(scene, frame_start, frame_end)
+    finally:
+        unbake_drivers(muscles)
+    result["drivers"], result["keys"] = count, keys
+    return result
+
+def compare_background_build(jobs=64, threads=None):
+    """Seconds to plan jobs muscles (presets round-robin) serially and on a
+    thread pool, as the background builder's workers do."""
+    threads = threads or os.cpu_count()
+    presets = list(PRESETS)
+    work = [(presets[i % len(presets)], 0.2 + 0.01 * (i % 40)) for i in range(jobs)]
+    start = time.perf_counter()
+    for preset, length in work:
+        plan_muscle(preset, length)
+    serial = time.perf_counter() - start
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda job: plan_muscle(*job), work))
+        threaded = time.perf_counter() - start
+    return {"jobs": jobs, "threads": threads, "serial": serial, "threaded": threaded,
+            "speedup": serial / max(threaded, 1e-9)}
+
+def _saved_size(path):
+    bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, compress=False)
+    return os.path.getsize(path)
+
+def _shape_memory(muscles):
+    """Bytes of shape key coordinates plus packed keys' dense attributes"""
+    return sum(dense_key_bytes(m.data) + len(sparse_keys(m.data)) * len(m.data.vertices) * 12
+               for m in muscles)
+
+def compare_sparse_keys(context):
+    """File size and shape key memory of the scene's muscles, dense vs. sparse.
+
+    Sparse memory counts the dense attribute each packed key keeps while
+    the file is open, so it only drops by the Basis. Saves two
+    uncompressed temporary copies of the file; muscles packed for the
+    measurement are unpacked again.
+    """
+    muscles = [m for m in all_muscles(context.scene) if m.type == 'MESH']
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "muscles.blend")
+        result = {"file_dense": _saved_size(path), "memory_dense": _shape_memory(muscles)}
+        packed = [m for m in muscles if pack_muscle(context, m)[0]]
+        try:
+            result["file_sparse"] = _saved_size(path)
+            result["memory_sparse"] = _shape_memory(muscles)
+        finally:
+            for m in packed:
+                unpack_muscle(context, m)
+    result["muscles"] = len(packed)
+    return result
+
+SOFT_BODY_POINT = 24     # bytes per vertex per frame in a soft body point cache (location + velocity)
+
+def _read_all(path):
+    r = JiggleCacheReader(path)
+    start = time.perf_counter()
+    for f in range(r.frame_start, r.frame_start + r.frames):
+        r.frame(f)
+    return r.frames, r.frames * len(r.idx) * 12, time.perf_counter() - start
+
+def compare_jiggle_cache(context, threads=4):
+    """Size of the scene's jiggle cache files vs. the soft body caches they
+    replace, and decode throughput with one reader and with several."""
+    paths, raw = [], 0
+    for muscle in all_muscles(context.scene):
+        if CACHE_KEY in muscle:
+            path = bpy.path.abspath(muscle[CACHE_KEY]["path"])
+            r = JiggleCacheReader(path)
+            paths.append(path)
+            raw += r.frames * r.vertex_count * SOFT_BODY_POINT
+    if not paths:
+        return None
+    result = {"files": len(paths), "raw": raw, "compressed": sum(os.path.getsize(p) for p in paths)}
+    start = time.perf_counter()
+    runs = [_read_all(p) for p in paths]
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(_read_all, paths))    # zlib releases the GIL while inflating
+    parallel = time.perf_counter() - start
+    frames = sum(r[0] for r in runs)
+    decoded = sum(r[1] for r in runs)
+    result["frames_per_s"] = frames / max(serial, 1e-9)
+    result["mb_per_s"] = decoded / 1048576 / max(serial, 1e-9)
+    result["parallel_mb_per_s"] = decoded / 1048576 / max(parallel, 1e-9)
+    result["threads"] = threads
+    return result
+
+def _crowd_geometry(context, crowd):
+    """(instances, bytes of the distinct meshes they reference) of crowd"""
+    depsgraph = context.evaluated_depsgraph_get()
+    count, meshes = 0, {}
+    for inst in depsgraph.object_instances:
+        if inst.is_instance and inst.parent and inst.parent.original == crowd:
+            count += 1
+            data = inst.object.original.data
+            if data.name not in meshes:
+                meshes[data.name] = mesh_bytes(data)
+    return count, sum(meshes.values())
+
+def compare_crowd(context, arm, counts=(1, 10, 100, 1000), frame_start=None, frame_end=None):
+    """Playback ms/frame and memory of crowds of each agent count instancing
+    arm's baked cycle, against the hero's live muscles. Hero muscles are
+    hidden while crowds are timed; temporary crowds are removed."""
+    scene = context.scene
+    cycle = crowd_cycle(arm)
+    if cycle is None or not cycle.objects:
+        return None
+    muscles = [o for o in muscles_of(scene, arm) if not o.hide_viewport]
+    result = {"hero_ms": time_playback(scene, frame_start, frame_end),
+              "hero_bytes": memory_report(muscles)["total"]["total"],
+              "frames": len(cycle.objects), "agents": []}
+    for o in muscles:
+        o.hide_viewport = True
+    try:
+        result["empty_ms"] = time_playback(scene, frame_start, frame_end)
+        for count in counts:
+            crowd = create_crowd(context, cycle, count)
+            try:
+                ms = time_playback(scene, frame_start, frame_end)
+                instances, shared = _crowd_geometry(context, crowd)
+            finally:
+                remove_crowd(crowd)
+            result["agents"].append({"agents": count, "instances": instances, "ms": ms,
+                                     "shared": shared, "per_agent": count * AGENT_BYTES})
+    finally:
+        for o in muscles:
+            o.hide_viewport = False
+    return result
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_benchmark_playback(bpy.types.Operator):
+    """Compare playback cost of mesh muscles against bone-only deformation"""
+    bl_idname = "muscle.benchmark_playback"
+    bl_label = "Benchmark Muscle Playback"
+
+    def execute(self, context):
+        arm = context.active_object
+        if not arm or arm.type != 'ARMATURE':
+            self.report({'ERROR'}, "Select an armature")
+            return {'CANCELLED'}
+        r = compare_muscle_modes(context, arm)
+        print(f"\nBlendArmory: Playback benchmark on '{arm.name}'")
+        for key, value in r.items():
+            print(f"  {key:<14} {value:.3f}" if isinstance(value, float) else f"  {key:<14} {value}")
+        self.report({'INFO'}, f"Mesh muscles {r['with_mesh']:.2f} ms/frame, "
+                              f"bone-only {r['without_mesh']:.2f} ms/frame")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_pins(bpy.types.Operator):
+    """Measure playback cost per pin on the active muscle"""
+    bl_idname = "muscle.benchmark_pins"
+    bl_label = "Benchmark Pin Overhead"
+
+    @classmethod
+    def poll(cls, context):
+        return context.object and "Muscle_XID" in context.object
+
+    def execute(self, context):
+        muscle = context.object
+        rows = measure_pin_overhead(context, muscle)
+        print(f"\nBlendArmory: Pin overhead on '{muscle.name}'")
+        for count, ms in rows:
+            print(f"  {count:>4} pins  {ms:.3f} ms/frame")
+        (c0, t0), (c1, t1) = rows[0], rows[-1]
+        per_pin = (t1 - t0) / max(c1 - c0, 1)
+        self.report({'INFO'}, f"{per_pin * 1000.0:.1f} µs/frame per pin ({c1} pins: {t1:.2f} ms/frame)")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_smoothing(bpy.types.Operator):
+    """Compare fixed against adaptive Corrective Smooth over the scene frame range"""
+    bl_idname = "muscle.benchmark_smoothing"
+    bl_label = "Benchmark Adaptive Smoothing"
+
+    def execute(self, context):
+        r = compare_adaptive_smoothing(context)
+        if not r["muscles"]:
+            self.report({'ERROR'}, "No muscles in the scene")
+            return {'CANCELLED'}
+        print(f"\nBlendArmory: Adaptive smoothing benchmark ({r['muscles']} muscles)")
+        print(f"  fixed      {r['fixed']:.3f} ms/frame")
+        print(f"  adaptive   {r['adaptive']:.3f} ms/frame")
+        self.report({'INFO'}, f"Fixed {r['fixed']:.2f} ms/frame, adaptive {r['adaptive']:.2f} ms/frame")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_sleep(bpy.types.Operator):
+    """Compare playback with and without jiggle sleeping over the scene frame range"""
+    bl_idname = "muscle.benchmark_sleep"
+    bl_label = "Benchmark Jiggle Sleeping"
+
+    def execute(self, context):
+        r = compare_dynamics_sleep(context)
+        print("\nBlendArmory: Jiggle sleeping benchmark")
+        print(f"  awake      {r['awake']:.3f} ms/frame")
+        print(f"  sleeping   {r['sleeping']:.3f} ms/frame")
+        self.report({'INFO'}, f"Awake {r['awake']:.2f} ms/frame, sleeping {r['sleeping']:.2f} ms/frame")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_deformers(bpy.types.Operator):
+    """Time 100 and 500 muscles built with the modifier stack vs. the shared node deformer"""
+    bl_idname = "muscle.benchmark_deformers"
+    bl_label = "Benchmark Muscle Deformers"
+
+    def execute(self, context):
+        arm = context.active_object
+        if not arm or arm.type != 'ARMATURE':
+            self.report({'ERROR'}, "Select an armature")
+            return {'CANCELLED'}
+        r = compare_deformers(context, arm)
+        if not r:
+            self.report({'ERROR'}, "Armature needs at least one parented bone")
+            return {'CANCELLED'}
+        print(f"\nBlendArmory: Deformer benchmark on '{arm.name}'")
+        for mode, rows in r.items():
+            for count, ms in rows:
+                print(f"  {mode:<6} {count:>4} muscles  {ms:.3f} ms/frame")
+        summary = ", ".join(f"{mode} {rows[-1][1]:.2f}" for mode, rows in r.items())
+        self.report({'INFO'}, f"ms/frame at {r['MESH'][-1][0]} muscles: {summary}")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_collision(bpy.types.Operator):
+    """Compare soft body self collision against the muscle collision stage"""
+    bl_idname = "muscle.benchmark_collision"
+    bl_label = "Benchmark Muscle Collision"
+
+    def execute(self, context):
+        r = compare_collision(context)
+        print("\nBlendArmory: Collision benchmark")
+        print(f"  self collision     {r['self_collision']:.3f} ms/frame")
+        print(f"  muscle collision   {r['muscle_collision']:.3f} ms/frame")
+        self.report({'INFO'}, f"Self collision {r['self_collision']:.2f} ms/frame, "
+                              f"muscle collision {r['muscle_collision']:.2f} ms/frame")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_driver_bake(bpy.types.Operator):
+    """Measure the per-frame saving of baking muscle drivers to keyframes"""
+    bl_idname = "muscle.benchmark_driver_bake"
+    bl_label = "Benchmark Driver Bake"
+
+    def execute(self, context):
+        r = compare_driver_bake(context)
+        saving = r["drivers_live"] - r["drivers_baked"]
+        print(f"\nBlendArmory: Driver bake benchmark ({r['drivers']} drivers, {r['keys']} keys)")
+        print(f"  live drivers   {r['drivers_live']:.3f} ms/frame")
+        print(f"  baked curves   {r['drivers_baked']:.3f} ms/frame")
+        self.report({'INFO'}, f"Baking saves {saving:.3f} ms/frame "
+                              f"({r['drivers_live']:.2f} -> {r['drivers_baked']:.2f})")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_build(bpy.types.Operator):
+    """Time muscle geometry planning serially vs. on worker threads"""
+    bl_idname = "muscle.benchmark_build"
+    bl_label = "Benchmark Background Build"
+
+    jobs: bpy.props.IntProperty(name="Muscles", default=64, min=1, max=4096)
+    threads: bpy.props.IntProperty(name="Threads", default=0, min=0, max=64,
+                                   description="Worker threads (0 = one per CPU core)")
+
+    def execute(self, context):
+        r = compare_background_build(self.jobs, self.threads)
+        print(f"\nBlendArmory: Background build benchmark ({r['jobs']} muscles planned)")
+        print(f"  serial              {r['serial'] * 1000:9.1f} ms")
+        print(f"  {r['threads']:>2} threads          {r['threaded'] * 1000:9.1f} ms  ({r['speedup']:.2f}x)")
+        self.report({'INFO'}, f"{r['jobs']} plans: serial {r['serial'] * 1000:.0f} ms, "
+                              f"{r['threads']} threads {r['threaded'] * 1000:.0f} ms ({r['speedup']:.2f}x)")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_sparse_keys(bpy.types.Operator):
+    """Measure file size and shape key memory with dense vs. sparse muscle keys"""
+    bl_idname = "muscle.benchmark_sparse_keys"
+    bl_label = "Benchmark Sparse Keys"
+
+    def execute(self, context):
+        r = compare_sparse_keys(context)
+        mb = 1.0 / 1048576
+        print(f"\nBlendArmory: Sparse shape key benchmark ({r['muscles']} muscles packed)")
+        print(f"  file    {r['file_dense'] * mb:9.2f} MB dense  {r['file_sparse'] * mb:9.2f} MB sparse")
+        print(f"  memory  {r['memory_dense'] * mb:9.2f} MB dense  {r['memory_sparse'] * mb:9.2f} MB sparse"
+              "  (runtime: packed keys stay dense attributes, only the Basis is saved)")
+        self.report({'INFO'}, f"File {r['file_dense'] * mb:.1f} -> {r['file_sparse'] * mb:.1f} MB; "
+                              f"runtime memory {r['memory_dense'] * mb:.1f} -> {r['memory_sparse'] * mb:.1f} MB "
+                              "(Basis only, keys stay dense in memory)")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_jiggle_cache(bpy.types.Operator):
+    """Measure jiggle cache size against soft body caches and its read throughput"""
+    bl_idname = "muscle.benchmark_jiggle_cache"
+    bl_label = "Benchmark Jiggle Cache"
+
+    threads: bpy.props.IntProperty(name="Readers", default=4, min=1, max=64)
+
+    def execute(self, context):
+        r = compare_jiggle_cache(context, self.threads)
+        if r is None:
+            self.report({'WARNING'}, "No muscles play a jiggle cache; bake one first")
+            return {'CANCELLED'}
+        ratio = r["raw"] / max(r["compressed"], 1)
+        print(f"\nBlendArmory: Jiggle cache benchmark ({r['files']} files)")
+        print(f"  soft body caches  {r['raw'] / 1048576:10.2f} MB")
+        print(f"  jiggle caches     {r['compressed'] / 1048576:10.2f} MB  ({ratio:.1f}x smaller)")
+        print(f"  read, 1 reader    {r['mb_per_s']:10.1f} MB/s decoded  ({r['frames_per_s']:.0f} frames/s)")
+        print(f"  read, {r['threads']} readers   {r['parallel_mb_per_s']:10.1f} MB/s decoded")
+        self.report({'INFO'}, f"{ratio:.1f}x smaller, {r['mb_per_s']:.0f} MB/s "
+                              f"({r['parallel_mb_per_s']:.0f} MB/s with {r['threads']} readers)")
+        return {'FINISHED'}
+
+class MUSCLE_OT_benchmark_crowd(bpy.types.Operator):
+    """Time and measure crowds of up to Agents instancing the active armature's cycle"""
+    bl_idname = "muscle.benchmark_crowd"
+    bl_label = "Benchmark Muscle Crowd"
+
+    agents: bpy.props.IntProperty(name="Agents", default=1000, min=1, max=100000)
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.type == 'ARMATURE'
+
+    def execute(self, context):
+        counts = sorted({1, 10, 100, 1000, self.agents} & set(range(1, self.agents + 1)))
+        r = compare_crowd(context, context.object, counts)
+        if r is None:
+            self.report({'WARNING'}, "Bake a crowd cycle for this armature first")
+            return {'CANCELLED'}
+        mb = 1.0 / 1048576
+        print(f"\nBlendArmory: Crowd benchmark ({r['frames']} baked frames)")
+        print(f"  hero, live muscles  {r['hero_ms']:8.2f} ms/frame  {r['hero_bytes'] * mb:9.2f} MB")
+        print(f"  scene, no muscles   {r['empty_ms']:8.2f} ms/frame")
+        print(f"  {'Agents':>8}{'Instances':>11}{'ms/frame':>10}{'Shared MB':>11}{'Agent MB':>10}{'Duplicated MB':>15}")
+        for a in r["agents"]:
+            print(f"  {a['agents']:>8}{a['instances']:>11}{a['ms']:>10.2f}{a['shared'] * mb:>11.2f}"
+                  f"{a['per_agent'] * mb:>10.3f}{a['agents'] * r['hero_bytes'] * mb:>15.1f}")
+        top = r["agents"][-1]
+        self.report({'INFO'}, f"{top['agents']} agents: {top['ms']:.2f} ms/frame, "
+                              f"{(top['shared'] + top['per_agent']) * mb:.1f} MB "
+                              f"(one live hero {r['hero_ms']:.2f} ms/frame)")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (
+    MUSCLE_OT_benchmark_playback,
+    MUSCLE_OT_benchmark_pins,
+    MUSCLE_OT_benchmark_smoothing,
+    MUSCLE_OT_benchmark_sleep,
+    MUSCLE_OT_benchmark_deformers,
+    MUSCLE_OT_benchmark_collision,
+    MUSCLE_OT_benchmark_driver_bake,
+    MUSCLE_OT_benchmark_build,
+    MUSCLE_OT_benchmark_sparse_keys,
+    MUSCLE_OT_benchmark_jiggle_cache,
+    MUSCLE_OT_benchmark_crowd,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
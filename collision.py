@@ -0,0 +1,317 @@
+# collision.py — Muscle vs. Muscle Collision
+# BlendArmory Muscles 3.3 — One spatial hash per armature, one node group per stack
+
+import bpy
+import numpy as np
+from .registry import all_muscles
+from .modifier_stack import order_stack, register_group_rank, input_id, STACK_RANK
+
+# ===================================================================
+# SETTINGS
+# Neighbours are found once with a spatial hash over the current pose;
+# each muscle then pushes itself out of up to MAX_COLLIDERS neighbours
+# that come before it (by name) inside its own evaluated stack, after
+# hooks, dynamics and smoothing. Earlier muscles never read later ones,
+# so the depsgraph stays acyclic and every frame is evaluated alone.
+# Limitation: the neighbour set is static. Muscles that only come within
+# reach in other poses never collide; pose the rig where they meet (or
+# raise Reach) and use Refresh Neighbours.
+# ===================================================================
+GROUP_NAME = "BlendArmory Muscle Collision"
+MODIFIER_NAME = "Muscle Collision"
+MAX_COLLIDERS = 4
+COLLISION_RANK = STACK_RANK['SHRINKWRAP'] - 0.5
+_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.int64)
+_NEIGHBOURS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)],
+                       dtype=np.int64)
+
+# ===================================================================
+# SPATIAL HASH
+# ===================================================================
+def cell_keys(cells):
+    """One int64 key per integer cell coordinate (N, 3)"""
+    return (cells * _PRIMES).sum(axis=1)
+
+def candidate_pairs(co, owner, reach):
+    """(i, j): point pairs of different owners in neighbouring cells"""
+    cells = np.floor(co / reach).astype(np.int64)
+    keys = cell_keys(cells)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    pi, pj = [], []
+    for offset in _NEIGHBOURS:
+        q = cell_keys(cells + offset)
+        lo = np.searchsorted(sorted_keys, q, 'left')
+        hi = np.searchsorted(sorted_keys, q, 'right')
+        counts = hi - lo
+        total = int(counts.sum())
+        if not total:
+            continue
+        starts = np.cumsum(counts) - counts
+        i = np.repeat(np.arange(len(co)), counts)
+        j = order[np.arange(total) - np.repeat(starts, counts) + np.repeat(lo, counts)]
+        keep = owner[i] != owner[j]
+        pi.append(i[keep])
+        pj.append(j[keep])
+    if not pi:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(pi), np.concatenate(pj)
+
+# ===================================================================
+# NODE GROUP (per frame, no state)
+#   q, n   nearest collider vertex and its normal
+#   push   n * (thickness - (p - q) . n) where positive and |p - q| < reach
+# Distances are in world units: thickness and reach are divided by the
+# muscle's mean scale, colliders are read relative to the muscle.
+# ===================================================================
+def _math(nodes, links, op, a, b, location):
+    node = nodes.new("ShaderNodeMath")
+    node.operation = op
+    node.location = location
+    for socket, value in zip(node.inputs, (a, b)):
+        if isinstance(value, bpy.types.NodeSocket):
+            links.new(value, socket)
+        else:
+            socket.default_value = value
+    return node.outputs[0]
+
+def collision_group():
+    ng = bpy.data.node_groups.get(GROUP_NAME)
+    if ng is not None:
+        return ng
+    ng = bpy.data.node_groups.new(GROUP_NAME, 'GeometryNodeTree')
+    ng.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    for i in range(MAX_COLLIDERS):
+        ng.interface.new_socket(f"Collider {i + 1}", in_out='INPUT', socket_type='NodeSocketObject')
+    ng.interface.new_socket("Thickness", in_out='INPUT', socket_type='NodeSocketFloat').default_value = 0.005
+    ng.interface.new_socket("Reach", in_out='INPUT', socket_type='NodeSocketFloat').default_value = 0.03
+    ng.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes, links = ng.nodes, ng.links
+    gin = nodes.new("NodeGroupInput")
+    gin.location = (-1400, 0)
+    join = nodes.new("GeometryNodeJoinGeometry")
+    join.location = (-1000, -300)
+    for i in range(MAX_COLLIDERS):
+        info = nodes.new("GeometryNodeObjectInfo")
+        info.transform_space = 'RELATIVE'
+        info.location = (-1200, -200 - 150 * i)
+        links.new(gin.outputs[f"Collider {i + 1}"], info.inputs["Object"])
+        links.new(info.outputs["Geometry"], join.inputs[0])
+    colliders = join.outputs[0]
+
+    # World distances into the muscle's local space
+    self_obj = nodes.new("GeometryNodeSelfObject")
+    self_obj.location = (-1400, 300)
+    self_info = nodes.new("GeometryNodeObjectInfo")
+    self_info.transform_space = 'ORIGINAL'
+    self_info.location = (-1200, 300)
+    links.new(self_obj.outputs[0], self_info.inputs["Object"])
+    mean = nodes.new("ShaderNodeVectorMath")
+    mean.operation = 'DOT_PRODUCT'
+    mean.inputs[1].default_value = (1.0 / 3.0,) * 3
+    mean.location = (-1000, 300)
+    links.new(self_info.outputs["Scale"], mean.inputs[0])
+    scale = _math(nodes, links, 'MAXIMUM', mean.outputs["Value"], 1e-6, (-850, 300))
+    thickness = _math(nodes, links, 'DIVIDE', gin.outputs["Thickness"], scale, (-700, 350))
+    reach = _math(nodes, links, 'DIVIDE', gin.outputs["Reach"], scale, (-700, 250))
+
+    pos = nodes.new("GeometryNodeInputPosition")
+    pos.location = (-1000, -50)
+    nearest = nodes.new("GeometryNodeSampleNearest")
+    nearest.domain = 'POINT'
+    nearest.location = (-800, -300)
+    links.new(colliders, nearest.inputs["Geometry"])
+    links.new(pos.outputs[0], nearest.inputs["Sample Position"])
+    normal = nodes.new("GeometryNodeInputNormal")
+    normal.location = (-1000, -700)
+    samples = []
+    for k, field in enumerate((pos.outputs[0], normal.outputs[0])):
+        sample = nodes.new("GeometryNodeSampleIndex")
+        sample.data_type = 'FLOAT_VECTOR'
+        sample.domain = 'POINT'
+        sample.location = (-600, -300 - 200 * k)
+        links.new(colliders, sample.inputs["Geometry"])
+        links.new(field, sample.inputs["Value"])
+        links.new(nearest.outputs["Index"], sample.inputs["Index"])
+        samples.append(sample.outputs[0])
+    q, n = samples
+
+    delta = nodes.new("ShaderNodeVectorMath")
+    delta.operation = 'SUBTRACT'
+    delta.location = (-400, -100)
+    links.new(pos.outputs[0], delta.inputs[0])
+    links.new(q, delta.inputs[1])
+    along = nodes.new("ShaderNodeVectorMath")
+    along.operation = 'DOT_PRODUCT'
+    along.location = (-200, -200)
+    links.new(delta.outputs[0], along.inputs[0])
+    links.new(n, along.inputs[1])
+    dist = nodes.new("ShaderNodeVectorMath")
+    dist.operation = 'LENGTH'
+    dist.location = (-200, -50)
+    links.new(delta.outputs[0], dist.inputs[0])
+
+    depth = _math(nodes, links, 'SUBTRACT', thickness, along.outputs["Value"], (0, -200))
+    depth = _math(nodes, links, 'MAXIMUM', depth, 0.0, (150, -200))
+    near = _math(nodes, links, 'LESS_THAN', dist.outputs["Value"], reach, (0, -50))
+    count = nodes.new("GeometryNodeAttributeDomainSize")
+    count.component = 'MESH'
+    count.location = (-800, -550)
+    links.new(colliders, count.inputs[0])
+    any_collider = _math(nodes, links, 'GREATER_THAN', count.outputs["Point Count"], 0.0, (0, 100))
+    weight = _math(nodes, links, 'MULTIPLY', near, any_collider, (150, 0))
+    weight = _math(nodes, links, 'MULTIPLY', weight, depth, (300, -100))
+    push = nodes.new("ShaderNodeVectorMath")
+    push.operation = 'SCALE'
+    push.location = (450, -200)
+    links.new(n, push.inputs[0])
+    links.new(weight, push.inputs["Scale"])
+
+    setpos = nodes.new("GeometryNodeSetPosition")
+    setpos.location = (650, 0)
+    links.new(gin.outputs["Geometry"], setpos.inputs["Geometry"])
+    links.new(push.outputs[0], setpos.inputs["Offset"])
+    gout = nodes.new("NodeGroupOutput")
+    gout.location = (850, 0)
+    links.new(setpos.outputs[0], gout.inputs[0])
+    return ng
+
+# ===================================================================
+# SETUP
+# ===================================================================
+def _evaluated(muscle, depsgraph):
+    """World coords of the evaluated muscle, or None"""
+    ev = muscle.evaluated_get(depsgraph)
+    mesh = ev.data
+    n = len(mesh.vertices)
+    if n != len(muscle.data.vertices):
+        return None
+    co = np.empty(n * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    mw = np.array(ev.matrix_world, dtype=np.float32)
+    return co.reshape(-1, 3) @ mw[:3, :3].T + mw[:3, 3]
+
+def find_colliders(muscles, depsgraph, reach):
+    """{muscle: [collider muscles]}: for each muscle the neighbours before
+    it by name with points within reach, most contacts first."""
+    muscles = sorted(muscles, key=lambda m: m.name)
+    samples = [(k, _evaluated(m, depsgraph)) for k, m in enumerate(muscles)]
+    samples = [(k, co) for k, co in samples if co is not None]
+    if len(samples) < 2:
+        return {}
+    co = np.concatenate([c for _, c in samples])
+    owner = np.concatenate([np.full(len(c), k) for k, c in samples])
+    i, j = candidate_pairs(co, owner, reach)
+    delta = co[i] - co[j]
+    near = np.einsum('ij,ij->i', delta, delta) < reach * reach
+    a, b = owner[i[near]], owner[j[near]]
+    later = a > b
+    contacts = {}
+    for k, other in zip(a[later].tolist(), b[later].tolist()):
+        contacts.setdefault(k, {}).setdefault(other, 0)
+        contacts[k][other] += 1
+    return {muscles[k]: [muscles[o] for o, _ in sorted(c.items(), key=lambda kv: -kv[1])[:MAX_COLLIDERS]]
+            for k, c in contacts.items()}
+
+def remove_collision(muscle):
+    mod = muscle.modifiers.get(MODIFIER_NAME)
+    if mod:
+        muscle.modifiers.remove(mod)
+
+def install_collision(context, scene):
+    """(Re)build every muscle's collision step from the current pose.
+    Returns the number of muscles that collide with a neighbour."""
+    by_arm = {}
+    for muscle in all_muscles(scene):
+        remove_collision(muscle)
+        arm = muscle.parent if muscle.parent and muscle.parent.type == 'ARMATURE' else None
+        if arm is not None:
+            by_arm.setdefault(arm.as_pointer(), []).append(muscle)
+    depsgraph = context.evaluated_depsgraph_get()
+    ng = collision_group()
+    installed = 0
+    for muscles in by_arm.values():
+        for muscle, colliders in find_colliders(muscles, depsgraph, scene.Muscle_Collision_Reach).items():
+            mod = muscle.modifiers.new(MODIFIER_NAME, 'NODES')
+            mod.node_group = ng
+            for i, collider in enumerate(colliders):
+                mod[input_id(ng, f"Collider {i + 1}")] = collider
+            mod[input_id(ng, "Thickness")] = scene.Muscle_Collision_Thickness
+            mod[input_id(ng, "Reach")] = scene.Muscle_Collision_Reach
+            order_stack(context, muscle)
+            installed += 1
+    return installed
+
+def clear_collision(scene):
+    """Remove every muscle's collision step"""
+    for muscle in all_muscles(scene):
+        remove_collision(muscle)
+
+# ===================================================================
+# CALLBACKS / OPERATORS
+# ===================================================================
+def update_muscle_collision(self, context):
+    if self.Muscle_Collision:
+        install_collision(context, self)
+    else:
+        clear_collision(self)
+
+def update_collision_thickness(self, context):
+    ng = bpy.data.node_groups.get(GROUP_NAME)
+    if ng is None:
+        return
+    for muscle in all_muscles(self):
+        mod = muscle.modifiers.get(MODIFIER_NAME)
+        if mod:
+            mod[input_id(ng, "Thickness")] = self.Muscle_Collision_Thickness
+            mod[input_id(ng, "Reach")] = self.Muscle_Collision_Reach
+
+def update_collision_reach(self, context):
+    if self.Muscle_Collision:
+        install_collision(context, self)    # reach decides who neighbours whom
+
+def update_self_collision(self, context):
+    for muscle in all_muscles(self):
+        for mod in muscle.modifiers:
+            if mod.type == 'SOFT_BODY':
+                mod.settings.use_self_collision = self.Muscle_Self_Collision
+
+class MUSCLE_OT_collision_refresh(bpy.types.Operator):
+    """Find colliding neighbours again from the current pose. Neighbours are not tracked per frame: refresh in the pose where muscles meet"""
+    bl_idname = "muscle.collision_refresh"
+    bl_label = "Refresh Muscle Collision"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        installed = install_collision(context, context.scene)
+        self.report({'INFO'}, f"{installed} muscles collide with their neighbours")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+def register():
+    bpy.utils.register_class(MUSCLE_OT_collision_refresh)
+    register_group_rank(GROUP_NAME, COLLISION_RANK)
+    bpy.types.Scene.Muscle_Collision = bpy.props.BoolProperty(
+        name="Muscle Collision", default=False, update=update_muscle_collision,
+        description="Push each muscle out of its neighbours inside its own modifier stack")
+    bpy.types.Scene.Muscle_Collision_Thickness = bpy.props.FloatProperty(
+        name="Thickness", default=0.005, min=0.0, max=0.1, precision=4, unit='LENGTH',
+        update=update_collision_thickness, description="Gap kept between muscle surfaces")
+    bpy.types.Scene.Muscle_Collision_Reach = bpy.props.FloatProperty(
+        name="Reach", default=0.03, min=0.001, max=0.5, precision=3, unit='LENGTH',
+        update=update_collision_reach, description="Neighbour search radius, and the deepest penetration that is resolved")
+    bpy.types.Scene.Muscle_Self_Collision = bpy.props.BoolProperty(
+        name="Self Collision", default=True, update=update_self_collision,
+        description="Soft body self collision on every muscle (costly; Muscle Collision covers neighbours)")
+
+def unregister():
+    for prop in ("Muscle_Collision", "Muscle_Collision_Thickness", "Muscle_Collision_Reach",
+                 "Muscle_Self_Collision"):
+        if hasattr(bpy.types.Scene, prop):
+            delattr(bpy.types.Scene, prop)
+    register_group_rank(GROUP_NAME)
+    bpy.utils.unregister_class(MUSCLE_OT_collision_refresh)
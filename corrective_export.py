@@ -0,0 +1,263 @@
+# corrective_export.py — Muscle-to-Skin Corrective Shape Baking
+# BlendArmory Muscles 3.3 — Game-engine export: a few blend shapes, no simulation
+
+import bpy
+import time
+import numpy as np
+from .registry import muscles_of
+from .geometry import group_weights
+
+# ===================================================================
+# SAMPLING
+# ===================================================================
+TARGET_ATTRS = ("target", "object", "auxiliary_target", "origin")
+
+def _skin_coords(skin, depsgraph, count):
+    mesh = skin.evaluated_get(depsgraph).data
+    if len(mesh.vertices) != count:
+        raise ValueError(f"the modifiers on '{skin.name}' change its vertex count "
+                         f"({count} -> {len(mesh.vertices)})")
+    co = np.empty(count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(count, 3)
+
+def muscle_modifiers(skin, muscles):
+    """Skin modifiers the muscle system shapes: those targeting a muscle
+    object or driven by one. Everything else stays on in both passes."""
+    muscles = set(muscles)
+    driven = set()
+    if skin.animation_data:
+        for fc in skin.animation_data.drivers:
+            if fc.data_path.startswith("modifiers[") and any(
+                    t.id in muscles for v in fc.driver.variables for t in v.targets):
+                driven.add(fc.data_path.split('"')[1])
+    return [m for m in skin.modifiers if m.type != 'ARMATURE' and m.show_viewport and (
+            m.name in driven or any(getattr(m, a, None) in muscles for a in TARGET_ATTRS))]
+
+def _skin_weights(skin, arm):
+    """Dense (verts x deform bones) normalized weight matrix for skin"""
+    bones = [b.name for b in arm.data.bones if b.use_deform and b.name in skin.vertex_groups]
+    weights = group_weights(skin, bones)
+    total = weights.sum(axis=1, keepdims=True)
+    np.divide(weights, total, out=weights, where=total > 0)
+    return bones, weights
+
+def muscle_joint_pairs(scene, arm):
+    """Unique (origin, insertion) bone pairs used by the muscles on arm"""
+    pairs = []
+    for muscle in muscles_of(scene, arm):
+        hooks = [m.subtarget for m in muscle.modifiers if m.type == 'HOOK' and m.object == arm and m.subtarget]
+        if len(hooks) == 2 and tuple(hooks) not in pairs:
+            pairs.append(tuple(hooks))
+    return pairs
+
+def _joint_angles(arm, pairs):
+    quats = {}
+    for name in {n for pair in pairs for n in pair}:
+        quats[name] = (arm.matrix_world @ arm.pose.bones[name].matrix).to_quaternion()
+    return [quats[a].rotation_difference(quats[b]).angle for a, b in pairs]
+
+def sample_muscle_deltas(context, skin, arm, frame_start, frame_end, step=1):
+    """Sample the muscle contribution to skin as rest-space deltas per frame.
+
+    Each frame is evaluated twice: with the full skin stack, and with the
+    muscle-driven modifiers (muscle_modifiers) off. The difference is pulled
+    back into rest space through the per-vertex blended skinning matrix so
+    the result can be stored as blend shapes applied before skinning.
+    Returns (deltas [frames x verts x 3], joint angles [frames x pairs], pairs).
+    ValueError when there is nothing to bake or the skin changes topology.
+    """
+    scene = context.scene
+    count = len(skin.data.vertices)
+    frames = list(range(frame_start, frame_end + 1, step))
+    if not frames:
+        raise ValueError(f"empty frame range {frame_start}-{frame_end}")
+    original = scene.frame_current
+    pairs = muscle_joint_pairs(scene, arm)
+    if not pairs:
+        raise ValueError("no muscles on this armature")
+    others = muscle_modifiers(skin, muscles_of(scene, arm))
+    if not others:
+        raise ValueError(f"no modifiers on '{skin.name}' are driven by the muscles")
+
+    full = np.empty((len(frames), count, 3), dtype=np.float32)
+    try:
+        for i, f in enumerate(frames):
+            scene.frame_set(f)
+            full[i] = _skin_coords(skin, context.evaluated_depsgraph_get(), count)
+    finally:
+        scene.frame_set(original)
+
+    bones, weights = _skin_weights(skin, arm)
+    rest_inv = np.array([np.array(arm.data.bones[n].matrix_local.inverted())[:3, :3] for n in bones],
+                        dtype=np.float32)
+    to_arm = np.array(arm.matrix_world.inverted() @ skin.matrix_world, dtype=np.float32)[:3, :3]
+    from_arm = np.linalg.inv(to_arm)
+
+    for m in others:
+        m.show_viewport = False
+    deltas = np.empty_like(full)
+    angles = np.zeros((len(frames), len(pairs)), dtype=np.float32)
+    try:
+        for i, f in enumerate(frames):
+            scene.frame_set(f)
+            depsgraph = context.evaluated_depsgraph_get()
+            base = _skin_coords(skin, depsgraph, count)
+            mats = np.array([np.array(arm.pose.bones[n].matrix)[:3, :3] for n in bones], dtype=np.float32)
+            mats = np.einsum('bij,bjk->bik', mats, rest_inv)
+            blended = np.einsum('vb,bij->vij', weights, mats)
+            # Unweighted vertices keep identity so their delta passes through
+            blended[weights.sum(axis=1) == 0] = np.eye(3, dtype=np.float32)
+            skin_mats = from_arm @ blended @ to_arm
+            deltas[i] = np.linalg.solve(skin_mats, (full[i] - base)[..., None])[..., 0]
+            if pairs:
+                angles[i] = _joint_angles(arm, pairs)
+    finally:
+        for m in others:
+            m.show_viewport = True
+        scene.frame_set(original)
+    return deltas, angles, pairs
+
+# ===================================================================
+# COMPRESSION (PCA) + POSE-SPACE FIT
+# ===================================================================
+def fit_correctives(deltas, angles, max_shapes=8, variance=0.99):
+    """Compress deltas to a few shapes and fit their weights to joint angles.
+
+    Returns dict(shapes [k x verts x 3], coef [(pairs+1) x k], mean, rms, max,
+    explained) where weight = coef[0] + sum(coef[j+1] * angle_j).
+    """
+    frames, count, _ = deltas.shape
+    data = deltas.reshape(frames, count * 3)
+    mean = data.mean(axis=0)
+    u, s, vt = np.linalg.svd(data - mean, full_matrices=False)
+    energy = np.cumsum(s ** 2) / max(float(np.sum(s ** 2)), 1e-12)
+    k = int(min(max_shapes, np.searchsorted(energy, variance) + 1, len(s)))
+    weights = u[:, :k] * s[:k]
+
+    # Normalize shapes so their weights stay in roughly [-1, 1]
+    scale = np.maximum(np.abs(weights).max(axis=0), 1e-8)
+    weights = weights / scale
+    shapes = vt[:k] * scale[:, None]
+
+    design = np.hstack([np.ones((frames, 1), dtype=np.float32), angles])
+    coef, *_ = np.linalg.lstsq(design, weights, rcond=None)
+    recon = mean + (design @ coef) @ shapes
+    err = np.linalg.norm((recon - data).reshape(frames, count, 3), axis=2)
+    return {
+        "shapes": shapes.reshape(k, count, 3),
+        "mean": mean.reshape(count, 3),
+        "coef": coef,
+        "rms": float(np.sqrt(np.mean(err ** 2))),
+        "max": float(err.max()) if err.size else 0.0,
+        "explained": float(energy[k - 1]) if k else 0.0,
+    }
+
+# ===================================================================
+# WRITE SHAPE KEYS + DRIVERS
+# ===================================================================
+CORRECTIVE_PREFIX = "MSL_Corrective"
+
+def write_correctives(skin, arm, fit, pairs):
+    """Replace the skin's corrective keys with the fitted shapes + drivers"""
+    if not skin.data.shape_keys:
+        skin.shape_key_add(name="Basis")
+    key = skin.data.shape_keys
+    for kb in [kb for kb in key.key_blocks if kb.name.startswith(CORRECTIVE_PREFIX)]:
+        skin.shape_key_remove(kb)
+
+    basis = np.empty(len(skin.data.vertices) * 3, dtype=np.float32)
+    key.reference_key.data.foreach_get("co", basis)
+    basis = basis.reshape(-1, 3)
+
+    # The mean offset is constant across poses; fold it into a rest key at 1.0
+    shapes = [("Mean", fit["mean"], None)] + [
+        (f"{i:02d}", shape, fit["coef"][:, i]) for i, shape in enumerate(fit["shapes"])]
+    for suffix, shape, coef in shapes:
+        kb = skin.shape_key_add(name=f"{CORRECTIVE_PREFIX}_{suffix}", from_mix=False)
+        kb.data.foreach_set("co", (basis + shape).ravel())
+        if coef is None:
+            kb.value = 1.0
+            continue
+        kb.slider_min, kb.slider_max = -10.0, 10.0
+        drv = kb.driver_add("value").driver
+        drv.type = 'SCRIPTED'
+        terms = [f"{coef[0]:.5f}"]
+        for j, (b1, b2) in enumerate(pairs):
+            if abs(coef[j + 1]) < 1e-5:
+                continue
+            var = drv.variables.new()
+            var.name = f"a{j}"
+            var.type = 'ROTATION_DIFF'
+            var.targets[0].id = arm
+            var.targets[0].bone_target = b1
+            var.targets[1].id = arm
+            var.targets[1].bone_target = b2
+            terms.append(f"{coef[j + 1]:.5f}*a{j}")
+        drv.expression = "+".join(terms).replace("+-", "-")
+    return len(shapes)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_bake_correctives(bpy.types.Operator):
+    """Bake the muscle system's effect on the skin into driven corrective shapes"""
+    bl_idname = "muscle.bake_correctives"
+    bl_label = "Bake Corrective Shapes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    frame_start: bpy.props.IntProperty(name="Start", default=1)
+    frame_end: bpy.props.IntProperty(name="End", default=250)
+    step: bpy.props.IntProperty(name="Step", default=1, min=1)
+    max_shapes: bpy.props.IntProperty(name="Max Shapes", default=8, min=1, max=64)
+    variance: bpy.props.FloatProperty(name="Variance Kept", default=0.99, min=0.5, max=1.0)
+
+    def execute(self, context):
+        arm = context.active_object
+        skin = next((o for o in context.selected_objects if o.type == 'MESH' and "Muscle_XID" not in o), None)
+        if not arm or arm.type != 'ARMATURE' or skin is None:
+            self.report({'ERROR'}, "Make the armature active and select the skin mesh")
+            return {'CANCELLED'}
+        if self.frame_end < self.frame_start:
+            self.report({'ERROR'}, "End frame is before the start frame")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        try:
+            deltas, angles, pairs = sample_muscle_deltas(context, skin, arm, self.frame_start,
+                                                         self.frame_end, self.step)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Corrective bake: {e}")
+            return {'CANCELLED'}
+        fit = fit_correctives(deltas, angles, self.max_shapes, self.variance)
+        written = write_correctives(skin, arm, fit, pairs)
+
+        raw_kb = deltas.nbytes / 1024.0
+        shape_kb = written * deltas.shape[1] * 3 * 4 / 1024.0
+        print(f"\nBlendArmory: Corrective bake on '{skin.name}' ({deltas.shape[0]} frames)")
+        print(f"  Shapes          {written} ({fit['explained'] * 100:.2f}% variance)")
+        print(f"  RMS error       {fit['rms']:.6f}")
+        print(f"  Max error       {fit['max']:.6f}")
+        print(f"  Size            {shape_kb:.1f} KB (sampled {raw_kb:.1f} KB)")
+        print(f"  Time            {time.perf_counter() - start:.2f}s")
+        self.report({'INFO'}, f"{written} corrective shapes, RMS {fit['rms']:.5f}, "
+                              f"max {fit['max']:.5f}, {shape_kb:.0f} KB")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_bake_correctives,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,335 @@
+# crowd.py — Muscle Crowds
+# BlendArmory Muscles 3.3 — Simulate one hero, instance a thousand
+
+import bpy
+import math
+import numpy as np
+from mathutils import Vector
+from .registry import muscles_of
+from .system_collections import find_layer_collection
+from .modifier_stack import input_id
+
+# ===================================================================
+# LAYOUT
+#   cycle   one excluded collection per hero armature, one object per
+#           baked frame; every muscle joined into one mesh in armature
+#           space, children sorted by frame so Pick Instance can index
+#   crowd   a point cloud (one point per agent: frame_offset, speed,
+#           yaw) instancing the cycle through a shared node group
+# An agent costs one point and one instance reference: no simulation,
+# no modifiers and no mesh of its own, whatever the crowd size.
+# ===================================================================
+CYCLE_KEY = "Muscle_Crowd_Cycle"      # on the cycle collection: hero armature name
+CROWD_KEY = "Muscle_Crowd"            # on the crowd object: hero armature name
+GROUP_NAME = "BlendArmory Crowd"
+MODIFIER_NAME = "Crowd"
+AGENT_ATTRIBUTES = ("frame_offset", "speed", "yaw")
+AGENT_BYTES = 12 + 4 * len(AGENT_ATTRIBUTES)     # position + one float per attribute
+
+# ===================================================================
+# BAKE THE HERO CYCLE
+# ===================================================================
+def crowd_cycle(arm):
+    """The baked cycle collection of arm, or None"""
+    return next((c for c in bpy.data.collections if c.get(CYCLE_KEY) == arm.name), None)
+
+def _hero_muscles(scene, arm):
+    return [m for m in muscles_of(scene, arm) if m.type == 'MESH' and not m.hide_viewport]
+
+def _topology(muscles, depsgraph):
+    """Joined loops, faces and material indices of the evaluated muscles"""
+    materials, loops, starts, totals, mat_idx, smooth = [], [], [], [], [], []
+    offset = corner = 0
+    for muscle in muscles:
+        mesh = muscle.evaluated_get(depsgraph).data
+        n_loops, n_faces = len(mesh.loops), len(mesh.polygons)
+        lv = np.empty(n_loops, dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", lv)
+        ls = np.empty(n_faces, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", ls)
+        lt = np.empty(n_faces, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", lt)
+        mi = np.empty(n_faces, dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", mi)
+        sm = np.empty(n_faces, dtype=bool)
+        mesh.polygons.foreach_get("use_smooth", sm)
+        lut = []
+        for mat in mesh.materials or [None]:
+            if mat not in materials:
+                materials.append(mat)
+            lut.append(materials.index(mat))
+        loops.append(lv + offset)
+        starts.append(ls + corner)
+        totals.append(lt)
+        mat_idx.append(np.asarray(lut, dtype=np.int32)[np.clip(mi, 0, len(lut) - 1)])
+        smooth.append(sm)
+        offset += len(mesh.vertices)
+        corner += n_loops
+    cat = lambda parts, dtype: np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+    return {"vertices": offset, "loops": cat(loops, np.int32), "starts": cat(starts, np.int32),
+            "totals": cat(totals, np.int32), "materials": materials,
+            "material_index": cat(mat_idx, np.int32), "smooth": cat(smooth, bool)}
+
+def _armature_coords(arm_eval, muscles, depsgraph):
+    """Evaluated muscle vertices, joined, in the armature's space"""
+    to_arm = arm_eval.matrix_world.inverted()
+    parts = []
+    for muscle in muscles:
+        ob = muscle.evaluated_get(depsgraph)
+        co = np.empty(len(ob.data.vertices) * 3, dtype=np.float32)
+        ob.data.vertices.foreach_get("co", co)
+        m = np.array(to_arm @ ob.matrix_world, dtype=np.float32)
+        parts.append(co.reshape(-1, 3) @ m[:3, :3].T + m[:3, 3])
+    return np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.float32)
+
+def _base_mesh(name, topo):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(topo["vertices"])
+    mesh.loops.add(len(topo["loops"]))
+    mesh.polygons.add(len(topo["starts"]))
+    mesh.loops.foreach_set("vertex_index", topo["loops"])
+    mesh.polygons.foreach_set("loop_start", topo["starts"])
+    mesh.polygons.foreach_set("loop_total", topo["totals"])
+    mesh.polygons.foreach_set("material_index", topo["material_index"])
+    mesh.polygons.foreach_set("use_smooth", topo["smooth"])
+    for mat in topo["materials"]:
+        mesh.materials.append(mat)
+    mesh.update(calc_edges=True)
+    return mesh
+
+def bake_cycle(context, arm, frame_start, frame_end):
+    """Bake arm's visible muscles over the range into a cycle collection
+    (replacing any previous one). Returns the collection, or None when the
+    arm has no muscles. ValueError if the muscles change topology."""
+    scene = context.scene
+    muscles = _hero_muscles(scene, arm)
+    if not muscles:
+        return None
+    remove_cycle(crowd_cycle(arm))
+    original = scene.frame_current
+    frames = range(frame_start, frame_end + 1)
+    coll = bpy.data.collections.new(f"{arm.name} Crowd Cycle")
+    coll[CYCLE_KEY] = arm.name
+    coll["frame_start"] = frame_start
+    scene.collection.children.link(coll)
+    try:
+        scene.frame_set(frame_start)
+        depsgraph = context.evaluated_depsgraph_get()
+        topo = _topology(muscles, depsgraph)
+        base = _base_mesh(f"{arm.name}_Cycle", topo)
+        for i, f in enumerate(frames):
+            scene.frame_set(f)
+            depsgraph = context.evaluated_depsgraph_get()
+            co = _armature_coords(arm.evaluated_get(depsgraph), muscles, depsgraph)
+            if len(co) != topo["vertices"]:
+                raise ValueError(f"muscle topology changes at frame {f}")
+            mesh = base if i == 0 else base.copy()
+            mesh.name = f"{arm.name}_Cycle_{i:04d}"
+            mesh.vertices.foreach_set("co", co.ravel())
+            mesh.update()
+            coll.objects.link(bpy.data.objects.new(mesh.name, mesh))
+    except ValueError:
+        remove_cycle(coll)
+        raise
+    finally:
+        scene.frame_set(original)
+    layer = find_layer_collection(context.view_layer.layer_collection, coll)
+    if layer:
+        layer.exclude = True    # only ever seen through instancing
+    return coll
+
+def remove_cycle(coll):
+    if coll is None:
+        return
+    for obj in list(coll.objects):
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    bpy.data.collections.remove(coll)
+
+# ===================================================================
+# INSTANCER
+# ===================================================================
+def crowd_group():
+    """Shared group: pick cycle frame floor(wrap((frame - start) * speed + offset)) per point"""
+    ng = bpy.data.node_groups.get(GROUP_NAME)
+    if ng is not None:
+        return ng
+    ng = bpy.data.node_groups.new(GROUP_NAME, 'GeometryNodeTree')
+    ng.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    ng.interface.new_socket("Cycle", in_out='INPUT', socket_type='NodeSocketCollection')
+    length = ng.interface.new_socket("Frames", in_out='INPUT', socket_type='NodeSocketFloat')
+    length.default_value, length.min_value = 1.0, 1.0
+    ng.interface.new_socket("Start", in_out='INPUT', socket_type='NodeSocketFloat')
+    ng.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes, links = ng.nodes, ng.links
+    gin = nodes.new("NodeGroupInput")
+    gin.location = (-900, 0)
+    info = nodes.new("GeometryNodeCollectionInfo")
+    info.transform_space = 'ORIGINAL'
+    info.inputs["Separate Children"].default_value = True
+    info.inputs["Reset Children"].default_value = True
+    info.location = (-600, 150)
+    links.new(gin.outputs["Cycle"], info.inputs["Collection"])
+
+    attrs = {}
+    for i, name in enumerate(AGENT_ATTRIBUTES):
+        attr = nodes.new("GeometryNodeInputNamedAttribute")
+        attr.data_type = 'FLOAT'
+        attr.inputs["Name"].default_value = name
+        attr.location = (-900, -150 - 120 * i)
+        attrs[name] = attr.outputs["Attribute"]
+    scene_time = nodes.new("GeometryNodeInputSceneTime")
+    scene_time.location = (-900, -520)
+
+    since = nodes.new("ShaderNodeMath")
+    since.operation = 'SUBTRACT'
+    since.location = (-700, -400)
+    links.new(scene_time.outputs["Frame"], since.inputs[0])
+    links.new(gin.outputs["Start"], since.inputs[1])
+    local = nodes.new("ShaderNodeMath")
+    local.operation = 'MULTIPLY_ADD'
+    local.location = (-600, -200)
+    links.new(since.outputs[0], local.inputs[0])
+    links.new(attrs["speed"], local.inputs[1])
+    links.new(attrs["frame_offset"], local.inputs[2])
+    wrap = nodes.new("ShaderNodeMath")
+    wrap.operation = 'WRAP'
+    wrap.location = (-400, -200)
+    links.new(local.outputs[0], wrap.inputs[0])
+    links.new(gin.outputs["Frames"], wrap.inputs[1])
+    wrap.inputs[2].default_value = 0.0
+    floor = nodes.new("ShaderNodeMath")
+    floor.operation = 'FLOOR'
+    floor.location = (-200, -200)
+    links.new(wrap.outputs[0], floor.inputs[0])
+    yaw = nodes.new("ShaderNodeCombineXYZ")
+    yaw.location = (-400, -400)
+    links.new(attrs["yaw"], yaw.inputs["Z"])
+
+    inst = nodes.new("GeometryNodeInstanceOnPoints")
+    inst.location = (0, 0)
+    inst.inputs["Pick Instance"].default_value = True
+    links.new(gin.outputs["Geometry"], inst.inputs["Points"])
+    links.new(info.outputs[0], inst.inputs["Instance"])
+    links.new(floor.outputs[0], inst.inputs["Instance Index"])
+    links.new(yaw.outputs[0], inst.inputs["Rotation"])
+    gout = nodes.new("NodeGroupOutput")
+    gout.location = (250, 0)
+    links.new(inst.outputs[0], gout.inputs[0])
+    return ng
+
+def agent_points(count, spacing=1.5, frames=1, speed=(1.0, 1.0), seed=0):
+    """(positions, {attribute: values}) for count agents on a square grid,
+    each starting at a random cycle frame with a random speed and heading."""
+    rng = np.random.default_rng(seed)
+    side = max(math.ceil(math.sqrt(count)), 1)
+    i = np.arange(count)
+    co = np.zeros((count, 3), dtype=np.float32)
+    co[:, 0] = (i % side - (side - 1) * 0.5) * spacing
+    co[:, 1] = (i // side - (side - 1) * 0.5) * spacing
+    values = {
+        "frame_offset": rng.uniform(0.0, frames, count).astype(np.float32),
+        "speed": rng.uniform(min(speed), max(speed), count).astype(np.float32),
+        "yaw": rng.uniform(-math.pi, math.pi, count).astype(np.float32),
+    }
+    return co, values
+
+def create_crowd(context, cycle, count, spacing=1.5, speed=(1.0, 1.0), seed=0, location=None):
+    """Point cloud object instancing cycle once per agent"""
+    frames = len(cycle.objects)
+    co, values = agent_points(count, spacing, frames, speed, seed)
+    mesh = bpy.data.meshes.new(f"{cycle[CYCLE_KEY]}_Crowd")
+    mesh.vertices.add(count)
+    mesh.vertices.foreach_set("co", co.ravel())
+    for name, v in values.items():
+        mesh.attributes.new(name, 'FLOAT', 'POINT').data.foreach_set("value", v)
+    mesh.update()
+    obj = bpy.data.objects.new(f"{cycle[CYCLE_KEY]} Crowd", mesh)
+    obj[CROWD_KEY] = cycle[CYCLE_KEY]
+    obj.location = location if location is not None else Vector()
+    context.collection.objects.link(obj)
+    ng = crowd_group()
+    mod = obj.modifiers.new(MODIFIER_NAME, 'NODES')
+    mod.node_group = ng
+    mod[input_id(ng, "Cycle")] = cycle
+    mod[input_id(ng, "Frames")] = float(frames)
+    mod[input_id(ng, "Start")] = float(cycle["frame_start"])
+    return obj
+
+def remove_crowd(obj):
+    mesh = obj.data
+    bpy.data.objects.remove(obj)
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_crowd_bake_cycle(bpy.types.Operator):
+    """Bake the active armature's muscles over the scene range into a cycle crowds can instance"""
+    bl_idname = "muscle.crowd_bake_cycle"
+    bl_label = "Bake Crowd Cycle"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.type == 'ARMATURE'
+
+    def execute(self, context):
+        scene, arm = context.scene, context.object
+        try:
+            coll = bake_cycle(context, arm, scene.frame_start, scene.frame_end)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Crowd cycle: {e}")
+            return {'CANCELLED'}
+        if coll is None:
+            self.report({'WARNING'}, f"{arm.name} has no visible mesh muscles")
+            return {'CANCELLED'}
+        verts = len(coll.objects[0].data.vertices) if coll.objects else 0
+        self.report({'INFO'}, f"Baked {len(coll.objects)} frames of {verts} vertices")
+        return {'FINISHED'}
+
+class MUSCLE_OT_crowd_create(bpy.types.Operator):
+    """Instance the active armature's baked cycle across agents at the 3D cursor"""
+    bl_idname = "muscle.crowd_create"
+    bl_label = "Create Muscle Crowd"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    agents: bpy.props.IntProperty(name="Agents", default=100, min=1, max=100000)
+    spacing: bpy.props.FloatProperty(name="Spacing", default=1.5, min=0.0, subtype='DISTANCE')
+    speed_min: bpy.props.FloatProperty(name="Speed Min", default=0.8, min=0.0, max=10.0)
+    speed_max: bpy.props.FloatProperty(name="Speed Max", default=1.2, min=0.0, max=10.0)
+    seed: bpy.props.IntProperty(name="Seed", default=0, min=0)
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.type == 'ARMATURE'
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        cycle = crowd_cycle(context.object)
+        if cycle is None or not cycle.objects:
+            self.report({'WARNING'}, "Bake a crowd cycle for this armature first")
+            return {'CANCELLED'}
+        create_crowd(context, cycle, self.agents, self.spacing, (self.speed_min, self.speed_max),
+                     self.seed, context.scene.cursor.location.copy())
+        self.report({'INFO'}, f"{self.agents} agents share {len(cycle.objects)} baked frames")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_crowd_bake_cycle, MUSCLE_OT_crowd_create)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
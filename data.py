@@ -111,6 +111,9 @@ PRESETS = {
     "Deltoid": {"verts": "BASIC", "bulge": 0.45, "length": 0.95, "tendon": 12, "type": "FLEXOR"},
     "Pectoral": {"verts": "BASIC", "bulge": 0.50, "length": 1.00, "tendon": 8, "type": "FLEXOR"},
     "Quad": {"verts": "STRIP", "bulge": 0.55, "length": 1.15, "tendon": 20, "type": "FLEXOR"},
+    "Hamstring": {"verts": "STRIP", "bulge": 0.45, "length": 1.10, "tendon": 18, "type": "EXTENSOR"},
+    "Calf": {"verts": "BASIC", "bulge": 0.48, "length": 0.90, "tendon": 14, "type": "EXTENSOR"},
+    "Lat": {"verts": "STRIP", "bulge": 0.30, "length": 1.20, "tendon": 10, "type": "EXTENSOR"},
 }
 
 NAMES = {
@@ -120,6 +123,7 @@ NAMES = {
     "musculatureName": " System",
     "mctrlName": "_ctrl",
     "vertexGroupName": "_jiggle",
+    "microGroupName": "_micro",
 }
 
 def register():
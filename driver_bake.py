@@ -0,0 +1,182 @@
+# driver_bake.py — Bake Muscle Drivers to F-Curves
+# BlendArmory Muscles 3.3 — Locked animation needs no drivers
+
+import bpy
+import numpy as np
+from .registry import all_muscles
+
+# ===================================================================
+# SETTINGS
+# ===================================================================
+BAKE_GROUP = "Baked Drivers"
+BAKED_KEY = "Muscle_Baked_Drivers"   # on the driven ID: ["path|index", ...]
+LINEAR = 1                            # Keyframe.interpolation enum value
+
+# ===================================================================
+# COLLECT
+# ===================================================================
+def muscle_driver_owners(muscle):
+    """IDs carrying the muscle's drivers: the object and its shape keys"""
+    owners = [muscle]
+    if muscle.type == 'MESH' and muscle.data.shape_keys:
+        owners.append(muscle.data.shape_keys)
+    return owners
+
+def live_drivers(owner):
+    anim = owner.animation_data
+    return [fc for fc in anim.drivers if not fc.mute] if anim else []
+
+# ===================================================================
+# BAKE
+# ===================================================================
+def decimate(values, tolerance):
+    """Indices of the keys needed to rebuild values with linear interpolation.
+
+    Ramer-Douglas-Peucker on one frame per sample: a span is split at its
+    worst sample until every sample is within tolerance of its segment.
+    """
+    n = len(values)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    spans = [(0, n - 1)]
+    while spans:
+        a, b = spans.pop()
+        if b - a < 2:
+            continue
+        line = values[a] + (values[b] - values[a]) * np.arange(1, b - a) / (b - a)
+        err = np.abs(values[a + 1:b] - line)
+        k = int(np.argmax(err))
+        if err[k] > tolerance:
+            m = a + 1 + k
+            keep[m] = True
+            spans += [(a, m), (m, b)]
+    return np.flatnonzero(keep)
+
+def _write_fcurve(owner, data_path, index, frames, values):
+    anim = owner.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{owner.name}_{BAKE_GROUP.replace(' ', '')}")
+    action = anim.action
+    fc = action.fcurves.find(data_path, index=index)
+    if fc is None:
+        fc = action.fcurves.new(data_path, index=index, action_group=BAKE_GROUP)
+    else:
+        fc.keyframe_points.clear()
+    fc.keyframe_points.add(len(frames))
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2], co[1::2] = frames, values
+    fc.keyframe_points.foreach_set("co", co)
+    fc.keyframe_points.foreach_set("interpolation", np.full(len(frames), LINEAR, dtype=np.int32))
+    fc.update()
+    return fc
+
+def bake_drivers(scene, muscles, frame_start, frame_end, tolerance=1e-4):
+    """Sample every live muscle driver over the range in one pass, write
+    decimated F-curves and mute the drivers. Returns (drivers, keys written)."""
+    if frame_end < frame_start:
+        raise ValueError(f"empty frame range {frame_start}-{frame_end}")
+    targets = []
+    for muscle in muscles:
+        for owner in muscle_driver_owners(muscle):
+            for fc in live_drivers(owner):
+                targets.append((owner, fc))
+    if not targets:
+        return 0, 0
+
+    frames = np.arange(frame_start, frame_end + 1, dtype=np.float32)
+    samples = np.empty((len(targets), len(frames)), dtype=np.float32)
+    original = scene.frame_current
+    for f, frame in enumerate(frames):
+        scene.frame_set(int(frame))
+        for t, (owner, fc) in enumerate(targets):
+            value = owner.path_resolve(fc.data_path)
+            samples[t, f] = value[fc.array_index] if hasattr(value, "__len__") else value
+    scene.frame_set(original)
+
+    keys = 0
+    for (owner, fc), values in zip(targets, samples):
+        idx = decimate(values, tolerance)
+        _write_fcurve(owner, fc.data_path, fc.array_index, frames[idx], values[idx])
+        fc.mute = True
+        baked = list(owner.get(BAKED_KEY, []))
+        baked.append(f"{fc.data_path}|{fc.array_index}")
+        owner[BAKED_KEY] = baked
+        keys += len(idx)
+    return len(targets), keys
+
+def unbake_drivers(muscles):
+    """Unmute drivers muted by bake_drivers and delete their baked F-curves"""
+    restored = 0
+    for muscle in muscles:
+        for owner in muscle_driver_owners(muscle):
+            baked = owner.get(BAKED_KEY)
+            anim = owner.animation_data
+            if not baked or anim is None:
+                continue
+            action = anim.action
+            for entry in baked:
+                path, index = entry.rsplit("|", 1)
+                drv = anim.drivers.find(path, index=int(index))
+                if drv:
+                    drv.mute = False
+                    restored += 1
+                fc = action.fcurves.find(path, index=int(index)) if action else None
+                if fc and fc.group and fc.group.name == BAKE_GROUP:
+                    action.fcurves.remove(fc)
+            if action and not action.fcurves and action.name.endswith(BAKE_GROUP.replace(' ', '')):
+                anim.action = None
+                if not action.users:
+                    bpy.data.actions.remove(action)
+            del owner[BAKED_KEY]
+    return restored
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_bake_drivers(bpy.types.Operator):
+    """Bake every muscle driver to keyframes over the scene range and mute the drivers"""
+    bl_idname = "muscle.bake_drivers"
+    bl_label = "Bake Muscle Drivers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tolerance: bpy.props.FloatProperty(name="Tolerance", default=0.0001, min=0.0, max=0.1, precision=5,
+                                       description="Drop keys this close to the line through their neighbours")
+
+    def execute(self, context):
+        scene = context.scene
+        try:
+            count, keys = bake_drivers(scene, all_muscles(scene), scene.frame_start, scene.frame_end,
+                                       self.tolerance)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Driver bake: {e}")
+            return {'CANCELLED'}
+        if not count:
+            self.report({'WARNING'}, "No live muscle drivers to bake")
+            return {'CANCELLED'}
+        frames = scene.frame_end - scene.frame_start + 1
+        self.report({'INFO'}, f"Baked {count} drivers to {keys} keys ({keys / (count * frames):.0%} of samples)")
+        return {'FINISHED'}
+
+class MUSCLE_OT_unbake_drivers(bpy.types.Operator):
+    """Remove baked driver keyframes and switch the muscle drivers back on"""
+    bl_idname = "muscle.unbake_drivers"
+    bl_label = "Restore Muscle Drivers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        restored = unbake_drivers(all_muscles(context.scene))
+        self.report({'INFO'}, f"Restored {restored} drivers")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_bake_drivers, MUSCLE_OT_unbake_drivers)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,234 @@
+# dynamics_sleep.py — Jiggle Sleeping
+# BlendArmory Muscles 3.3 — Still bones, sleeping soft bodies
+
+import bpy
+import numpy as np
+from .system import hook_bones
+from .registry import all_muscles
+from .driver_bake import decimate
+
+# ===================================================================
+# SLEEP SCHEDULE
+# A sleeping muscle keeps its soft body running (so the point cache keeps
+# stepping and it can wake at any frame) but with every vertex snapped to
+# its goal and self collision off, which skips nearly all integration.
+# Waking ramps the goal back down over a few frames instead of snapping.
+# Sleep is planned once over the scene range from the hook bones' motion
+# and written as keyframes on the soft body settings, so every frame's
+# state depends only on the animation, never on what was played before,
+# and nothing touches the settings during playback or render.
+# ===================================================================
+SLEEP_GOAL = 1.0
+WAKE_RATIO = 2.0         # wake threshold = sleep threshold * WAKE_RATIO (hysteresis)
+SAVED_KEY = "Jiggle_Sleep"
+SLEEP_GROUP = "Jiggle Sleep"
+LINEAR, CONSTANT = 1, 0  # Keyframe.interpolation enum values
+
+_LOG = {}                # scene pointer -> {frame: muscles asleep}
+
+def jiggle_of(muscle):
+    return next((m for m in muscle.modifiers if m.type == 'SOFT_BODY'), None)
+
+def is_scheduled(muscle):
+    return SAVED_KEY in muscle
+
+def _hook_points(muscle):
+    """World heads/tails of both hook bones plus their rest distance, or None"""
+    arm, b1, b2 = hook_bones(muscle)
+    if arm is None or b1 not in arm.pose.bones or b2 not in arm.pose.bones:
+        return None
+    mw = arm.matrix_world
+    p1, p2 = arm.pose.bones[b1], arm.pose.bones[b2]
+    points = [mw @ p1.head, mw @ p1.tail, mw @ p2.head, mw @ p2.tail]
+    return points, max((points[0] - points[2]).length, 1e-6)
+
+def sleep_weights(samples, threshold, settle, ramp):
+    """Per-frame sleep weight from consecutive hook samples: 1 asleep,
+    ramp_frames..1 / ramp_frames while waking, 0 awake"""
+    weights = np.zeros(len(samples), dtype=np.float32)
+    asleep, still, waking = False, 0, 0
+    for i in range(1, len(samples)):
+        (points, length), (previous, _) = samples[i], samples[i - 1]
+        # Fraction of the muscle's length travelled since the last frame
+        speed = max((a - b).length for a, b in zip(points, previous)) / length
+        if waking:
+            waking -= 1
+            asleep = waking > 0
+        elif asleep:
+            if speed > threshold * WAKE_RATIO:
+                still, waking = 0, max(ramp - 1, 0)
+                asleep = waking > 0
+        elif speed < threshold:
+            still += 1
+            asleep = still >= settle
+        else:
+            still = 0
+        weights[i] = waking / ramp if waking else float(asleep)
+    return weights
+
+def _write_keys(muscle, data_path, frames, values, interpolation):
+    anim = muscle.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{muscle.name}_{SLEEP_GROUP.replace(' ', '')}")
+    fc = anim.action.fcurves.new(data_path, action_group=SLEEP_GROUP)
+    fc.keyframe_points.add(len(frames))
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2], co[1::2] = frames, values
+    fc.keyframe_points.foreach_set("co", co)
+    fc.keyframe_points.foreach_set("interpolation", np.full(len(frames), interpolation, dtype=np.int32))
+    fc.update()
+
+def _animated(muscle, data_path):
+    anim = muscle.animation_data
+    return bool(anim and anim.action and anim.action.fcurves.find(data_path))
+
+def plan_sleep(scene):
+    """Sample the hook bones over the scene range (soft bodies off) and key
+    every muscle's sleep schedule. Returns {frame: muscles asleep}."""
+    clear_sleep(scene)
+    jobs = []
+    for muscle in all_muscles(scene):
+        sb = jiggle_of(muscle)
+        if sb is None or sb.point_cache.is_baked or hook_bones(muscle)[0] is None:
+            continue
+        paths = (sb.settings.path_from_id("goal_min"), sb.settings.path_from_id("use_self_collision"))
+        if not any(_animated(muscle, path) for path in paths):   # leave hand-keyed settings alone
+            jobs.append((muscle, sb, paths))
+
+    frames = np.arange(scene.frame_start, scene.frame_end + 1)
+    samples = {m.name: [] for m, _, _ in jobs}
+    shown = {m.name: sb.show_viewport for m, sb, _ in jobs}
+    original = scene.frame_current
+    try:
+        for _, sb, _ in jobs:
+            sb.show_viewport = False
+        for f in frames:
+            scene.frame_set(int(f))
+            for muscle, _, _ in jobs:
+                samples[muscle.name].append(_hook_points(muscle))
+    finally:
+        for muscle, sb, _ in jobs:
+            sb.show_viewport = shown[muscle.name]
+        scene.frame_set(original)
+
+    asleep = np.zeros(len(frames), dtype=np.int32)
+    for muscle, sb, (goal_path, collide_path) in jobs:
+        sample = samples[muscle.name]
+        if len(sample) < 2 or any(s is None for s in sample):
+            continue
+        w = sleep_weights(sample, scene.Muscle_Sleep_Threshold, scene.Muscle_Sleep_Frames,
+                          scene.Muscle_Wake_Frames)
+        if not w.any():
+            continue
+        s = sb.settings
+        muscle[SAVED_KEY] = {"goal_min": s.goal_min, "self_collision": s.use_self_collision}
+        goal = s.goal_min + (SLEEP_GOAL - s.goal_min) * w
+        keep = decimate(goal, 0.0)
+        _write_keys(muscle, goal_path, frames[keep], goal[keep], LINEAR)
+        if s.use_self_collision:
+            collide = (w == 0).astype(np.float32)
+            keep = np.concatenate(([0], np.flatnonzero(np.diff(collide)) + 1))
+            _write_keys(muscle, collide_path, frames[keep], collide[keep], CONSTANT)
+        asleep += w == 1.0
+
+    log = {int(f): int(n) for f, n in zip(frames, asleep)}
+    _LOG[scene.as_pointer()] = log
+    return log
+
+def clear_sleep(scene):
+    """Delete the sleep keyframes and restore the saved soft body settings"""
+    for muscle in all_muscles(scene):
+        if not is_scheduled(muscle):
+            continue
+        saved = muscle[SAVED_KEY]
+        sb = jiggle_of(muscle)
+        anim = muscle.animation_data
+        action = anim.action if anim else None
+        if sb:
+            for attr in ("goal_min", "use_self_collision"):
+                fc = action.fcurves.find(sb.settings.path_from_id(attr)) if action else None
+                if fc and fc.group and fc.group.name == SLEEP_GROUP:
+                    action.fcurves.remove(fc)
+            sb.settings.goal_min = saved["goal_min"]
+            sb.settings.use_self_collision = bool(saved["self_collision"])
+        if action and not action.fcurves and action.name.endswith(SLEEP_GROUP.replace(' ', '')):
+            anim.action = None
+            if not action.users:
+                bpy.data.actions.remove(action)
+        del muscle[SAVED_KEY]
+    _LOG.pop(scene.as_pointer(), None)
+
+def sleep_log(scene):
+    """{frame: muscles asleep} from the last plan"""
+    return _LOG.get(scene.as_pointer(), {})
+
+def update_muscle_sleep(self, context):
+    if self.Muscle_Sleep:
+        plan_sleep(self)
+    else:
+        clear_sleep(self)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_sleep_plan(bpy.types.Operator):
+    """Re-plan jiggle sleeping over the scene frame range with the current settings"""
+    bl_idname = "muscle.sleep_plan"
+    bl_label = "Plan Jiggle Sleep"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        if not scene.Muscle_Sleep:
+            self.report({'WARNING'}, "Enable Jiggle Sleeping first")
+            return {'CANCELLED'}
+        log = plan_sleep(scene)
+        peak = max(log.values(), default=0)
+        self.report({'INFO'}, f"Sleep planned over {len(log)} frames, up to {peak} muscles asleep")
+        return {'FINISHED'}
+
+class MUSCLE_OT_sleep_report(bpy.types.Operator):
+    """Print how many muscles sleep on each frame of the planned range"""
+    bl_idname = "muscle.sleep_report"
+    bl_label = "Muscle Sleep Report"
+
+    def execute(self, context):
+        log = sleep_log(context.scene)
+        if not log:
+            self.report({'ERROR'}, "Enable Sleeping first")
+            return {'CANCELLED'}
+        total = len(all_muscles(context.scene))
+        print(f"\nBlendArmory: Muscles asleep per frame ({total} muscles)")
+        for frame in sorted(log):
+            print(f"  {frame:>6}  {log[frame]:>4}")
+        mean = sum(log.values()) / len(log)
+        self.report({'INFO'}, f"{mean:.1f} of {total} muscles asleep on average over {len(log)} frames")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_sleep_plan, MUSCLE_OT_sleep_report)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.Muscle_Sleep = bpy.props.BoolProperty(
+        name="Sleeping", default=False, update=update_muscle_sleep,
+        description="Freeze the jiggle of muscles whose bones are not moving")
+    bpy.types.Scene.Muscle_Sleep_Threshold = bpy.props.FloatProperty(
+        name="Threshold", default=0.002, min=0.0, max=0.1, precision=4,
+        description="Bone motion per frame, as a fraction of muscle length, below which a muscle is still")
+    bpy.types.Scene.Muscle_Sleep_Frames = bpy.props.IntProperty(
+        name="Settle Frames", default=8, min=1, max=100,
+        description="Still frames before a muscle falls asleep (lets the jiggle die out)")
+    bpy.types.Scene.Muscle_Wake_Frames = bpy.props.IntProperty(
+        name="Wake Frames", default=4, min=0, max=50,
+        description="Frames over which a waking muscle blends back to full jiggle")
+
+def unregister():
+    for prop in ("Muscle_Sleep", "Muscle_Sleep_Threshold", "Muscle_Sleep_Frames", "Muscle_Wake_Frames"):
+        if hasattr(bpy.types.Scene, prop):
+            delattr(bpy.types.Scene, prop)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,137 @@
+# geometry.py — Vectorized Mesh Helpers (NumPy)
+# BlendArmory Muscles 3.3 — One foreach_get, no per-vertex Python loops
+
+import numpy as np
+from mathutils import Matrix
+
+def mesh_coords(mesh):
+    """Vertex coordinates of mesh as an (N, 3) float32 array"""
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+def principal_axis(co):
+    """PCA of a point cloud: (center, unit axis, projections along the axis)"""
+    center = co.mean(axis=0)
+    centered = co - center
+    # Largest eigenvector of the 3x3 covariance is the muscle's long axis
+    _, vecs = np.linalg.eigh(centered.T @ centered)
+    axis = vecs[:, -1]
+    return center, axis, centered @ axis
+
+def axial_param(co, axis=None):
+    """Normalized 0..1 position of each vertex along the muscle axis"""
+    if axis is None:
+        _, _, proj = principal_axis(co)
+    else:
+        proj = co @ np.asarray(axis, dtype=np.float32)
+    lo, hi = proj.min(), proj.max()
+    return (proj - lo) / max(float(hi - lo), 1e-8)
+
+def align_axis(co, axis, target=(0.0, 0.0, 1.0)):
+    """co rotated about the origin so that axis points along target"""
+    a = np.asarray(axis, dtype=np.float64)
+    b = np.asarray(target, dtype=np.float64)
+    a, b = a / np.linalg.norm(a), b / np.linalg.norm(b)
+    v, c = np.cross(a, b), float(a @ b)
+    if np.linalg.norm(v) < 1e-8:
+        if c > 0.0:
+            return np.asarray(co, dtype=np.float32).copy()
+        # Half turn about any axis perpendicular to a
+        p = np.cross(a, (1.0, 0.0, 0.0) if abs(a[0]) < 0.9 else (0.0, 1.0, 0.0))
+        p /= np.linalg.norm(p)
+        rot = 2.0 * np.outer(p, p) - np.eye(3)
+    else:
+        k = np.array([[0.0, -v[2], v[1]], [v[2], 0.0, -v[0]], [-v[1], v[0], 0.0]])
+        rot = np.eye(3) + k + k @ k / (1.0 + c)
+    return (np.asarray(co, dtype=np.float64) @ rot.T).astype(np.float32)
+
+def smoothstep(x):
+    x = np.clip(x, 0.0, 1.0)
+    return x * x * (3.0 - 2.0 * x)
+
+def attachment_weights(t, end=0.25, jiggle_goal=0.2):
+    """Origin, insertion and jiggle-goal weights from axial params t.
+
+    t runs 0 at the origin end to 1 at the insertion end. Origin and
+    insertion fade out smoothly over the last `end` of the length; the soft
+    body goal is 1 at both ends and drops to jiggle_goal mid-belly.
+    """
+    t = np.asarray(t, dtype=np.float32)
+    origin = smoothstep(1.0 - t / end)
+    insertion = smoothstep(1.0 - (1.0 - t) / end)
+    jiggle = jiggle_goal + (1.0 - jiggle_goal) * (2.0 * t - 1.0) ** 2
+    return origin, insertion, jiggle
+
+def belly_weights(jiggle):
+    """Belly falloff from jiggle-goal weights: 0 where the goal is highest
+    (the tendon ends), 1 where it is lowest (mid-belly)."""
+    jiggle = np.asarray(jiggle, dtype=np.float32)
+    if not len(jiggle):
+        return jiggle
+    lo, hi = float(jiggle.min()), float(jiggle.max())
+    return (hi - jiggle) / max(hi - lo, 1e-8)
+
+def group_weights(obj, names=None, default=0.0):
+    """Weights of obj's vertex groups as a (verts, len(names)) array.
+
+    names defaults to every group; a single name gives one weight per
+    vertex. Vertices outside a group (or groups that don't exist) get
+    default. Deform weights have no foreach_get, so the memberships are
+    gathered in one flat pass and scattered into the array by NumPy.
+    """
+    groups = obj.vertex_groups
+    single = isinstance(names, str)
+    names = [names] if single else [vg.name for vg in groups] if names is None else list(names)
+    weights = np.full((len(obj.data.vertices), len(names)), default, dtype=np.float32)
+    column = np.full(len(groups) + 1, -1, dtype=np.int64)
+    for i, name in enumerate(names):
+        vg = groups.get(name)
+        if vg is not None:
+            column[vg.index] = i
+    if (column >= 0).any():
+        entries = np.array([(v.index, g.group, g.weight) for v in obj.data.vertices for g in v.groups],
+                           dtype=np.float64).reshape(-1, 3)
+        vert = entries[:, 0].astype(np.int64)
+        col = column[np.minimum(entries[:, 1].astype(np.int64), len(groups))]
+        keep = col >= 0
+        weights[vert[keep], col[keep]] = entries[keep, 2]
+    return weights[:, 0] if single else weights
+
+def nearest(co, point, count=1):
+    """Indices of the count vertices closest to point, nearest first"""
+    d = np.einsum('ij,ij->i', co - point, co - point)
+    count = min(count, len(d))
+    idx = np.argpartition(d, count - 1)[:count]
+    return idx[np.argsort(d[idx])]
+
+def world_matrix(obj):
+    """obj.matrix_world rebuilt from the parent chain.
+
+    matrix_world lags behind objects created or moved in the same operator
+    until the depsgraph runs; this is always current.
+    """
+    if obj.parent:
+        parent = world_matrix(obj.parent)
+        if obj.parent_type == 'BONE' and obj.parent_bone:
+            pb = obj.parent.pose.bones[obj.parent_bone]
+            parent = parent @ pb.matrix @ Matrix.Translation((0.0, pb.length, 0.0))
+        return parent @ obj.matrix_parent_inverse @ obj.matrix_basis
+    return obj.matrix_basis.copy()
+
+def write_group_weights(vg, weights, levels=20, threshold=0.0, replace=True):
+    """Replace vg's weights with weights (one per vertex) in a few batched calls.
+
+    Weights are quantized to levels steps so the whole group is written
+    with at most levels vertex_groups.add() calls instead of one per vertex.
+    Pass replace=False for a freshly created group. Returns the number of
+    vertices written.
+    """
+    weights = np.asarray(weights, dtype=np.float32)
+    if replace:
+        vg.remove(list(range(len(weights))))
+    steps = np.round(np.clip(weights, 0.0, 1.0) * levels).astype(np.int32)
+    steps[weights <= threshold] = 0
+    for level in np.unique(steps[steps > 0]):
+        vg.add(np.flatnonzero(steps == level).tolist(), float(level) / levels, 'REPLACE')
+    return int(np.count_nonzero(steps))
@@ -0,0 +1,358 @@
+# jiggle_cache.py — Compressed Jiggle Caches
+# BlendArmory Muscles 3.3 — Only the jiggle, quantized, chunked, shareable
+
+import os
+import bpy
+import zlib
+import struct
+import numpy as np
+from bpy.app.handlers import persistent
+from .data import NAMES
+from .registry import all_muscles
+from .modifier_stack import order_stack, register_group_rank, input_id, PLAYBACK_RANK
+from .sparse_keys import sparse_group
+from .dynamics_sleep import jiggle_of
+from .geometry import group_weights
+
+# ===================================================================
+# FILE FORMAT (.bajc, one per muscle, little-endian, read-only once baked)
+#   header   magic, version, jiggle verts, mesh verts, frame start,
+#            frames, frames per chunk, chunks
+#   int32    jiggle vertex indices
+#   table    per chunk: byte offset, byte size, dequantization scale
+#   chunks   zlib(int16 [frames, verts, 3]), frame-differenced in place
+# A frame's deltas (dynamic minus non-dynamic pose, end of stack, local
+# space) cost one seek and one chunk decompression, so any number of
+# render processes can read the same file for different frames.
+# ===================================================================
+MAGIC = b"BAJC"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIiIII")
+CHUNK = struct.Struct("<QIf")
+CHUNK_FRAMES = 16
+QMAX = 32767
+GOAL_CUTOFF = 0.999      # goal weight at or above this does not jiggle
+EXTENSION = ".bajc"
+
+CACHE_KEY = "Jiggle_Cache"            # on the muscle: {"path", "viewport", "render"}
+GROUP_NAME = "BlendArmory Jiggle Cache"
+MODIFIER_NAME = "Jiggle Cache"
+ATTR_NAME = "jiggle_cache"
+
+_READERS = {}            # absolute path -> JiggleCacheReader
+_SHOWN = {}              # muscle pointer -> (path, frame) in its attribute
+
+# ===================================================================
+# WRITE / READ
+# ===================================================================
+def jiggle_indices(muscle):
+    """Vertices the soft body moves: below full goal weight in the jiggle group"""
+    if NAMES["vertexGroupName"] not in muscle.vertex_groups:
+        return np.arange(len(muscle.data.vertices), dtype=np.int32)
+    goal = group_weights(muscle, NAMES["vertexGroupName"], default=1.0)
+    return np.flatnonzero(goal < GOAL_CUTOFF).astype(np.int32)
+
+class JiggleCacheWriter:
+    """Streams frames into a cache file: each chunk is quantized and
+    appended as soon as it is full, the chunk table is patched on close."""
+
+    def __init__(self, path, idx, vertex_count, frame_start, frames, chunk_frames=CHUNK_FRAMES, level=6):
+        self.path, self.chunk_frames, self.level = path, chunk_frames, level
+        self.count = len(idx)
+        self.table = []
+        self._block = np.empty((chunk_frames, self.count, 3), dtype=np.float32)
+        self._filled = 0
+        chunks = -(-frames // chunk_frames)
+        self._table_at = HEADER.size + self.count * 4
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.count, vertex_count, frame_start,
+                                frames, chunk_frames, chunks))
+            f.write(np.asarray(idx).astype("<i4").tobytes())
+            f.write(bytes(CHUNK.size * chunks))
+            self._offset = f.tell()
+
+    def add(self, delta):
+        """Append one frame's (len(idx), 3) deltas"""
+        self._block[self._filled] = delta
+        self._filled += 1
+        if self._filled == self.chunk_frames:
+            self._flush()
+
+    def _flush(self):
+        if not self._filled:
+            return
+        block = self._block[:self._filled]
+        scale = max(float(np.abs(block).max()), 1e-9) / QMAX
+        q = np.round(block / scale).astype(np.int16)
+        q[1:] = np.diff(q, axis=0)       # wraps in int16; cumsum on read wraps back
+        data = zlib.compress(q.tobytes(), self.level)
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self.table.append(CHUNK.pack(self._offset, len(data), scale))
+        self._offset += len(data)
+        self._filled = 0
+
+    def close(self):
+        """Write the last partial chunk and the table; returns the file size"""
+        self._flush()
+        with open(self.path, "r+b") as f:
+            f.seek(self._table_at)
+            f.write(b"".join(self.table))
+        return self._offset
+
+def write_cache(path, idx, vertex_count, frame_start, deltas, chunk_frames=CHUNK_FRAMES, level=6):
+    """Quantize deltas [frames, len(idx), 3] per chunk and write the file"""
+    writer = JiggleCacheWriter(path, idx, vertex_count, frame_start, len(deltas), chunk_frames, level)
+    for delta in deltas:
+        writer.add(delta)
+    return writer.close()
+
+class JiggleCacheReader:
+    """Random access to one cache file; keeps the last decoded chunk"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            (magic, version, count, self.vertex_count, self.frame_start, self.frames,
+             self.chunk_frames, chunks) = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version > VERSION:
+                raise ValueError(f"{path} is not a jiggle cache this add-on can read")
+            self.idx = np.frombuffer(f.read(count * 4), dtype="<i4")
+            self.table = [CHUNK.unpack(f.read(CHUNK.size)) for _ in range(chunks)]
+        self._chunk = (None, None)
+
+    def chunk(self, c):
+        if self._chunk[0] != c:
+            offset, size, scale = self.table[c]
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                q = np.frombuffer(zlib.decompress(f.read(size)), dtype=np.int16)
+            q = np.cumsum(q.reshape(-1, len(self.idx), 3), axis=0, dtype=np.int16)
+            self._chunk = (c, q.astype(np.float32) * scale)
+        return self._chunk[1]
+
+    def frame(self, frame):
+        """(M, 3) deltas of the jiggle vertices at frame, or None outside the cache"""
+        i = int(frame) - self.frame_start
+        if not 0 <= i < self.frames:
+            return None
+        return self.chunk(i // self.chunk_frames)[i % self.chunk_frames]
+
+def reader(path):
+    path = bpy.path.abspath(path)
+    r = _READERS.get(path)
+    if r is None:
+        r = _READERS[path] = JiggleCacheReader(path)
+    return r
+
+# ===================================================================
+# BAKE
+# ===================================================================
+def _local_coords(muscle, depsgraph, idx):
+    mesh = muscle.evaluated_get(depsgraph).data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)[idx]
+
+def bake_jiggle_cache(context, muscles, directory, frame_start, frame_end, chunk_frames=CHUNK_FRAMES):
+    """Two passes over the range and one file per muscle of the difference.
+
+    The static pass (dynamics off) is kept in memory; the dynamic pass is
+    streamed, each chunk written as soon as its frames are sampled.
+    Returns {muscle name: (path, bytes)}."""
+    scene = context.scene
+    depsgraph = context.evaluated_depsgraph_get()
+    jobs = []
+    for muscle in muscles:
+        sb = jiggle_of(muscle)
+        if sb is None or CACHE_KEY in muscle \
+                or len(muscle.evaluated_get(depsgraph).data.vertices) != len(muscle.data.vertices):
+            continue    # no dynamics, already cached, or a topology-changing stack
+        idx = jiggle_indices(muscle)
+        if len(idx):
+            jobs.append((muscle, sb, idx))
+    if not jobs:
+        return {}
+
+    frames = range(frame_start, frame_end + 1)
+    directory = bpy.path.abspath(directory)
+    os.makedirs(directory, exist_ok=True)
+    paths = {m.name: os.path.join(directory, bpy.path.clean_name(m.name) + EXTENSION) for m, _, _ in jobs}
+    static = {m.name: np.empty((len(frames), len(idx), 3), dtype=np.float32) for m, _, idx in jobs}
+    shown = {m.name: sb.show_viewport for m, sb, _ in jobs}
+    original = scene.frame_current
+    writers = {}
+    try:
+        for _, sb, _ in jobs:
+            sb.show_viewport = False
+        for i, f in enumerate(frames):
+            scene.frame_set(f)
+            depsgraph = context.evaluated_depsgraph_get()
+            for muscle, _, idx in jobs:
+                static[muscle.name][i] = _local_coords(muscle, depsgraph, idx)
+
+        for muscle, sb, idx in jobs:
+            sb.show_viewport = True
+            writers[muscle.name] = JiggleCacheWriter(paths[muscle.name], idx, len(muscle.data.vertices),
+                                                     frame_start, len(frames), chunk_frames)
+        for i, f in enumerate(frames):
+            scene.frame_set(f)
+            depsgraph = context.evaluated_depsgraph_get()
+            for muscle, _, idx in jobs:
+                writers[muscle.name].add(_local_coords(muscle, depsgraph, idx) - static[muscle.name][i])
+        written = {name: (paths[name], w.close()) for name, w in writers.items()}
+    except Exception:
+        for name in writers:
+            if os.path.exists(paths[name]):
+                os.remove(paths[name])
+        raise
+    finally:
+        for muscle, sb, _ in jobs:
+            sb.show_viewport = shown[muscle.name]
+        scene.frame_set(original)
+        for path in paths.values():
+            _READERS.pop(path, None)
+    return written
+
+# ===================================================================
+# PLAYBACK (soft body off, cached deltas added at the end of the stack)
+# Geometry nodes cannot read the cache file, so each frame's deltas go
+# into one point attribute. That is the only ID write: it happens once
+# per muscle per new frame (never again for the frame already shown),
+# tags the mesh instead of rebuilding it, and renders lock the interface
+# so the write cannot race the render thread. No soft body is live on a
+# cached muscle, so no point cache is reset by it.
+# ===================================================================
+def attach_cache(context, muscle, path):
+    sb = jiggle_of(muscle)
+    if sb is None:
+        return False
+    if CACHE_KEY in muscle:
+        detach_cache(context, muscle)
+    muscle[CACHE_KEY] = {"path": bpy.path.relpath(path) if bpy.data.filepath else path,
+                         "viewport": sb.show_viewport, "render": sb.show_render}
+    sb.show_viewport = sb.show_render = False
+    context.scene.render.use_lock_interface = True
+    if ATTR_NAME not in muscle.data.attributes:
+        muscle.data.attributes.new(ATTR_NAME, 'FLOAT_VECTOR', 'POINT')
+    ng = sparse_group(GROUP_NAME)
+    mod = muscle.modifiers.get(MODIFIER_NAME) or muscle.modifiers.new(MODIFIER_NAME, 'NODES')
+    mod.node_group = ng
+    mod[input_id(ng, "Attribute")] = ATTR_NAME
+    mod[input_id(ng, "Value")] = 1.0
+    order_stack(context, muscle)
+    show_frame(muscle, context.scene.frame_current)
+    return True
+
+def detach_cache(context, muscle):
+    saved = muscle.get(CACHE_KEY)
+    if saved is None:
+        return
+    sb = jiggle_of(muscle)
+    if sb:
+        sb.show_viewport, sb.show_render = bool(saved["viewport"]), bool(saved["render"])
+    mod = muscle.modifiers.get(MODIFIER_NAME)
+    if mod:
+        muscle.modifiers.remove(mod)
+    attr = muscle.data.attributes.get(ATTR_NAME)
+    if attr:
+        muscle.data.attributes.remove(attr)
+    _READERS.pop(bpy.path.abspath(saved["path"]), None)
+    _SHOWN.pop(muscle.as_pointer(), None)
+    del muscle[CACHE_KEY]
+
+def show_frame(muscle, frame):
+    attr = muscle.data.attributes.get(ATTR_NAME)
+    if attr is None:
+        return
+    path = muscle[CACHE_KEY]["path"]
+    if _SHOWN.get(muscle.as_pointer()) == (path, frame):
+        return
+    try:
+        r = reader(path)
+    except (OSError, ValueError):
+        return
+    dense = np.zeros((len(muscle.data.vertices), 3), dtype=np.float32)
+    delta = r.frame(frame)
+    if delta is not None and r.vertex_count == len(dense):
+        dense[r.idx] = delta
+    attr.data.foreach_set("vector", dense.ravel())
+    muscle.data.update_tag()
+    _SHOWN[muscle.as_pointer()] = (path, frame)
+
+@persistent
+def jiggle_cache_frame(scene, depsgraph=None):
+    for muscle in all_muscles(scene):
+        if CACHE_KEY in muscle:
+            show_frame(muscle, scene.frame_current)
+
+@persistent
+def jiggle_cache_load_post(dummy):
+    _READERS.clear()
+    _SHOWN.clear()
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_jiggle_cache_bake(bpy.types.Operator):
+    """Bake every muscle's jiggle to compressed cache files and play them back instead of simulating"""
+    bl_idname = "muscle.jiggle_cache_bake"
+    bl_label = "Bake Jiggle Cache"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: bpy.props.StringProperty(name="Directory", default="//jiggle_cache/", subtype='DIR_PATH')
+    chunk_frames: bpy.props.IntProperty(name="Frames per Chunk", default=CHUNK_FRAMES, min=1, max=256,
+                                        description="Frames decompressed together; smaller reads less per frame")
+
+    def execute(self, context):
+        scene = context.scene
+        written = bake_jiggle_cache(context, all_muscles(scene), self.directory,
+                                    scene.frame_start, scene.frame_end, self.chunk_frames)
+        if not written:
+            self.report({'WARNING'}, "No uncached muscles with jiggle to bake")
+            return {'CANCELLED'}
+        for name, (path, _) in written.items():
+            attach_cache(context, bpy.data.objects[name], path)
+        size = sum(b for _, b in written.values())
+        self.report({'INFO'}, f"Cached {len(written)} muscles in {size / 1048576:.2f} MB")
+        return {'FINISHED'}
+
+class MUSCLE_OT_jiggle_cache_clear(bpy.types.Operator):
+    """Stop playing jiggle caches and simulate again (files are kept)"""
+    bl_idname = "muscle.jiggle_cache_clear"
+    bl_label = "Clear Jiggle Cache"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        muscles = [m for m in all_muscles(context.scene) if CACHE_KEY in m]
+        for muscle in muscles:
+            detach_cache(context, muscle)
+        self.report({'INFO'}, f"{len(muscles)} muscles simulate again")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_jiggle_cache_bake, MUSCLE_OT_jiggle_cache_clear)
+
+_HANDLERS = (
+    (bpy.app.handlers.frame_change_pre, jiggle_cache_frame),
+    (bpy.app.handlers.load_post, jiggle_cache_load_post),
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    register_group_rank(GROUP_NAME, PLAYBACK_RANK)
+    for handlers, fn in _HANDLERS:
+        handlers.append(fn)
+
+def unregister():
+    for handlers, fn in _HANDLERS:
+        if fn in handlers:
+            handlers.remove(fn)
+    register_group_rank(GROUP_NAME)
+    _READERS.clear()
+    _SHOWN.clear()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
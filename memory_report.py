@@ -0,0 +1,249 @@
+# memory_report.py — Muscle System Memory Accounting
+# BlendArmory Muscles 3.3 — Know which muscle ate the render node
+
+import bpy
+import re
+import sys
+import json
+import numpy as np
+from .geometry import group_weights
+from .pins import pin_objects
+from .sparse_keys import ATTR_PREFIX, sparse_bytes
+
+# ===================================================================
+# SIZES (bytes, matching Blender's in-memory layouts)
+# ===================================================================
+CO = 12                  # float3 position / shape key point
+EDGE = 8                 # int2 vertex pair
+CORNER = 8               # corner vertex + corner edge
+FACE = 4                 # face offset
+DEFORM_VERT = 16         # MDeformVert per vertex of a mesh with groups
+DEFORM_WEIGHT = 8        # MDeformWeight per (vertex, group) entry
+OBJECT = 1536            # one Object datablock (approx.), counted per pin empty
+ATTRIBUTE_SIZES = {
+    'FLOAT': 4, 'INT': 4, 'BOOLEAN': 1, 'INT8': 1, 'FLOAT2': 8, 'INT32_2D': 8,
+    'FLOAT_VECTOR': 12, 'FLOAT_COLOR': 16, 'BYTE_COLOR': 4, 'QUATERNION': 16,
+    'FLOAT4X4': 64, 'STRING': 8,
+}
+COLUMNS = ("mesh", "shape_keys", "vertex_groups", "point_cache", "pins")
+_UNITS = {"B": 1, "KB": 1e3, "MB": 1e6, "GB": 1e9, "KIB": 1024, "MIB": 1024 ** 2, "GIB": 1024 ** 3}
+
+# ===================================================================
+# MEASURE
+# ===================================================================
+def mesh_bytes(mesh):
+    """Geometry and generic attributes; packed shape key attributes excluded"""
+    total = (len(mesh.vertices) * CO + len(mesh.edges) * EDGE
+             + len(mesh.loops) * CORNER + len(mesh.polygons) * FACE)
+    domains = {'POINT': len(mesh.vertices), 'EDGE': len(mesh.edges),
+               'CORNER': len(mesh.loops), 'FACE': len(mesh.polygons)}
+    for attr in mesh.attributes:
+        if attr.name == "position" or attr.name.startswith((".", ATTR_PREFIX)):
+            continue
+        total += domains.get(attr.domain, 0) * ATTRIBUTE_SIZES.get(attr.data_type, 4)
+    return total
+
+def shape_key_bytes(mesh):
+    """Shape key points, or sparse deltas plus their dense attributes"""
+    key = mesh.shape_keys
+    total = len(key.key_blocks) * len(mesh.vertices) * CO if key else 0
+    packed = [a for a in mesh.attributes if a.name.startswith(ATTR_PREFIX)]
+    return total + len(packed) * len(mesh.vertices) * CO + sparse_bytes(mesh)
+
+def group_entries(obj):
+    """{vertex group name: number of weighted vertices} in one pass"""
+    members = ~np.isnan(group_weights(obj, default=np.nan))
+    return dict(zip(obj.vertex_groups.keys(), np.count_nonzero(members, axis=0).tolist()))
+
+def cache_bytes(obj):
+    """(bytes, info) of the soft body point cache held in memory"""
+    total, infos = 0, []
+    for mod in obj.modifiers:
+        if mod.type != 'SOFT_BODY':
+            continue
+        cache = mod.point_cache
+        infos.append(cache.info)
+        if cache.use_disk_cache:
+            continue
+        m = re.search(r"([\d.]+)\s*([KMG]?i?B)\b", cache.info, re.IGNORECASE)
+        if m:
+            total += int(float(m.group(1)) * _UNITS[m.group(2).upper()])
+    return total, "; ".join(i for i in infos if i)
+
+def muscle_usage(obj):
+    mesh = obj.data
+    cache, info = cache_bytes(obj)
+    entries = group_entries(obj)
+    pins = {p.name for p in pin_objects(obj)}
+    pin_weights = sum(n for name, n in entries.items() if name in pins)
+    row = {
+        "name": obj.name,
+        "armature": obj.parent.name if obj.parent and obj.parent.type == 'ARMATURE' else "",
+        "vertices": len(mesh.vertices),
+        "mesh": mesh_bytes(mesh),
+        "shape_keys": shape_key_bytes(mesh),
+        "vertex_groups": (len(mesh.vertices) * DEFORM_VERT if entries else 0)
+                         + (sum(entries.values()) - pin_weights) * DEFORM_WEIGHT,
+        "point_cache": cache,
+        "pins": len(pins) * OBJECT + pin_weights * DEFORM_WEIGHT,
+        "cache_info": info,
+    }
+    row["total"] = sum(row[c] for c in COLUMNS)
+    return row
+
+# ===================================================================
+# REPORT
+# ===================================================================
+def memory_report(objects=None):
+    """{"muscles": [...], "armatures": {name: {column: bytes}}, "total": {...}}
+    over every Muscle_XID mesh (or the given objects)."""
+    objects = objects if objects is not None else bpy.data.objects
+    rows = [muscle_usage(o) for o in objects if o.type == 'MESH' and o.get("Muscle_XID")]
+    armatures = {}
+    for row in rows:
+        arm = armatures.setdefault(row["armature"], dict.fromkeys(COLUMNS + ("total", "muscles"), 0))
+        for column in COLUMNS + ("total",):
+            arm[column] += row[column]
+        arm["muscles"] += 1
+    total = {c: sum(r[c] for r in rows) for c in COLUMNS + ("total",)}
+    total["muscles"] = len(rows)
+    return {"file": bpy.data.filepath, "muscles": rows, "armatures": armatures, "total": total}
+
+def compare_reports(old, new):
+    """Growth in bytes: {"total": delta, "armatures": {...}, "muscles": {...}, "added", "removed"}"""
+    old_rows = {r["name"]: r for r in old.get("muscles", [])}
+    new_rows = {r["name"]: r for r in new["muscles"]}
+    muscles = {name: {c: r[c] - old_rows[name][c] for c in COLUMNS + ("total",)}
+               for name, r in new_rows.items() if name in old_rows}
+    armatures = {name: a["total"] - old.get("armatures", {}).get(name, {}).get("total", 0)
+                 for name, a in new["armatures"].items()}
+    return {
+        "total": new["total"]["total"] - old.get("total", {}).get("total", 0),
+        "armatures": armatures,
+        "muscles": muscles,
+        "added": sorted(set(new_rows) - set(old_rows)),
+        "removed": sorted(set(old_rows) - set(new_rows)),
+    }
+
+def format_table(report, sort_by="total", limit=0):
+    """Text table of the report, largest first by sort_by ("name" sorts A-Z)"""
+    kb = lambda b: f"{b / 1024:10.1f}"
+    rows = sorted(report["muscles"], key=lambda r: r[sort_by], reverse=sort_by != "name")
+    if limit:
+        rows = rows[:limit]
+    head = f"  {'Muscle':<28}{'Armature':<20}{'Mesh':>10}{'Keys':>10}{'Groups':>10}{'Cache':>10}{'Pins':>10}{'Total KB':>10}"
+    lines = [head, "  " + "-" * (len(head) - 2)]
+    for r in rows:
+        lines.append(f"  {r['name'][:27]:<28}{r['armature'][:19]:<20}"
+                     + "".join(kb(r[c]) for c in COLUMNS + ("total",)))
+    lines.append("")
+    for name, a in sorted(report["armatures"].items(), key=lambda kv: -kv[1]["total"]):
+        lines.append(f"  {'(' + str(a['muscles']) + ' muscles)':<28}{(name or '-')[:19]:<20}"
+                     + "".join(kb(a[c]) for c in COLUMNS + ("total",)))
+    t = report["total"]
+    lines.append(f"  {'TOTAL (' + str(t['muscles']) + ')':<48}" + "".join(kb(t[c]) for c in COLUMNS + ("total",)))
+    return "\n".join(lines)
+
+def format_growth(growth, threshold=0):
+    lines = [f"  total growth {growth['total'] / 1024:+.1f} KB"]
+    for name, delta in sorted(growth["armatures"].items(), key=lambda kv: -kv[1]):
+        if abs(delta) > threshold:
+            lines.append(f"  armature {name or '-':<20} {delta / 1024:+10.1f} KB")
+    for name, d in sorted(growth["muscles"].items(), key=lambda kv: -kv[1]["total"]):
+        if abs(d["total"]) > threshold:
+            parts = ", ".join(f"{c} {d[c] / 1024:+.1f}" for c in COLUMNS if d[c])
+            lines.append(f"  muscle {name:<22} {d['total'] / 1024:+10.1f} KB ({parts})")
+    if growth["added"]:
+        lines.append(f"  added: {', '.join(growth['added'])}")
+    if growth["removed"]:
+        lines.append(f"  removed: {', '.join(growth['removed'])}")
+    return "\n".join(lines)
+
+def write_report(report, filepath):
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+def read_report(filepath):
+    with open(filepath, encoding="utf-8") as f:
+        return json.load(f)
+
+def run_report(argv=None):
+    """Command-line entry: args after '--' are [out.json] [--compare previous.json] [--sort column].
+
+        blender -b shot.blend --python-expr "import <addon>.memory_report as m; m.run_report()" \\
+            -- shot_memory.json --compare yesterday.json
+    """
+    argv = sys.argv[sys.argv.index("--") + 1:] if argv is None and "--" in sys.argv else (argv or [])
+    options = {}
+    for flag in ("--compare", "--sort"):
+        if flag in argv:
+            i = argv.index(flag)
+            options[flag] = argv[i + 1]
+            argv = argv[:i] + argv[i + 2:]
+    report = memory_report()
+    print(f"\nBlendArmory: Muscle memory ({bpy.data.filepath or 'unsaved'})")
+    print(format_table(report, options.get("--sort", "total")))
+    if "--compare" in options:
+        growth = compare_reports(read_report(options["--compare"]), report)
+        report["growth"] = growth
+        print(format_growth(growth))
+    if argv:
+        write_report(report, argv[0])
+    return report
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_memory_report(bpy.types.Operator):
+    """Report memory used by every muscle, per armature and in total (console + JSON)"""
+    bl_idname = "muscle.memory_report"
+    bl_label = "Muscle Memory Report"
+
+    sort_by: bpy.props.EnumProperty(
+        name="Sort By", default="total",
+        items=[("total", "Total", ""), ("mesh", "Mesh", ""), ("shape_keys", "Shape Keys", ""),
+               ("vertex_groups", "Vertex Groups", ""), ("point_cache", "Point Cache", ""),
+               ("pins", "Pins", ""), ("name", "Name", "")])
+    filepath: bpy.props.StringProperty(
+        name="JSON", default="//muscle_memory.json", subtype='FILE_PATH',
+        description="Where to write the report (empty: console only)")
+    compare_path: bpy.props.StringProperty(
+        name="Compare With", default="", subtype='FILE_PATH',
+        description="Previous report; growth per muscle and armature is printed")
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        report = memory_report()
+        print(f"\nBlendArmory: Muscle memory ({bpy.data.filepath or 'unsaved'})")
+        print(format_table(report, self.sort_by))
+        try:
+            if self.compare_path:
+                growth = compare_reports(read_report(bpy.path.abspath(self.compare_path)), report)
+                report["growth"] = growth
+                print(format_growth(growth))
+            if self.filepath:
+                write_report(report, bpy.path.abspath(self.filepath))
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Memory report: {e}")
+            return {'CANCELLED'}
+        t = report["total"]
+        msg = f"{t['muscles']} muscles use {t['total'] / 1048576:.1f} MB"
+        if "growth" in report:
+            msg += f" ({report['growth']['total'] / 1048576:+.1f} MB)"
+        self.report({'INFO'}, msg)
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_memory_report,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,171 @@
+# micro_controllers.py — Micro Controllers (one shared armature per system)
+# BlendArmory Muscles 3.3 — Hundreds of handles, one scene object
+
+import bpy
+from . import data
+from .data import NAMES
+from .system import bulge_expression
+from .geometry import world_matrix, belly_weights, group_weights, write_group_weights
+from .registry import muscles_of
+from .system_collections import link_to_system
+from .modifier_stack import order_stack
+from .sparse_keys import key_driver
+
+# ===================================================================
+# SHARED OBJECTS
+# ===================================================================
+HANDLE_SCALE = 0.15      # Handle length, fraction of muscle length
+WIDGET_NAME = "WGT_" + NAMES["micro_ctrlName"]
+
+def controller_name(arm):
+    return f"{arm.name}_{NAMES['micro_SysName']}"
+
+def handle_name(muscle):
+    return muscle.name + NAMES["mctrlName"]
+
+def write_micro_group(muscle):
+    """Hook_Micro's own group: full at mid-belly, none at the tendon ends"""
+    vg = muscle.vertex_groups.get(NAMES["microGroupName"])
+    replace = vg is not None
+    vg = vg or muscle.vertex_groups.new(name=NAMES["microGroupName"])
+    weights = group_weights(muscle, NAMES["vertexGroupName"])
+    write_group_weights(vg, belly_weights(weights), replace=replace)
+    return vg
+
+def get_widget():
+    """Shared custom shape for every handle (never linked to a scene)"""
+    wgt = bpy.data.objects.get(WIDGET_NAME)
+    if wgt is None:
+        verts = data.BONE_CUSTOM_VERTS
+        faces = [tuple(range(i, i + 4)) for i in range(0, len(verts) - 3, 4)]
+        mesh = bpy.data.meshes.new(WIDGET_NAME)
+        mesh.from_pydata(verts, [], faces)
+        wgt = bpy.data.objects.new(WIDGET_NAME, mesh)
+    return wgt
+
+def get_controller(context, arm, create=True):
+    """The micro controller armature for arm's muscle system"""
+    ctrl = bpy.data.objects.get(controller_name(arm))
+    if ctrl is None and create:
+        ctrl = bpy.data.objects.new(controller_name(arm), bpy.data.armatures.new(NAMES["micro_ctrlName"]))
+        ctrl.show_in_front = True
+        link_to_system(context, ctrl, arm, "controllers")
+        ctrl.parent = arm
+    return ctrl
+
+# ===================================================================
+# BUILD (bulk, one edit-mode pass)
+# ===================================================================
+def build_micro_controllers(context, arm, muscles):
+    """Give every muscle in muscles a handle bone in arm's controller armature.
+
+    Handle scale drives the Bulge key, handle location moves the belly
+    through a hook on a belly-falloff group. Returns the number of new handles.
+    """
+    ctrl = get_controller(context, arm)
+    muscles = [m for m in muscles if handle_name(m) not in ctrl.data.bones]
+    if not muscles:
+        return 0
+
+    prev_active = context.view_layer.objects.active
+    prev_mode = context.mode
+    if prev_mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    context.view_layer.objects.active = ctrl
+    bpy.ops.object.mode_set(mode='EDIT')
+
+    to_ctrl = world_matrix(ctrl).inverted()
+    ebones = ctrl.data.edit_bones
+    # Orphaned handles (their muscle was deleted) are dropped in the same pass
+    for eb in list(ebones):
+        if eb.name.endswith(NAMES["mctrlName"]) and eb.name[:-len(NAMES["mctrlName"])] not in bpy.data.objects:
+            ebones.remove(eb)
+    for muscle in muscles:
+        mw = world_matrix(muscle)
+        head = to_ctrl @ mw.translation
+        axis = (to_ctrl.to_3x3() @ mw.to_3x3().col[2]).normalized()
+        length = max(mw.to_scale().z, 0.01) * HANDLE_SCALE
+        eb = ebones.new(handle_name(muscle))
+        eb.head = head
+        eb.tail = head + axis * length
+        eb.use_deform = False
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    wgt = get_widget()
+    for muscle in muscles:
+        name = handle_name(muscle)
+        pb = ctrl.pose.bones[name]
+        pb.custom_shape = wgt
+        pb.lock_rotation = (True, True, True)
+
+        origin = next((m.subtarget for m in muscle.modifiers if m.name == "Hook_Origin"), "")
+        if origin:
+            follow = pb.constraints.new('CHILD_OF')
+            follow.target = arm
+            follow.subtarget = origin
+            follow.set_inverse_pending = True
+
+        write_micro_group(muscle)
+        hook = muscle.modifiers.get("Hook_Micro") or muscle.modifiers.new("Hook_Micro", 'HOOK')
+        hook.object = ctrl
+        hook.subtarget = name
+        hook.vertex_group = NAMES["microGroupName"]
+        rest = world_matrix(ctrl) @ ctrl.data.bones[name].matrix_local
+        hook.matrix_inverse = rest.inverted() @ world_matrix(muscle)
+        order_stack(context, muscle)
+
+        fc = key_driver(muscle, "Bulge")
+        if fc:
+            drv = fc.driver
+            var = drv.variables.get("c")
+            if var is None:
+                var = drv.variables.new()
+                var.name = "c"
+                var.type = 'TRANSFORMS'
+            var.targets[0].id = ctrl
+            var.targets[0].bone_target = name
+            var.targets[0].transform_type = 'SCALE_AVG'
+            var.targets[0].transform_space = 'LOCAL_SPACE'
+            drv.expression = bulge_expression(muscle, drv)
+        muscle["Micro_Ctrl"] = name
+
+    context.view_layer.objects.active = prev_active
+    if prev_mode == 'POSE' and prev_active and prev_active.type == 'ARMATURE':
+        bpy.ops.object.mode_set(mode='POSE')
+    return len(muscles)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_micro_controllers(bpy.types.Operator):
+    """Add a micro controller handle to every muscle of the armature"""
+    bl_idname = "muscle.micro_controllers"
+    bl_label = "Add Micro Controllers"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        obj = context.active_object
+        arm = obj.parent if obj and "Muscle_XID" in obj else obj
+        if not arm or arm.type != 'ARMATURE':
+            self.report({'ERROR'}, "Select an armature or one of its muscles")
+            return {'CANCELLED'}
+        muscles = muscles_of(context.scene, arm)
+        if not muscles:
+            self.report({'WARNING'}, "No muscles on this armature")
+            return {'CANCELLED'}
+        added = build_micro_controllers(context, arm, muscles)
+        self.report({'INFO'}, f"{added} micro controllers added to {controller_name(arm)}")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_micro_controllers,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,153 @@
+# modifier_stack.py — Muscle Modifier Stack Ordering & Lint
+# BlendArmory Muscles 3.3 — Hooks, shape, dynamics, corrective, skin
+
+import bpy
+from .registry import all_muscles
+
+# ===================================================================
+# ORDER
+# Shape keys (Bulge) are evaluated before any modifier; a Geometry Nodes
+# deformer takes the "shape" slot. Anything unknown stays last, in order.
+# ===================================================================
+STACK_RANK = {
+    'HOOK': 0,
+    'NODES': 1,
+    'SOFT_BODY': 2,
+    'CORRECTIVE_SMOOTH': 3,
+    'SHRINKWRAP': 4,
+}
+UNKNOWN_RANK = 5
+
+# Node groups with a fixed slot, by name: shape key stand-ins evaluate
+# before everything (hooks included), cache playback after everything.
+# Modules add theirs with register_group_rank().
+SHAPE_RANK = -1
+PLAYBACK_RANK = UNKNOWN_RANK + 1
+NODE_GROUP_RANKS = {}
+
+def register_group_rank(name, rank=None):
+    """Pin modifiers using node group name to rank (None removes it)"""
+    if rank is None:
+        NODE_GROUP_RANKS.pop(name, None)
+    else:
+        NODE_GROUP_RANKS[name] = rank
+
+def modifier_rank(mod):
+    if mod.type == 'NODES' and mod.node_group and mod.node_group.name in NODE_GROUP_RANKS:
+        return NODE_GROUP_RANKS[mod.node_group.name]
+    return STACK_RANK.get(mod.type, UNKNOWN_RANK)
+
+def stack_order(obj):
+    """Modifier names of obj in the order they should evaluate (stable)"""
+    mods = list(obj.modifiers)
+    return [m.name for m in sorted(mods, key=modifier_rank)]
+
+def order_stack(context, obj):
+    """Reorder obj's modifiers in place. Returns the number of moves."""
+    wanted = stack_order(obj)
+    moves = 0
+    for index, name in enumerate(wanted):
+        if obj.modifiers[index].name != name:
+            with context.temp_override(object=obj):
+                bpy.ops.object.modifier_move_to_index(modifier=name, index=index)
+            moves += 1
+    return moves
+
+def input_id(ng, name):
+    """Modifier key of the node group input called name"""
+    return next(item.identifier for item in ng.interface.items_tree
+                if item.item_type == 'SOCKET' and item.in_out == 'INPUT' and item.name == name)
+
+# ===================================================================
+# LINT
+# ===================================================================
+def missing_inputs(obj, mod):
+    """Why mod cannot do anything useful on obj, or None if it can"""
+    groups = obj.vertex_groups
+    if mod.type == 'HOOK':
+        if mod.object is None:
+            return "hook has no target object"
+        if mod.object.type == 'ARMATURE' and mod.subtarget and mod.subtarget not in mod.object.data.bones:
+            return f"hook bone '{mod.subtarget}' is missing"
+    elif mod.type == 'SHRINKWRAP':
+        if mod.target is None:
+            return "shrinkwrap has no target"
+    elif mod.type == 'NODES':
+        if mod.node_group is None:
+            return "geometry nodes modifier has no node group"
+    elif mod.type == 'SOFT_BODY':
+        s = mod.settings
+        if s.use_goal and s.goal_vertex_group and s.goal_vertex_group not in groups:
+            return f"goal group '{s.goal_vertex_group}' is missing"
+    group = getattr(mod, "vertex_group", "")
+    if group and group not in groups:
+        return f"vertex group '{group}' is missing"
+    return None
+
+def lint_stack(obj):
+    """[(modifier name, problem)] for one muscle; order problems included"""
+    issues = []
+    for mod in obj.modifiers:
+        if not (mod.show_viewport or mod.show_render):
+            continue
+        reason = missing_inputs(obj, mod)
+        if reason:
+            issues.append((mod.name, reason))
+    if [m.name for m in obj.modifiers] != stack_order(obj):
+        issues.append(("(stack)", "modifiers evaluate out of order"))
+    return issues
+
+def fix_stack(context, obj, remove=False):
+    """Disable (or remove) dead modifiers and reorder. Returns issues fixed."""
+    issues = lint_stack(obj)
+    for name, reason in issues:
+        mod = obj.modifiers.get(name)
+        if mod is None:
+            continue
+        if remove:
+            obj.modifiers.remove(mod)
+        else:
+            mod.show_viewport = mod.show_render = False
+    order_stack(context, obj)
+    return issues
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_stack_lint(bpy.types.Operator):
+    """Report (and optionally fix) wasted modifier evaluations on every muscle"""
+    bl_idname = "muscle.stack_lint"
+    bl_label = "Muscle Stack Lint"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    fix: bpy.props.BoolProperty(name="Fix", default=False,
+                                description="Disable dead modifiers and reorder stacks")
+    remove: bpy.props.BoolProperty(name="Remove Dead Modifiers", default=False,
+                                   description="Remove dead modifiers instead of disabling them")
+
+    def execute(self, context):
+        muscles = all_muscles(context.scene)
+        total = 0
+        print(f"\nBlendArmory: Muscle stack lint ({len(muscles)} muscles)")
+        for muscle in muscles:
+            issues = fix_stack(context, muscle, self.remove) if self.fix else lint_stack(muscle)
+            for name, reason in issues:
+                print(f"  {muscle.name:<24} {name:<20} {reason}")
+            total += len(issues)
+        verb = "Fixed" if self.fix else "Found"
+        self.report({'INFO'} if total == 0 or self.fix else {'WARNING'},
+                    f"{verb} {total} stack issues on {len(muscles)} muscles")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_stack_lint,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,187 @@
+# node_muscles.py — Shared Geometry Nodes Muscle Deformer
+# BlendArmory Muscles 3.3 — One node group, every muscle, every core
+
+import bpy
+import numpy as np
+from .data import PRESETS, NAMES
+from .geometry import axial_param
+from .registry import register_muscle
+from .system_collections import link_to_system
+from .modifier_stack import input_id
+from .system import plan_muscle, bulge_expression, register_builder, TRACK_AXIS
+
+# ===================================================================
+# NODE GROUP
+# Muscles built in NODES mode carry no hooks, shape keys or smoothing:
+# constraints place the object between its bones and this group (shared
+# by all of them) stretches, preserves volume and bulges it natively.
+# ===================================================================
+DEFORMER_NAME = "BlendArmory Muscle Deformer"
+MODIFIER_NAME = "Muscle Deformer"
+AXIAL_ATTR = "muscle_t"
+
+# (name, socket type, default, min, max)
+INPUTS = (
+    ("Bulge", 'NodeSocketFloat', 0.0, 0.0, 10.0),
+    ("Bulge Amount", 'NodeSocketFloat', 0.3, 0.0, 2.0),
+    ("Length", 'NodeSocketFloat', 1.0, 0.0, 1000.0),
+    ("Rest Length", 'NodeSocketFloat', 1.0, 0.0001, 1000.0),
+    ("Volume", 'NodeSocketFloat', 1.0, 0.0, 1.0),
+    ("Thickness", 'NodeSocketFloat', 1.0, 0.0, 10.0),
+)
+
+def _math(nodes, links, op, a, b=None, location=(0, 0)):
+    node = nodes.new("ShaderNodeMath")
+    node.operation = op
+    node.location = location
+    for i, value in enumerate((a, b)):
+        if value is None:
+            continue
+        if isinstance(value, (int, float)):
+            node.inputs[i].default_value = value
+        else:
+            links.new(value, node.inputs[i])
+    return node.outputs[0]
+
+def deformer_group():
+    """The shared deformer node group, built on first use"""
+    ng = bpy.data.node_groups.get(DEFORMER_NAME)
+    if ng is not None:
+        return ng
+    ng = bpy.data.node_groups.new(DEFORMER_NAME, 'GeometryNodeTree')
+    ng.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    for name, socket_type, default, lo, hi in INPUTS:
+        sock = ng.interface.new_socket(name, in_out='INPUT', socket_type=socket_type)
+        sock.default_value, sock.min_value, sock.max_value = default, lo, hi
+    ng.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes, links = ng.nodes, ng.links
+    gin = nodes.new("NodeGroupInput")
+    gin.location = (-900, 0)
+    gout = nodes.new("NodeGroupOutput")
+    gout.location = (700, 0)
+    i = gin.outputs
+
+    # Stretch along the muscle (local Z) and radial volume preservation
+    stretch = _math(nodes, links, 'DIVIDE', i["Length"], i["Rest Length"], (-600, 200))
+    exponent = _math(nodes, links, 'MULTIPLY', i["Volume"], -0.5, (-600, 50))
+    preserve = _math(nodes, links, 'POWER', stretch, exponent, (-400, 150))
+
+    # Bulge peaks mid-belly: 4 t (1 - t)
+    attr = nodes.new("GeometryNodeInputNamedAttribute")
+    attr.data_type = 'FLOAT'
+    attr.inputs["Name"].default_value = AXIAL_ATTR
+    attr.location = (-900, -300)
+    t = attr.outputs["Attribute"]
+    belly = _math(nodes, links, 'MULTIPLY', t, _math(nodes, links, 'SUBTRACT', 1.0, t, (-700, -350)), (-550, -300))
+    belly = _math(nodes, links, 'MULTIPLY', belly, 4.0, (-400, -300))
+    amount = _math(nodes, links, 'MULTIPLY', i["Bulge"], i["Bulge Amount"], (-400, -150))
+    swell = _math(nodes, links, 'MULTIPLY_ADD', belly, amount, (-250, -200))
+    swell.node.inputs[2].default_value = 1.0
+    radial = _math(nodes, links, 'MULTIPLY', preserve, swell, (-100, 0))
+    radial = _math(nodes, links, 'MULTIPLY', radial, i["Thickness"], (50, 0))
+
+    pos = nodes.new("GeometryNodeInputPosition")
+    pos.location = (-100, -450)
+    sep = nodes.new("ShaderNodeSeparateXYZ")
+    sep.location = (50, -450)
+    links.new(pos.outputs[0], sep.inputs[0])
+    comb = nodes.new("ShaderNodeCombineXYZ")
+    comb.location = (350, -300)
+    links.new(_math(nodes, links, 'MULTIPLY', sep.outputs["X"], radial, (200, -250)), comb.inputs["X"])
+    links.new(_math(nodes, links, 'MULTIPLY', sep.outputs["Y"], radial, (200, -400)), comb.inputs["Y"])
+    links.new(_math(nodes, links, 'MULTIPLY', sep.outputs["Z"], stretch, (200, -550)), comb.inputs["Z"])
+
+    setpos = nodes.new("GeometryNodeSetPosition")
+    setpos.location = (500, 0)
+    links.new(i["Geometry"], setpos.inputs["Geometry"])
+    links.new(comb.outputs[0], setpos.inputs["Position"])
+    links.new(setpos.outputs[0], gout.inputs[0])
+    return ng
+
+# ===================================================================
+# BUILDER
+# ===================================================================
+def _driver(mod, key, arm, b1, b2, var_type, expression):
+    drv = mod.driver_add(f'["{key}"]').driver
+    drv.type = 'SCRIPTED'
+    var = drv.variables.new()
+    var.name = "a"
+    var.type = var_type
+    var.targets[0].id = arm
+    var.targets[0].bone_target = b1
+    var.targets[1].id = arm
+    var.targets[1].bone_target = b2
+    drv.expression = expression(drv) if callable(expression) else expression
+    return drv
+
+def build_node_muscle(context, arm, b1, b2, preset, name=None):
+    """Build one muscle between pose bones b1 and b2 driven by the shared deformer"""
+    aw = arm.matrix_world
+    rest_length = max(((aw @ b2.head) - (aw @ b1.head)).length, 1e-6)
+    plan = plan_muscle(preset, rest_length)
+    pr = PRESETS[preset]
+
+    # plan_muscle() turns the long axis onto TRACK_AXIS (the axis the damped
+    # track aims); it spans exactly the bone distance, so stretch = Length / Rest Length
+    axis = np.asarray(TRACK_AXIS, dtype=np.float32)
+    co = plan["co"].copy()
+    proj = co @ axis
+    t = axial_param(co, axis)
+    span = float(proj.max() - proj.min())
+    co += np.outer((proj - proj.mean()) * (rest_length / max(span, 1e-6)) - proj, axis)
+
+    mesh = bpy.data.meshes.new("MuscleMesh")
+    mesh.from_pydata(co, plan["edges"], plan["faces"])
+    mesh.update()
+    attr = mesh.attributes.new(AXIAL_ATTR, 'FLOAT', 'POINT')
+    attr.data.foreach_set("value", t.astype(np.float32))
+
+    muscle = bpy.data.objects.new(name or f"Muscle_{preset}", mesh)
+    link_to_system(context, muscle, arm, "muscles")
+    muscle.parent = arm
+    muscle["Muscle_XID"] = True
+    muscle["Muscle_Preset"] = preset
+    muscle["Muscle_Type_INT"] = pr["type"] == "EXTENSOR"
+    muscle["Base_Length_INT"] = pr["length"]
+    muscle["Volume_INT"] = pr["bulge"]
+
+    # Native constraints hold the object between the bones (midpoint, aimed +Z)
+    c = muscle.constraints.new('COPY_LOCATION')
+    c.target, c.subtarget = arm, b1.name
+    c = muscle.constraints.new('COPY_LOCATION')
+    c.target, c.subtarget, c.influence = arm, b2.name, 0.5
+    c = muscle.constraints.new('DAMPED_TRACK')
+    c.target, c.subtarget, c.track_axis = arm, b2.name, 'TRACK_Z'
+
+    ng = deformer_group()
+    mod = muscle.modifiers.new(MODIFIER_NAME, 'NODES')
+    mod.node_group = ng
+    mod[input_id(ng, "Bulge Amount")] = float(pr["bulge"])
+    mod[input_id(ng, "Rest Length")] = rest_length
+    mod[input_id(ng, "Length")] = rest_length
+    _driver(mod, input_id(ng, "Bulge"), arm, b1.name, b2.name, 'ROTATION_DIFF',
+            lambda drv: bulge_expression(muscle, drv))
+    _driver(mod, input_id(ng, "Length"), arm, b1.name, b2.name, 'LOC_DIFF', "a")
+    muscle.Muscle_Activation = preset
+
+    skin = context.scene.Muscle_Skin
+    if skin:
+        shrinkwrap = muscle.modifiers.new("Shrinkwrap", 'SHRINKWRAP')
+        shrinkwrap.target = skin
+
+    register_muscle(context.scene, muscle, arm)
+    return muscle
+
+def is_node_muscle(obj):
+    return any(m.type == 'NODES' and m.node_group and m.node_group.name == DEFORMER_NAME
+               for m in obj.modifiers)
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+def register():
+    register_builder('NODES', build_node_muscle)
+
+def unregister():
+    register_builder('NODES', None)
@@ -3,6 +3,8 @@
 
 import bpy
 from .data import PRESETS
+from .system_collections import KINDS, find_layer_collection, system_armature
+from .activation import curve_group
 
 class MUSCLE_PT_create(bpy.types.Panel):
     bl_label = "Create"
@@ -26,28 +28,44 @@ class MUSCLE_PT_create(bpy.types.Panel):
         col.operator("muscle.add_stylized", text="Add Stylized Muscle", icon='RIGHTARROW_THIN')
         col.operator("muscle.add_strip", text="Add Strip Muscle", icon='RIGHTARROW_THIN')
 
-        if context.object and context.object.type == 'MESH' and "Muscle_XID" not in context.object:
+        if any(o.type == 'MESH' and "Muscle_XID" not in o for o in context.selected_objects):
             col.operator("muscle.convert", text="Convert Mesh to Muscle", icon='RNA_ADD')
 
         col.separator()
         col.prop(scn, "Muscle_Scale", text="Global Scale", slider=True)
         col.prop(scn, "Create_Type", text="Targeting Method")
+        col.prop(scn, "Muscle_Mode", text="Mode")
+        col.prop(scn, "Muscle_Skin", text="Skin")
         col.prop(scn, "Muscle_Name", text="Name")
         col.prop(scn, "use_Affixes", text="Use Affixes")
         if scn.use_Affixes:
             row = col.row(align=True)
             row.prop(scn, "Prefix", text="")
             row.prop(scn, "Suffix", text="")
+        col.prop(scn, "Muscle_Mirror_Mode", text="Mirror to Opposite Side")
 
         col.separator()
         col.label(text="Presets:")
-        row = col.row(align=True)
+        row = col.grid_flow(columns=4, align=True)
         for p in PRESETS:
             op = row.operator("muscle.create", text=p)
             op.preset = p
 
         col.separator()
-        col.operator("muscle.arp_auto", text="Auto-Attach to Auto-Rig Pro", icon='PLUGIN')
+        col.prop(scn, "Rig_Profile", text="Rig")
+        col.operator("muscle.arp_auto", text="Auto-Attach to Rig", icon='PLUGIN')
+        col.operator("muscle.arp_auto_all", text="Auto-Muscle Entire Rig", icon='OUTLINER_OB_ARMATURE')
+        row = col.row(align=True)
+        row.operator("muscle.arp_auto_background", text="Auto-Muscle in Background", icon='SORTTIME')
+        row.operator("muscle.benchmark_build", text="", icon='TIME')
+        col.operator("muscle.micro_controllers", text="Add Micro Controllers", icon='BONE_DATA')
+        row = col.row(align=True)
+        row.operator("muscle.spec_export", text="Export Rig", icon='EXPORT')
+        row.operator("muscle.spec_import", text="Import Rig", icon='IMPORT')
+        if scn.Muscle_Mode == 'BBONE':
+            col.operator("muscle.bbone_bake", text="Bake Bendy Muscles to Skin", icon='MOD_VERTEX_WEIGHT')
+        col.operator("muscle.benchmark_playback", text="Benchmark Playback", icon='TIME')
+        col.operator("muscle.benchmark_deformers", text="Benchmark Deformers", icon='NODETREE')
 
         col.separator()
         row = col.row(align=True)
@@ -81,6 +99,18 @@ class MUSCLE_PT_system(bpy.types.Panel):
         col.prop(obj, "Muscle_Size", slider=True)
         col.prop(obj, "Muscle_Offset", slider=True)
 
+        col.separator()
+        col.label(text="Activation", icon='FCURVE')
+        curves = curve_group(create=False)
+        if curves:
+            col.prop_search(obj, "Muscle_Activation", curves, "nodes", text="")
+        else:
+            col.prop(obj, "Muscle_Activation", text="")
+        node = curves.nodes.get(obj.Muscle_Activation) if curves else None
+        if node:
+            col.template_curve_mapping(node, "mapping")
+            col.operator("muscle.activation_refresh", text="Apply Curves", icon='FILE_REFRESH')
+
         col.separator()
         col.label(text="Dynamics", icon='PHYSICS')
         row = col.row()
@@ -92,7 +122,18 @@ class MUSCLE_PT_system(bpy.types.Panel):
         col.prop(obj, "Jiggle_Damping", slider=True)
 
         col.separator()
+        col.label(text="Smoothing", icon='MOD_SMOOTH')
+        row = col.row()
+        row.prop(obj, "Smooth_Adaptive", text="Adaptive")
+        row.prop(obj, "Smooth_Max_Iterations", text="Max")
+
+        col.separator()
+        if obj.Muscle_Mirror:
+            col.label(text=f"Mirrored: {obj.Muscle_Mirror.name}", icon='MOD_MIRROR')
+        else:
+            col.operator("muscle.mirror", text="Mirror Muscle", icon='MOD_MIRROR')
         col.operator("muscle.smart_update", text="Smart Update", icon='FILE_REFRESH')
+        col.operator("muscle.reweight", text="Recompute Weights", icon='MOD_VERTEX_WEIGHT')
         col.operator("muscle.delete", text="Delete Muscle", icon='CANCEL')
 
 
@@ -129,6 +170,120 @@ class MUSCLE_PT_pinning(bpy.types.Panel):
         col2.operator("muscle.pin_action", icon='ADD', text="").action = 'ADD'
         col2.operator("muscle.pin_action", icon='REMOVE', text="").action = 'REMOVE'
 
+        col = layout.column(align=True)
+        col.operator("muscle.pin_add_bulk", text="Add Pins...", icon='HOOK')
+        col.operator("muscle.benchmark_pins", text="Benchmark Pin Overhead", icon='TIME')
+
+
+class MUSCLE_PT_collections(bpy.types.Panel):
+    bl_label = "System Collections"
+    bl_category = "Muscles"
+    bl_idname = "MUSCLE_PT_collections"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return system_armature(obj) is not None or (obj and "Muscle_XID" in obj)
+
+    def draw(self, context):
+        layout = self.layout
+        arm = system_armature(context.object)
+
+        col = layout.column(align=True)
+        for kind, label in KINDS.items():
+            coll = getattr(arm.Muscle_Collections, kind) if arm else None
+            if coll is None:
+                continue
+            row = col.row(align=True)
+            row.label(text=label, icon='OUTLINER_COLLECTION')
+            layer_coll = find_layer_collection(context.view_layer.layer_collection, coll)
+            if layer_coll:
+                row.prop(layer_coll, "exclude", text="", emboss=False)
+            row.prop(coll, "hide_viewport", text="", emboss=False)
+            row.prop(coll, "hide_render", text="", emboss=False)
+
+        col.separator()
+        col.operator("muscle.organize", text="Organize Muscle Systems", icon='COLLECTION_NEW')
+
+
+class MUSCLE_PT_bake(bpy.types.Panel):
+    bl_label = "Bake & Export"
+    bl_category = "Muscles"
+    bl_idname = "MUSCLE_PT_bake"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode in {'OBJECT', 'POSE'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        col = layout.column(align=True)
+        col.label(text="Game Engine Export", icon='EXPORT')
+        col.operator("muscle.bake_correctives", text="Bake Corrective Shapes", icon='SHAPEKEY_DATA')
+        row = col.row(align=True)
+        row.operator("muscle.bake_drivers", text="Bake Drivers", icon='DRIVER')
+        row.operator("muscle.unbake_drivers", text="Restore", icon='LOOP_BACK')
+        col.operator("muscle.benchmark_driver_bake", text="Benchmark Driver Bake", icon='TIME')
+
+        col.separator()
+        col.label(text="Optimize", icon='MODIFIER')
+        col.operator("muscle.stack_lint", text="Muscle Stack Lint", icon='VIEWZOOM').fix = False
+        col.operator("muscle.stack_lint", text="Fix Muscle Stacks", icon='TOOL_SETTINGS').fix = True
+        row = col.row(align=True)
+        row.operator("muscle.adaptive_smooth", text="Adaptive Smoothing", icon='MOD_SMOOTH').enable = True
+        row.operator("muscle.adaptive_smooth", text="", icon='X').enable = False
+        col.operator("muscle.benchmark_smoothing", text="Benchmark Smoothing", icon='TIME')
+        row = col.row(align=True)
+        row.operator("muscle.sparse_keys", text="Sparse Shape Keys", icon='SHAPEKEY_DATA').pack = True
+        row.operator("muscle.sparse_keys", text="", icon='LOOP_BACK').pack = False
+        col.operator("muscle.benchmark_sparse_keys", text="Benchmark Sparse Keys", icon='TIME')
+        col.operator("muscle.memory_report", text="Memory Report", icon='MEMORY')
+
+        col.separator()
+        col.prop(scene, "Muscle_Sleep", text="Jiggle Sleeping")
+        sub = col.column(align=True)
+        sub.active = scene.Muscle_Sleep
+        sub.prop(scene, "Muscle_Sleep_Threshold")
+        sub.prop(scene, "Muscle_Sleep_Frames")
+        sub.prop(scene, "Muscle_Wake_Frames")
+        row = col.row(align=True)
+        row.operator("muscle.sleep_plan", text="Replan", icon='FILE_REFRESH')
+        row.operator("muscle.sleep_report", text="Sleep Report", icon='TEXT')
+        row.operator("muscle.benchmark_sleep", text="Benchmark", icon='TIME')
+        row = col.row(align=True)
+        row.operator("muscle.jiggle_cache_bake", text="Bake Jiggle Cache", icon='FILE_CACHE')
+        row.operator("muscle.jiggle_cache_clear", text="", icon='X')
+        col.operator("muscle.benchmark_jiggle_cache", text="Benchmark Jiggle Cache", icon='TIME')
+        row = col.row(align=True)
+        row.operator("muscle.crowd_bake_cycle", text="Bake Crowd Cycle", icon='OUTLINER_OB_GROUP_INSTANCE')
+        row.operator("muscle.crowd_create", text="Crowd", icon='COMMUNITY')
+        col.operator("muscle.benchmark_crowd", text="Benchmark Crowd", icon='TIME')
+
+        col.separator()
+        col.prop(scene, "Muscle_Collision", text="Muscle Collision")
+        sub = col.column(align=True)
+        sub.active = scene.Muscle_Collision
+        sub.prop(scene, "Muscle_Collision_Thickness")
+        sub.prop(scene, "Muscle_Collision_Reach")
+        sub.operator("muscle.collision_refresh", text="Refresh Neighbours", icon='FILE_REFRESH')
+        col.prop(scene, "Muscle_Self_Collision", text="Soft Body Self Collision")
+        col.operator("muscle.benchmark_collision", text="Benchmark Collision", icon='TIME')
+
+        col.separator()
+        col.prop(scene, "Muscle_Scrub_Cache", text="Scrub Cache")
+        sub = col.column(align=True)
+        sub.active = scene.Muscle_Scrub_Cache
+        sub.prop(scene, "Muscle_Scrub_Target")
+        sub.prop(scene, "Muscle_Scrub_Cache_MB")
+        sub.operator("muscle.scrub_cache_clear", text="Clear Scrub Cache", icon='TRASH')
+
 
 # Register all classes
 classes = (
@@ -136,6 +291,8 @@ classes = (
     MUSCLE_PT_system,
     OBJECT_UL_pins,
     MUSCLE_PT_pinning,
+    MUSCLE_PT_collections,
+    MUSCLE_PT_bake,
 )
 
 def register():
@@ -0,0 +1,186 @@
+# pins.py — Hook-Based Vertex Pinning
+# BlendArmory Muscles 3.3 — Pins that actually pin, created in bulk
+
+import bpy
+import numpy as np
+from mathutils import Matrix, Vector
+from .geometry import mesh_coords, principal_axis, axial_param, world_matrix, write_group_weights
+from .system_collections import link_to_system
+from .modifier_stack import order_stack
+
+# ===================================================================
+# LOOKUP (direct pointers, name fallback only for pre-pointer files)
+# ===================================================================
+def pin_objects(muscle):
+    pins = []
+    for item in muscle.custom:
+        pin = item.pin or bpy.data.objects.get(item.name)
+        if pin:
+            pins.append(pin)
+    return pins
+
+# ===================================================================
+# BINDINGS — (local point, per-vertex weights) per pin
+# ===================================================================
+def bindings_along_axis(co, count):
+    """count pins evenly spaced along the muscle's principal axis.
+
+    Each pin sits on the axis at its slice and owns the vertices of that
+    slice with a smooth axial falloff, so neighbouring pins blend.
+    """
+    center, axis, proj = principal_axis(co)
+    t = axial_param(co, axis)
+    lo, hi = float(proj.min()), float(proj.max())
+    result = []
+    for i in range(count):
+        ti = (i + 0.5) / count
+        w = np.clip(1.0 - np.abs(t - ti) * count, 0.0, 1.0) ** 2
+        point = center + axis * (lo + (hi - lo) * ti)
+        result.append((point, w))
+    return result
+
+def bindings_at_vertices(co, indices, radius):
+    """One pin per chosen vertex, binding everything within radius"""
+    result = []
+    for i in indices:
+        d = np.linalg.norm(co - co[i], axis=1)
+        result.append((co[i].copy(), np.clip(1.0 - d / radius, 0.0, 1.0) ** 2))
+    return result
+
+# ===================================================================
+# CREATE / REMOVE
+# ===================================================================
+def _anchor_bone(muscle, world_point):
+    """The muscle's hook bone (origin / insertion) nearest to world_point"""
+    arm = muscle.parent
+    if not arm or arm.type != 'ARMATURE':
+        return None, None
+    best, best_d = None, None
+    for mod in muscle.modifiers:
+        if mod.type == 'HOOK' and mod.object == arm and mod.subtarget in arm.pose.bones:
+            pb = arm.pose.bones[mod.subtarget]
+            d = ((world_matrix(arm) @ pb.head) - world_point).length
+            if best_d is None or d < best_d:
+                best, best_d = pb, d
+    return arm, best
+
+def add_pins(context, muscle, bindings):
+    """Create one hook pin per (local point, weights) binding. Returns the pins."""
+    mw = world_matrix(muscle)
+    pins = []
+    for point, weights in bindings:
+        name = f"{muscle.name}_Pin_{len(muscle.custom) + 1:03d}"
+        empty = bpy.data.objects.new(name, None)
+        empty.empty_display_type = 'PLAIN_AXES'
+        empty.empty_display_size = muscle.Pin_Size
+        link_to_system(context, empty, muscle.parent, "pins")
+
+        world_point = mw @ Vector(point)
+        arm, pb = _anchor_bone(muscle, world_point)
+        if pb:
+            empty.parent = arm
+            empty.parent_type = 'BONE'
+            empty.parent_bone = pb.name
+            tail = world_matrix(arm) @ pb.matrix @ Matrix.Translation((0.0, pb.length, 0.0))
+            empty.matrix_parent_inverse = tail.inverted()
+        empty.location = world_point
+        empty.hide_render = not muscle.Pinning_Render
+        empty.hide_viewport = not muscle.Pinning_View3D
+
+        vg = muscle.vertex_groups.new(name=empty.name)
+        write_group_weights(vg, weights, threshold=0.01)
+
+        hook = muscle.modifiers.new(f"Hook_{empty.name}", 'HOOK')
+        hook.object = empty
+        hook.vertex_group = vg.name
+        hook.matrix_inverse = Matrix.Translation(world_point).inverted() @ mw
+
+        item = muscle.custom.add()
+        item.name = empty.name
+        item.pin = empty
+        pins.append(empty)
+    # Pin hooks must deform before dynamics and smoothing read the mesh
+    order_stack(context, muscle)
+    return pins
+
+def remove_pin(muscle, index):
+    item = muscle.custom[index]
+    pin = item.pin or bpy.data.objects.get(item.name)
+    for mod in [m for m in muscle.modifiers if m.type == 'HOOK' and pin and m.object == pin]:
+        muscle.modifiers.remove(mod)
+    vg = muscle.vertex_groups.get(pin.name if pin else item.name)
+    if vg:
+        muscle.vertex_groups.remove(vg)
+    if pin:
+        bpy.data.objects.remove(pin)
+    muscle.custom.remove(index)
+    muscle.custom_index = max(0, min(muscle.custom_index, len(muscle.custom) - 1))
+
+def clear_pins(muscle):
+    while len(muscle.custom):
+        remove_pin(muscle, len(muscle.custom) - 1)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_pin_add_bulk(bpy.types.Operator):
+    """Pin the muscle with several hook pins at once"""
+    bl_idname = "muscle.pin_add_bulk"
+    bl_label = "Add Pins"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    placement: bpy.props.EnumProperty(
+        name="Placement",
+        items=[('AXIS', "Along Muscle", "Evenly spaced along the muscle's main axis"),
+               ('SELECTED', "Selected Vertices", "One pin per selected vertex")],
+        default='AXIS')
+    count: bpy.props.IntProperty(name="Count", default=4, min=1, max=256)
+    radius: bpy.props.FloatProperty(name="Radius", default=0.15, min=0.001, max=1.0,
+                                    description="Binding radius relative to muscle length (selected vertices)")
+
+    @classmethod
+    def poll(cls, context):
+        return context.object and "Muscle_XID" in context.object
+
+    def execute(self, context):
+        muscle = context.object
+        if muscle.mode == 'EDIT':
+            muscle.update_from_editmode()
+        co = mesh_coords(muscle.data)
+        if self.placement == 'AXIS':
+            bindings = bindings_along_axis(co, self.count)
+        else:
+            sel = np.zeros(len(co), dtype=bool)
+            muscle.data.vertices.foreach_get("select", sel)
+            indices = np.flatnonzero(sel)
+            if not len(indices):
+                self.report({'ERROR'}, "Select muscle vertices in Edit Mode")
+                return {'CANCELLED'}
+            _, _, proj = principal_axis(co)
+            radius = self.radius * float(proj.max() - proj.min())
+            bindings = bindings_at_vertices(co, indices, radius)
+
+        mode = muscle.mode
+        if mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        pins = add_pins(context, muscle, bindings)
+        if mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='EDIT')
+        self.report({'INFO'}, f"{len(pins)} pins added")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_pin_add_bulk,)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,135 @@
+# registry.py — Muscle Registry (pointer-based, per scene)
+# BlendArmory Muscles 3.3 — Indexed lookups instead of scanning bpy.data.objects
+
+import bpy
+from bpy.app.handlers import persistent
+
+# ===================================================================
+# PROPERTY GROUPS
+# ===================================================================
+class MuscleEntry(bpy.types.PropertyGroup):
+    muscle: bpy.props.PointerProperty(name="Muscle", type=bpy.types.Object)
+    armature: bpy.props.PointerProperty(name="Armature", type=bpy.types.Object)
+
+class MuscleRegistry(bpy.types.PropertyGroup):
+    entries: bpy.props.CollectionProperty(type=MuscleEntry)
+
+# ===================================================================
+# INDEX — entry positions by armature, rebuilt lazily.
+# Holds integers only, so it can never outlive the RNA it points into.
+# ===================================================================
+_INDEX = {}
+
+def _index(scene):
+    idx = _INDEX.get(scene.as_pointer())
+    if idx is None:
+        idx = {"all": [], "by_arm": {}, "by_muscle": {}}
+        for i, e in enumerate(scene.Muscle_Registry.entries):
+            if e.muscle is None:
+                continue
+            idx["all"].append(i)
+            idx["by_muscle"][e.muscle.as_pointer()] = i
+            arm = e.armature.as_pointer() if e.armature else 0
+            idx["by_arm"].setdefault(arm, []).append(i)
+        _INDEX[scene.as_pointer()] = idx
+    return idx
+
+def invalidate_index(scene=None):
+    if scene is None:
+        _INDEX.clear()
+    else:
+        _INDEX.pop(scene.as_pointer(), None)
+
+def _resolve(scene, positions):
+    entries = scene.Muscle_Registry.entries
+    # bpy.data.objects.remove() clears the pointer; a muscle deleted in the
+    # viewport is only unlinked (the entry keeps it alive), so skip both
+    return [m for m in (entries[i].muscle for i in positions) if m is not None and m.users_collection]
+
+# ===================================================================
+# API
+# ===================================================================
+def register_muscle(scene, muscle, armature=None):
+    armature = armature or (muscle.parent if muscle.parent and muscle.parent.type == 'ARMATURE' else None)
+    idx = _index(scene)
+    i = idx["by_muscle"].get(muscle.as_pointer())
+    if i is not None:
+        scene.Muscle_Registry.entries[i].armature = armature
+        invalidate_index(scene)
+        return
+    entry = scene.Muscle_Registry.entries.add()
+    entry.muscle = muscle
+    entry.armature = armature
+    i = len(scene.Muscle_Registry.entries) - 1
+    idx["all"].append(i)
+    idx["by_muscle"][muscle.as_pointer()] = i
+    idx["by_arm"].setdefault(armature.as_pointer() if armature else 0, []).append(i)
+
+def unregister_muscle(scene, muscle):
+    i = _index(scene)["by_muscle"].get(muscle.as_pointer())
+    if i is not None:
+        scene.Muscle_Registry.entries.remove(i)
+        invalidate_index(scene)
+
+def all_muscles(scene):
+    return _resolve(scene, _index(scene)["all"])
+
+def muscles_of(scene, armature):
+    """Muscles registered on armature"""
+    return _resolve(scene, _index(scene)["by_arm"].get(armature.as_pointer(), ()))
+
+def is_registered(scene, obj):
+    return obj.as_pointer() in _index(scene)["by_muscle"]
+
+def sync_registry(scene):
+    """Drop dead entries and adopt muscles from files saved before the registry.
+
+    This is the only full object scan; it runs on file load, not per query.
+    """
+    reg = scene.Muscle_Registry
+    for i in reversed(range(len(reg.entries))):
+        if reg.entries[i].muscle is None or not reg.entries[i].muscle.users_collection:
+            reg.entries.remove(i)
+    invalidate_index(scene)
+    known = {e.muscle.as_pointer() for e in reg.entries}
+    for obj in scene.objects:
+        if "Muscle_XID" in obj and obj.as_pointer() not in known:
+            register_muscle(scene, obj)
+
+# ===================================================================
+# HANDLERS
+# ===================================================================
+@persistent
+def registry_load_post(dummy):
+    invalidate_index()
+    for scene in bpy.data.scenes:
+        sync_registry(scene)
+
+@persistent
+def registry_undo_post(dummy):
+    # Undo restores the entries themselves; only the integer index is stale
+    invalidate_index()
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MuscleEntry, MuscleRegistry)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.Muscle_Registry = bpy.props.PointerProperty(type=MuscleRegistry)
+    bpy.app.handlers.load_post.append(registry_load_post)
+    bpy.app.handlers.undo_post.append(registry_undo_post)
+    bpy.app.handlers.redo_post.append(registry_undo_post)
+
+def unregister():
+    for handlers, fn in ((bpy.app.handlers.load_post, registry_load_post),
+                         (bpy.app.handlers.undo_post, registry_undo_post),
+                         (bpy.app.handlers.redo_post, registry_undo_post)):
+        if fn in handlers:
+            handlers.remove(fn)
+    del bpy.types.Scene.Muscle_Registry
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    invalidate_index()
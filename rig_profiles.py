@@ -0,0 +1,212 @@
+# rig_profiles.py — Rig Profiles: ARP, Rigify, Mixamo & Custom Rigs
+# BlendArmory Muscles 3.3 — One bone map per rig type, mirrored from one side
+
+import bpy
+from bpy.app.handlers import persistent
+
+# ===================================================================
+# PROFILE DEFINITIONS
+# Each muscle is written once with a "{side}" token; the profile's
+# "sides" pair expands it into the _L / _R entries. Muscles without the
+# token (spine, neck...) resolve to a single entry.
+# ===================================================================
+RIG_PROFILES = {
+    "ARP": {
+        "label": "Auto-Rig Pro",
+        "markers": ("arp_rig_type", "auto_rig"),
+        "sides": ("_l", "_r"),
+        "bones": {
+            "Biceps":    ("c_upperarm{side}", "c_forearm{side}"),
+            "Triceps":   ("c_upperarm{side}", "c_forearm{side}"),
+            "Deltoid":   ("c_shoulder{side}", "c_upperarm{side}"),
+            "Pectoral":  ("c_chest", "c_shoulder{side}"),
+            "Quad":      ("c_thigh{side}", "c_shin{side}"),
+            "Hamstring": ("c_thigh{side}", "c_shin{side}"),
+            "Calf":      ("c_shin{side}", "c_foot{side}"),
+            "Lat":       ("c_spine_02", "c_shoulder{side}"),
+        },
+    },
+    "RIGIFY": {
+        "label": "Rigify",
+        "markers": ("rig_id",),
+        "sides": (".L", ".R"),
+        "bones": {
+            "Biceps":    ("DEF-upper_arm{side}", "DEF-forearm{side}"),
+            "Triceps":   ("DEF-upper_arm{side}", "DEF-forearm{side}"),
+            "Deltoid":   ("DEF-shoulder{side}", "DEF-upper_arm{side}"),
+            "Pectoral":  ("DEF-spine.003", "DEF-shoulder{side}"),
+            "Quad":      ("DEF-thigh{side}", "DEF-shin{side}"),
+            "Hamstring": ("DEF-thigh{side}", "DEF-shin{side}"),
+            "Calf":      ("DEF-shin{side}", "DEF-foot{side}"),
+            "Lat":       ("DEF-spine.002", "DEF-shoulder{side}"),
+        },
+    },
+    "MIXAMO": {
+        "label": "Mixamo",
+        "markers": (),
+        "sides": ("Left", "Right"),
+        "bones": {
+            "Biceps":    ("{side}Arm", "{side}ForeArm"),
+            "Triceps":   ("{side}Arm", "{side}ForeArm"),
+            "Deltoid":   ("{side}Shoulder", "{side}Arm"),
+            "Pectoral":  ("Spine2", "{side}Shoulder"),
+            "Quad":      ("{side}UpLeg", "{side}Leg"),
+            "Hamstring": ("{side}UpLeg", "{side}Leg"),
+            "Calf":      ("{side}Leg", "{side}Foot"),
+            "Lat":       ("Spine1", "{side}Shoulder"),
+        },
+    },
+}
+
+SIDE_KEYS = ("_L", "_R")
+MIN_PROFILE_MATCH = 0.5  # Fraction of a profile's bones that must exist
+
+def register_profile(key, profile):
+    """Add or replace a rig profile (in-house rigs, studio variants)"""
+    for field in ("label", "sides", "bones"):
+        if field not in profile:
+            raise ValueError(f"Rig profile '{key}' is missing '{field}'")
+    profile.setdefault("markers", ())
+    RIG_PROFILES[key] = profile
+    _refresh_profile_items()
+    invalidate_rig_cache()
+
+def unregister_profile(key):
+    RIG_PROFILES.pop(key, None)
+    _refresh_profile_items()
+    invalidate_rig_cache()
+
+def expand_bone_map(profile_key):
+    """Expand a one-sided profile into {"Biceps_L": (b1, b2), ...}"""
+    profile = RIG_PROFILES[profile_key]
+    bone_map = {}
+    for muscle, pair in profile["bones"].items():
+        if not any("{side}" in name for name in pair):
+            bone_map[muscle] = pair
+            continue
+        for side_key, side in zip(SIDE_KEYS, profile["sides"]):
+            bone_map[muscle + side_key] = tuple(name.format(side=side) for name in pair)
+    return bone_map
+
+def profile_items(self, context):
+    return _PROFILE_ITEMS
+
+_PROFILE_ITEMS = []
+
+def _refresh_profile_items():
+    _PROFILE_ITEMS[:] = [('AUTO', "Auto-Detect", "Detect the rig type from bone names")]
+    _PROFILE_ITEMS.extend((k, p["label"], "") for k, p in RIG_PROFILES.items())
+
+# ===================================================================
+# BONE INDEX (single pass, cached per armature datablock)
+# Names only — RNA bone references go stale after undo. Keyed on the
+# datablock and its bone count; renames keep the count, so they clear the
+# cache through a message-bus subscription, as do undo and file loads.
+# ===================================================================
+_RIG_CACHE = {}
+_MSGBUS_OWNER = object()
+
+def invalidate_rig_cache(armature=None):
+    if armature is None:
+        _RIG_CACHE.clear()
+    else:
+        _RIG_CACHE.pop(armature.data.as_pointer(), None)
+
+def _build_entry(armature):
+    data = armature.data
+    index = {}
+    for bone in data.bones:
+        name = bone.name
+        index[name] = name
+        # Namespaced rigs (e.g. "mixamorig:LeftArm") are also indexed bare
+        if ":" in name:
+            index.setdefault(name.rsplit(":", 1)[1], name)
+
+    profile_key = None
+    for key, profile in RIG_PROFILES.items():
+        if any(data.get(m) for m in profile["markers"]):
+            profile_key = key
+            break
+    if profile_key is None:
+        best = 0.0
+        for key in RIG_PROFILES:
+            names = {n for pair in expand_bone_map(key).values() for n in pair}
+            score = sum(n in index for n in names) / max(len(names), 1)
+            if score > best:
+                profile_key, best = key, score
+        if best < MIN_PROFILE_MATCH:
+            profile_key = None
+    return {"count": len(data.bones), "index": index, "profile": profile_key}
+
+def get_bone_index(armature):
+    """Return the cached {name: bone name} index and detected profile key"""
+    ptr = armature.data.as_pointer()
+    entry = _RIG_CACHE.get(ptr)
+    if entry is None or entry["count"] != len(armature.data.bones):
+        entry = _RIG_CACHE[ptr] = _build_entry(armature)
+    return entry
+
+def detect_profile(armature, override='AUTO'):
+    """Profile key for this armature, or None if nothing matches"""
+    if not armature or armature.type != 'ARMATURE':
+        return None
+    if override != 'AUTO' and override in RIG_PROFILES:
+        return override
+    return get_bone_index(armature)["profile"]
+
+def resolve_bone_pairs(armature, muscles=None, profile_key=None):
+    """Resolve every muscle bone pair in one go.
+
+    Returns {muscle: (b1, b2)} with real bone names, or None for muscles
+    whose bones are missing on this armature.
+    """
+    profile_key = profile_key or detect_profile(armature)
+    if profile_key is None:
+        return {}
+    index = get_bone_index(armature)["index"]
+    resolved = {}
+    for muscle, pair in expand_bone_map(profile_key).items():
+        if muscles is not None and muscle not in muscles:
+            continue
+        names = tuple(index.get(n) for n in pair)
+        resolved[muscle] = names if all(names) else None
+    return resolved
+
+# ===================================================================
+# HANDLERS
+# ===================================================================
+def _subscribe_renames():
+    bpy.msgbus.clear_by_owner(_MSGBUS_OWNER)
+    for bone_type in (bpy.types.Bone, bpy.types.EditBone):
+        bpy.msgbus.subscribe_rna(key=(bone_type, "name"), owner=_MSGBUS_OWNER,
+                                 args=(), notify=invalidate_rig_cache)
+
+@persistent
+def clear_rig_cache(dummy):
+    invalidate_rig_cache()
+
+@persistent
+def rig_profiles_load_post(dummy):
+    # Loading a file drops every message-bus subscription
+    _subscribe_renames()
+
+def register():
+    _refresh_profile_items()
+    bpy.types.Scene.Rig_Profile = bpy.props.EnumProperty(
+        name="Rig Profile", items=profile_items,
+        description="Bone naming convention used to attach muscles")
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(clear_rig_cache)
+    bpy.app.handlers.load_post.append(rig_profiles_load_post)
+    _subscribe_renames()
+
+def unregister():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if clear_rig_cache in handlers:
+            handlers.remove(clear_rig_cache)
+    if rig_profiles_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(rig_profiles_load_post)
+    bpy.msgbus.clear_by_owner(_MSGBUS_OWNER)
+    if hasattr(bpy.types.Scene, "Rig_Profile"):
+        del bpy.types.Scene.Rig_Profile
+    invalidate_rig_cache()
@@ -0,0 +1,343 @@
+# rig_transfer.py — Muscle Rig Export / Import / Retarget
+# BlendArmory Muscles 3.3 — Tune one character, muscle them all
+
+import bpy
+import sys
+import json
+import zlib
+import base64
+import numpy as np
+from mathutils import Matrix
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+from .data import PRESETS
+from .geometry import mesh_coords, world_matrix, group_weights
+from .registry import muscles_of
+from .rig_profiles import detect_profile, expand_bone_map
+from .system_collections import link_to_system
+from .system import MUSCLE_BUILDERS, hook_bones, rig_muscle, update_muscle_type
+from .pins import pin_objects, add_pins
+from .node_muscles import is_node_muscle
+from .scrub_cache import SCRUB_KEY
+from .sparse_keys import sparse_keys
+
+# ===================================================================
+# SPEC FORMAT
+# JSON; arrays are zlib-compressed float32 / int32 in base64. Geometry is
+# stored in the muscle's local space, its placement relative to the rest
+# frame of its bone pair, so import only needs that frame on the target
+# and one scale factor (target bone distance / source bone distance).
+# ===================================================================
+SPEC_VERSION = 1
+
+# Set raw on import: their callbacks rescale the object or edit bones
+RAW_PROPS = ("Muscle_Type_INT", "Base_Length_INT", "Volume_INT", "Muscle_Size")
+PROPS = RAW_PROPS + (
+    "Muscle_Offset", "Jiggle_Springiness", "Jiggle_Stiffness", "Jiggle_Mass", "Jiggle_Damping",
+    "Muscle_Render", "Muscle_View3D", "Dynamics_Render", "Dynamics_View3D",
+    "Pinning_Render", "Pinning_View3D", "Pin_Size",
+    "Smooth_Adaptive", "Smooth_Max_Iterations", "Muscle_Activation",
+)
+TRANSIENT_KEYS = ("Basis", SCRUB_KEY)
+
+def _pack(a, dtype=np.float32):
+    return base64.b64encode(zlib.compress(np.ascontiguousarray(a, dtype=dtype).tobytes())).decode("ascii")
+
+def _unpack(s, dtype=np.float32):
+    return np.frombuffer(zlib.decompress(base64.b64decode(s)), dtype=dtype)
+
+def pair_frame(arm, b1, b2):
+    """(rest frame at b1 aimed +Z at b2, bone distance) in world space"""
+    aw = world_matrix(arm)
+    p1 = aw @ arm.data.bones[b1].head_local
+    direction = aw @ arm.data.bones[b2].head_local - p1
+    rot = direction.to_track_quat('Z', 'Y').to_matrix().to_4x4()
+    return Matrix.Translation(p1) @ rot, max(direction.length, 1e-6)
+
+def _muscle_bones(muscle):
+    """(origin, insertion) bone names: hooks, or constraints for node muscles"""
+    _, b1, b2 = hook_bones(muscle)
+    if b1:
+        return b1, b2
+    subs = [c.subtarget for c in muscle.constraints if c.type == 'COPY_LOCATION' and c.subtarget]
+    return (subs[0], subs[1]) if len(subs) >= 2 else (None, None)
+
+# ===================================================================
+# EXPORT
+# ===================================================================
+def export_muscle(muscle, arm):
+    b1, b2 = _muscle_bones(muscle)
+    if not b1:
+        return None
+    frame, length = pair_frame(arm, b1, b2)
+    rel = frame.inverted() @ world_matrix(muscle)
+    spec = {
+        "name": muscle.name,
+        "key": muscle.get("Muscle_Key"),
+        "mode": 'NODES' if is_node_muscle(muscle) else 'MESH',
+        # Muscles built before presets were recorded fall back to their activation profile
+        "preset": muscle.get("Muscle_Preset") or muscle.Muscle_Activation or None,
+        "bones": [b1, b2],
+        "length": length,
+        "matrix": [v for row in rel for v in row],
+        "props": {p: getattr(muscle, p) for p in PROPS if hasattr(muscle, p)},
+        "mirror": muscle.Muscle_Mirror.name if muscle.Muscle_Mirror else None,
+    }
+    if spec["mode"] == 'NODES':
+        return spec     # rebuilt from its preset; the shared node group does the rest
+
+    mesh = muscle.data
+    co = mesh_coords(mesh)
+    sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", sizes)
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    spec["co"], spec["sizes"], spec["loops"] = _pack(co), _pack(sizes, np.int32), _pack(loops, np.int32)
+
+    weights = dict(zip(muscle.vertex_groups.keys(), group_weights(muscle).T))
+    mw = world_matrix(muscle)
+    pins = []
+    for pin in pin_objects(muscle):
+        point = mw.inverted() @ pin.matrix_world.translation
+        pins.append({"point": list(point), "weights": _pack(weights.pop(pin.name, np.zeros(len(co))))})
+    spec["pins"] = pins
+    spec["groups"] = {name: _pack(w) for name, w in weights.items()}
+
+    keys = {}
+    if mesh.shape_keys:
+        for kb in mesh.shape_keys.key_blocks:
+            if kb.name not in TRANSIENT_KEYS:
+                kco = np.empty(len(co) * 3, dtype=np.float32)
+                kb.data.foreach_get("co", kco)
+                keys[kb.name] = _pack(kco.reshape(-1, 3) - co)
+    for name, (idx, delta) in sparse_keys(mesh).items():
+        dense = np.zeros_like(co)
+        dense[idx] = delta
+        keys[name] = _pack(dense)
+    spec["shape_keys"] = keys
+    return spec
+
+def export_spec(scene, arm):
+    """Serializable spec of every muscle on arm"""
+    muscles = [m for m in (export_muscle(m, arm) for m in muscles_of(scene, arm)) if m]
+    return {"version": SPEC_VERSION, "armature": arm.name, "muscles": muscles}
+
+# ===================================================================
+# IMPORT / RETARGET
+# ===================================================================
+def parse_bone_map(text):
+    """"src:dst, src2:dst2" -> {"src": "dst", ...}"""
+    pairs = (item.split(":", 1) for item in text.split(",") if ":" in item)
+    return {a.strip(): b.strip() for a, b in pairs}
+
+def retarget_bones(entry, arm, bone_map, profile_pairs):
+    """Bone pair of entry on arm: rig profile first, then bone_map, then same names"""
+    pair = profile_pairs.get(entry.get("key"))
+    if pair and all(b in arm.data.bones for b in pair):
+        return pair
+    pair = tuple(bone_map.get(b, b) for b in entry["bones"])
+    return pair if all(b in arm.data.bones for b in pair) else None
+
+def _apply_props(context, muscle, props):
+    for prop in RAW_PROPS:
+        if prop in props:
+            muscle[prop] = props[prop]
+    update_muscle_type(muscle, context)
+    for prop, value in props.items():
+        if prop not in RAW_PROPS and hasattr(muscle, prop):
+            setattr(muscle, prop, value)
+
+def import_muscle(context, entry, arm, b1, b2):
+    frame, length = pair_frame(arm, b1, b2)
+    scale = length / entry["length"]
+    rel = Matrix([entry["matrix"][i:i + 4] for i in range(0, 16, 4)])
+    rel.translation *= scale
+    props = entry["props"]
+
+    if entry["mode"] != 'MESH':
+        builder = MUSCLE_BUILDERS.get(entry["mode"])
+        if builder is None:
+            return None
+        preset = entry.get("preset") or props.get("Muscle_Activation")
+        if preset not in PRESETS:
+            return None     # rebuilding another shape would be silently wrong
+        muscle = builder(context, arm, arm.pose.bones[b1], arm.pose.bones[b2], preset, entry["name"])
+        _apply_props(context, muscle, props)
+        return muscle
+
+    co = _unpack(entry["co"]).reshape(-1, 3) * scale
+    sizes = _unpack(entry["sizes"], np.int32)
+    loops = _unpack(entry["loops"], np.int32)
+    faces = [f.tolist() for f in np.split(loops, np.cumsum(sizes)[:-1])] if len(sizes) else []
+    mesh = bpy.data.meshes.new("MuscleMesh")
+    mesh.from_pydata(co, [], faces)
+    mesh.update()
+
+    muscle = bpy.data.objects.new(entry["name"], mesh)
+    link_to_system(context, muscle, arm, "muscles")
+    muscle.parent = arm
+    muscle.matrix_parent_inverse = world_matrix(arm).inverted()
+    muscle.matrix_basis = frame @ rel
+
+    keys = {name: _unpack(d).reshape(-1, 3) * scale for name, d in entry["shape_keys"].items()}
+    weights = {name: _unpack(w) for name, w in entry["groups"].items()}
+    bulge = co + keys.pop("Bulge", np.zeros_like(co))
+    rig_muscle(context, muscle, arm, b1, b2, weights, bulge)
+    for name, delta in keys.items():
+        kb = muscle.shape_key_add(name=name, from_mix=False)
+        kb.data.foreach_set("co", (co + delta).ravel())
+
+    if entry["key"]:
+        muscle["Muscle_Key"] = entry["key"]
+    if entry.get("preset"):
+        muscle["Muscle_Preset"] = entry["preset"]
+    _apply_props(context, muscle, props)
+    if entry["pins"]:
+        add_pins(context, muscle, [(np.array(p["point"]) * scale, _unpack(p["weights"])) for p in entry["pins"]])
+    return muscle
+
+def import_spec(context, spec, arm, bone_map=None):
+    """Build spec's muscles on arm. Returns (built, skipped muscle names)."""
+    if spec.get("version", 0) > SPEC_VERSION:
+        raise ValueError(f"Muscle spec version {spec['version']} is newer than this add-on")
+    bone_map = bone_map or {}
+    profile = detect_profile(arm, context.scene.Rig_Profile)
+    profile_pairs = expand_bone_map(profile) if profile else {}
+
+    # Hooks bind at the current pose: build against the rest pose
+    pose_position = arm.data.pose_position
+    arm.data.pose_position = 'REST'
+    context.view_layer.update()
+    built, skipped = {}, []
+    try:
+        for entry in spec["muscles"]:
+            pair = retarget_bones(entry, arm, bone_map, profile_pairs)
+            muscle = import_muscle(context, entry, arm, *pair) if pair else None
+            if muscle is None:
+                skipped.append(entry["name"])
+            else:
+                built[entry["name"]] = muscle
+    finally:
+        arm.data.pose_position = pose_position
+
+    for entry in spec["muscles"]:
+        muscle, twin = built.get(entry["name"]), built.get(entry["mirror"])
+        if muscle and twin:
+            muscle.Muscle_Mirror = twin
+    return list(built.values()), skipped
+
+def write_spec(spec, filepath):
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(spec, f, separators=(",", ":"))
+
+def read_spec(filepath):
+    with open(filepath, encoding="utf-8") as f:
+        return json.load(f)
+
+# ===================================================================
+# HEADLESS BATCH
+# ===================================================================
+def apply_template(context, spec, armatures, bone_map=None):
+    """Import spec onto each armature. Returns {armature name: (built, skipped)}."""
+    return {arm.name: import_spec(context, spec, arm, bone_map) for arm in armatures}
+
+def batch_transfer(spec_path, blend_paths, bone_map=None):
+    """Open each .blend, muscle every armature without muscles, save it.
+
+    Meant for background runs, e.g.:
+        blender -b --python-expr "import <addon>.rig_transfer as t; t.run_batch()" \\
+            -- template.json hero.blend crowd_*.blend --map "upperarm:UpperArm"
+    """
+    spec = read_spec(spec_path)
+    report = {}
+    for path in blend_paths:
+        bpy.ops.wm.open_mainfile(filepath=path)
+        context = bpy.context
+        arms = [o for o in context.scene.objects
+                if o.type == 'ARMATURE' and not muscles_of(context.scene, o)]
+        results = apply_template(context, spec, arms, bone_map)
+        bpy.ops.wm.save_mainfile()
+        report[path] = {name: (len(built), skipped) for name, (built, skipped) in results.items()}
+        for name, (count, skipped) in report[path].items():
+            print(f"BlendArmory: {path} / {name}: {count} muscles"
+                  + (f", skipped {', '.join(skipped)}" if skipped else ""))
+    return report
+
+def run_batch(argv=None):
+    """Command-line entry: args after '--' are spec, blend files, [--map text]"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if argv is None and "--" in sys.argv else (argv or [])
+    bone_map = {}
+    if "--map" in argv:
+        i = argv.index("--map")
+        bone_map = parse_bone_map(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    if len(argv) < 2:
+        print("BlendArmory: usage: -- spec.json file.blend [file.blend ...] [--map src:dst,...]")
+        return {}
+    return batch_transfer(argv[0], argv[1:], bone_map)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_spec_export(bpy.types.Operator, ExportHelper):
+    """Save every muscle of the active armature as a reusable rig spec"""
+    bl_idname = "muscle.spec_export"
+    bl_label = "Export Muscle Rig"
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object and context.active_object.type == 'ARMATURE'
+
+    def execute(self, context):
+        spec = export_spec(context.scene, context.active_object)
+        if not spec["muscles"]:
+            self.report({'WARNING'}, "No hooked muscles on this armature")
+            return {'CANCELLED'}
+        write_spec(spec, self.filepath)
+        self.report({'INFO'}, f"Exported {len(spec['muscles'])} muscles")
+        return {'FINISHED'}
+
+class MUSCLE_OT_spec_import(bpy.types.Operator, ImportHelper):
+    """Build a saved muscle rig on every selected armature, scaled to its bones"""
+    bl_idname = "muscle.spec_import"
+    bl_label = "Import Muscle Rig"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+    bone_map: bpy.props.StringProperty(
+        name="Bone Map", default="",
+        description="Source:target bone renames, comma separated; rig profiles and equal names need none")
+
+    @classmethod
+    def poll(cls, context):
+        return any(o.type == 'ARMATURE' for o in context.selected_objects)
+
+    def execute(self, context):
+        try:
+            spec = read_spec(self.filepath)
+            arms = [o for o in context.selected_objects if o.type == 'ARMATURE']
+            results = apply_template(context, spec, arms, parse_bone_map(self.bone_map))
+        except (OSError, ValueError, KeyError) as e:
+            self.report({'ERROR'}, f"Cannot import muscle rig: {e}")
+            return {'CANCELLED'}
+        built = sum(len(b) for b, _ in results.values())
+        skipped = sum(len(s) for _, s in results.values())
+        self.report({'WARNING'} if skipped else {'INFO'},
+                    f"Built {built} muscles on {len(arms)} armatures"
+                    + (f", {skipped} without matching bones" if skipped else ""))
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_spec_export, MUSCLE_OT_spec_import)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
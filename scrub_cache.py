@@ -0,0 +1,273 @@
+# scrub_cache.py — In-Memory Scrub Cache
+# BlendArmory Muscles 3.3 — Frames you've seen come back instantly
+
+import bpy
+import numpy as np
+from collections import OrderedDict
+from bpy.app.handlers import persistent
+from .registry import muscles_of, all_muscles
+
+# ===================================================================
+# CACHE
+# One OrderedDict per scene: frame -> {muscle pointer: float32 coords},
+# most recently used last. A cached frame is shown through a pinned
+# shape key with the muscle's modifier stack switched off. That is an
+# edit of the muscle's ID data, so:
+#   - muscles with a live (unbaked) soft body are never cached, since any
+#     edit would reset their point cache; they keep evaluating normally
+#   - our own writes are made under _SUPPRESS and never count as rig edits
+#   - every served muscle goes back live before saving and rendering
+# ===================================================================
+SCRUB_KEY = "ScrubCache"
+SAVED_KEY = "Scrub_Stack"
+BASIS_KEY = "Scrub_Basis"            # set when the scrub key brought its own Basis
+
+_FRAMES = {}             # scene pointer -> OrderedDict
+_SERVED = {}             # scene pointer -> frame shown from the cache (or None)
+_SUPPRESS = False        # our own writes must not invalidate the cache
+_RENDERING = False       # renders always evaluate live
+
+def frame_cache(scene):
+    return _FRAMES.setdefault(scene.as_pointer(), OrderedDict())
+
+def cache_bytes(scene):
+    return sum(a.nbytes for frame in frame_cache(scene).values() for a in frame.values())
+
+def invalidate(scene=None):
+    """Drop cached frames (all scenes when scene is None)"""
+    if scene is None:
+        _FRAMES.clear()
+    else:
+        _FRAMES.pop(scene.as_pointer(), None)
+
+def _evict(scene):
+    cache = frame_cache(scene)
+    cap = scene.Muscle_Scrub_Cache_MB * 1024 * 1024
+    size = cache_bytes(scene)
+    while cache and size > cap:
+        _, dropped = cache.popitem(last=False)
+        size -= sum(a.nbytes for a in dropped.values())
+
+def _cacheable(muscle):
+    """No soft body, or one whose point cache is baked (edits cannot reset it)"""
+    return all(m.point_cache.is_baked for m in muscle.modifiers if m.type == 'SOFT_BODY')
+
+def target_muscles(scene):
+    arm = scene.Muscle_Scrub_Target
+    return [m for m in muscles_of(scene, arm) if _cacheable(m)] if arm else []
+
+# ===================================================================
+# CAPTURE / SERVE
+# ===================================================================
+def capture(scene, depsgraph, frame):
+    """Store the evaluated local coords of the target's muscles for frame"""
+    entry = {}
+    for muscle in target_muscles(scene):
+        mesh = muscle.evaluated_get(depsgraph).data
+        n = len(mesh.vertices)
+        if n != len(muscle.data.vertices):
+            continue    # topology-changing stack; cannot be shown through a shape key
+        co = np.empty(n * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        entry[muscle.as_pointer()] = co
+    if entry:
+        cache = frame_cache(scene)
+        cache[frame] = entry
+        cache.move_to_end(frame)
+        _evict(scene)
+
+def _scrub_key(muscle):
+    key = muscle.data.shape_keys
+    if not key:
+        muscle.shape_key_add(name="Basis")
+        muscle[BASIS_KEY] = True
+        key = muscle.data.shape_keys
+    kb = key.key_blocks.get(SCRUB_KEY)
+    if kb is None:
+        kb = muscle.shape_key_add(name=SCRUB_KEY, from_mix=False)
+        kb.value = 0.0
+    return kb
+
+def show_cached(muscle, co):
+    """Pin muscle to cached coords and switch its stack off"""
+    kb = _scrub_key(muscle)
+    kb.data.foreach_set("co", co)
+    if SAVED_KEY not in muscle:
+        muscle[SAVED_KEY] = {m.name: m.show_viewport for m in muscle.modifiers}
+        for m in muscle.modifiers:
+            m.show_viewport = False
+        muscle.active_shape_key_index = list(muscle.data.shape_keys.key_blocks).index(kb)
+        muscle.show_only_shape_key = True
+    muscle.data.update()
+
+def show_live(muscle):
+    """Undo show_cached: the stack evaluates again and the scrub key goes,
+    so a muscle without shape keys (e.g. packed sparse) gets no dense Basis"""
+    if SAVED_KEY not in muscle:
+        return
+    saved = muscle[SAVED_KEY]
+    for m in muscle.modifiers:
+        if m.name in saved:
+            m.show_viewport = bool(saved[m.name])
+    muscle.show_only_shape_key = False
+    del muscle[SAVED_KEY]
+    key = muscle.data.shape_keys
+    kb = key.key_blocks.get(SCRUB_KEY) if key else None
+    if kb:
+        muscle.shape_key_remove(kb)
+    if muscle.pop(BASIS_KEY, False) and key and len(key.key_blocks) == 1:
+        muscle.shape_key_clear()
+
+def serve(scene, muscles, entry):
+    """Show every muscle from a cached frame entry"""
+    global _SUPPRESS
+    _SUPPRESS = True
+    try:
+        for muscle in muscles:
+            show_cached(muscle, entry[muscle.as_pointer()])
+    finally:
+        _SUPPRESS = False
+
+def release(scene):
+    """Every muscle of the scene back to live evaluation"""
+    global _SUPPRESS
+    _SUPPRESS = True
+    try:
+        for muscle in all_muscles(scene):
+            show_live(muscle)
+    finally:
+        _SUPPRESS = False
+    _SERVED[scene.as_pointer()] = None
+
+# ===================================================================
+# HANDLERS
+# ===================================================================
+@persistent
+def scrub_frame_pre(scene, depsgraph=None):
+    if not scene.Muscle_Scrub_Cache or _RENDERING:
+        return
+    frame = scene.frame_current
+    cache = frame_cache(scene)
+    entry = cache.get(frame)
+    muscles = target_muscles(scene)
+    if not muscles or entry is None or any(m.as_pointer() not in entry for m in muscles):
+        if _SERVED.get(scene.as_pointer()) is not None:
+            release(scene)
+        return
+    cache.move_to_end(frame)
+    serve(scene, muscles, entry)
+    _SERVED[scene.as_pointer()] = frame
+
+@persistent
+def scrub_frame_post(scene, depsgraph=None):
+    if not scene.Muscle_Scrub_Cache or depsgraph is None or _RENDERING:
+        return
+    frame = scene.frame_current
+    if _SERVED.get(scene.as_pointer()) != frame:
+        capture(scene, depsgraph, frame)
+
+@persistent
+def scrub_depsgraph_post(scene, depsgraph):
+    # Posing, muscle property edits and keyframe changes all land here;
+    # plain frame changes do not
+    if _SUPPRESS or not scene.Muscle_Scrub_Cache or not frame_cache(scene):
+        return
+    arm = scene.Muscle_Scrub_Target
+    watched = {m.as_pointer() for m in target_muscles(scene)}
+    if arm:
+        watched.add(arm.as_pointer())
+    for update in depsgraph.updates:
+        idb = update.id.original
+        if isinstance(idb, (bpy.types.Action, bpy.types.Armature)) \
+                or (isinstance(idb, bpy.types.Object) and idb.as_pointer() in watched
+                    and (update.is_updated_transform or update.is_updated_geometry)):
+            invalidate(scene)
+            release(scene)
+            return
+
+@persistent
+def scrub_save_pre(dummy):
+    # Files never store a served frame
+    for scene in bpy.data.scenes:
+        release(scene)
+
+@persistent
+def scrub_render_init(scene, depsgraph=None):
+    global _RENDERING
+    _RENDERING = True
+    for s in bpy.data.scenes:
+        release(s)
+
+@persistent
+def scrub_render_done(scene, depsgraph=None):
+    global _RENDERING
+    _RENDERING = False
+
+@persistent
+def scrub_load_post(dummy):
+    invalidate()
+    _SERVED.clear()
+
+def update_scrub_cache(self, context):
+    invalidate(self)
+    release(self)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_scrub_cache_clear(bpy.types.Operator):
+    """Drop every cached frame and show live muscles"""
+    bl_idname = "muscle.scrub_cache_clear"
+    bl_label = "Clear Scrub Cache"
+
+    def execute(self, context):
+        scene = context.scene
+        frames, size = len(frame_cache(scene)), cache_bytes(scene)
+        invalidate(scene)
+        release(scene)
+        self.report({'INFO'}, f"Freed {frames} frames ({size / 1048576:.1f} MB)")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_scrub_cache_clear,)
+
+_HANDLERS = (
+    (bpy.app.handlers.frame_change_pre, scrub_frame_pre),
+    (bpy.app.handlers.frame_change_post, scrub_frame_post),
+    (bpy.app.handlers.depsgraph_update_post, scrub_depsgraph_post),
+    (bpy.app.handlers.load_post, scrub_load_post),
+    (bpy.app.handlers.save_pre, scrub_save_pre),
+    (bpy.app.handlers.render_init, scrub_render_init),
+    (bpy.app.handlers.render_complete, scrub_render_done),
+    (bpy.app.handlers.render_cancel, scrub_render_done),
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.Muscle_Scrub_Cache = bpy.props.BoolProperty(
+        name="Scrub Cache", default=False, update=update_scrub_cache,
+        description="Keep evaluated muscle frames in memory and replay them while the rig is unchanged")
+    bpy.types.Scene.Muscle_Scrub_Target = bpy.props.PointerProperty(
+        name="Character", type=bpy.types.Object, poll=lambda self, obj: obj.type == 'ARMATURE',
+        update=update_scrub_cache, description="Armature whose muscles are cached")
+    bpy.types.Scene.Muscle_Scrub_Cache_MB = bpy.props.IntProperty(
+        name="Memory Cap (MB)", default=512, min=16, max=65536,
+        description="Least recently shown frames are dropped beyond this size")
+    for handlers, fn in _HANDLERS:
+        handlers.append(fn)
+
+def unregister():
+    for handlers, fn in _HANDLERS:
+        if fn in handlers:
+            handlers.remove(fn)
+    for scene in bpy.data.scenes:
+        release(scene)
+    invalidate()
+    for prop in ("Muscle_Scrub_Cache", "Muscle_Scrub_Target", "Muscle_Scrub_Cache_MB"):
+        if hasattr(bpy.types.Scene, prop):
+            delattr(bpy.types.Scene, prop)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
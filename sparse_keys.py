@@ -0,0 +1,333 @@
+# sparse_keys.py — Sparse Muscle Shape Keys
+# BlendArmory Muscles 3.3 — Store what moves, not every vertex
+
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+from .registry import all_muscles
+from .modifier_stack import order_stack, register_group_rank, input_id, SHAPE_RANK
+from .activation import write_activation
+from .scrub_cache import SCRUB_KEY
+
+# ===================================================================
+# STORAGE
+# A packed key lives on the mesh as {name: {"idx": int32 bytes, "delta":
+# float32 bytes}} holding only the vertices it moves. Its Basis and dense
+# copy are gone; in memory one point attribute per key is applied by a
+# shared node group ahead of the hooks (the shape key slot), driven like
+# the key was. Dense attributes are dropped while saving, so files carry
+# only the sparse deltas, and rebuilt on load. Unpack turns everything
+# back into ordinary shape keys.
+# Runtime memory is NOT sparse: each packed key still costs one dense
+# vector per vertex (only the Basis is saved), plus one Set Position
+# pass per key and frame. The saving is on disk and in undo/save time.
+# ===================================================================
+SPARSE_PROP = "Muscle_Sparse_Keys"
+GROUP_NAME = "BlendArmory Sparse Key"
+ATTR_PREFIX = "sparse_"
+MOD_PREFIX = "Sparse "
+TRANSIENT_KEYS = (SCRUB_KEY,)
+
+def sparse_keys(mesh):
+    """{key name: (indices, (M, 3) deltas)} packed on mesh"""
+    stored = mesh.get(SPARSE_PROP)
+    if not stored:
+        return {}
+    return {name: (np.frombuffer(bytes(entry["idx"]), dtype=np.int32),
+                   np.frombuffer(bytes(entry["delta"]), dtype=np.float32).reshape(-1, 3))
+            for name, entry in stored.items()}
+
+def sparse_bytes(mesh):
+    return sum(idx.nbytes + delta.nbytes for idx, delta in sparse_keys(mesh).values())
+
+def dense_key_bytes(mesh):
+    """Coordinate storage of mesh's shape keys, Basis included"""
+    key = mesh.shape_keys
+    return len(key.key_blocks) * len(mesh.vertices) * 12 if key else 0
+
+def packable(kb):
+    return (kb.name not in TRANSIENT_KEYS and kb != kb.relative_key
+            and kb.relative_key == kb.id_data.reference_key and not kb.vertex_group)
+
+# ===================================================================
+# NODE GROUP
+# ===================================================================
+def sparse_group(name=GROUP_NAME):
+    """Shared group: Set Position offset = named vector attribute * Value"""
+    ng = bpy.data.node_groups.get(name)
+    if ng is not None:
+        return ng
+    ng = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    ng.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    ng.interface.new_socket("Attribute", in_out='INPUT', socket_type='NodeSocketString')
+    value = ng.interface.new_socket("Value", in_out='INPUT', socket_type='NodeSocketFloat')
+    value.default_value, value.min_value, value.max_value = 0.0, -10.0, 10.0
+    ng.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes, links = ng.nodes, ng.links
+    gin = nodes.new("NodeGroupInput")
+    gin.location = (-600, 0)
+    attr = nodes.new("GeometryNodeInputNamedAttribute")
+    attr.data_type = 'FLOAT_VECTOR'
+    attr.location = (-350, -200)
+    links.new(gin.outputs["Attribute"], attr.inputs["Name"])
+    scale = nodes.new("ShaderNodeVectorMath")
+    scale.operation = 'SCALE'
+    scale.location = (-150, -200)
+    links.new(attr.outputs["Attribute"], scale.inputs[0])
+    links.new(gin.outputs["Value"], scale.inputs["Scale"])
+    setpos = nodes.new("GeometryNodeSetPosition")
+    setpos.location = (50, 0)
+    links.new(gin.outputs["Geometry"], setpos.inputs["Geometry"])
+    links.new(scale.outputs["Vector"], setpos.inputs["Offset"])
+    gout = nodes.new("NodeGroupOutput")
+    gout.location = (250, 0)
+    links.new(setpos.outputs[0], gout.inputs[0])
+    return ng
+
+def materialize(mesh, name, idx, delta):
+    """Dense point attribute of a packed key (in memory only)"""
+    attr_name = ATTR_PREFIX + name
+    attr = mesh.attributes.get(attr_name) or mesh.attributes.new(attr_name, 'FLOAT_VECTOR', 'POINT')
+    dense = np.zeros((len(mesh.vertices), 3), dtype=np.float32)
+    dense[idx] = delta
+    attr.data.foreach_set("vector", dense.ravel())
+
+def mirror_sparse(mesh):
+    """Reflect packed deltas (and their attributes) in local X"""
+    keys = sparse_keys(mesh)
+    stored = {}
+    for name, (idx, delta) in keys.items():
+        delta = delta * np.array((-1.0, 1.0, 1.0), dtype=np.float32)
+        stored[name] = {"idx": idx.tobytes(), "delta": delta.tobytes()}
+        materialize(mesh, name, idx, delta)
+    if stored:
+        mesh[SPARSE_PROP] = stored
+
+def key_value_target(muscle, name):
+    """(id_type, id, data_path) of shape key name's value, packed or not; None if absent"""
+    key = muscle.data.shape_keys
+    if key and name in key.key_blocks:
+        return 'KEY', key, f'key_blocks["{name}"].value'
+    mod = muscle.modifiers.get(MOD_PREFIX + name)
+    if mod and mod.node_group and name in muscle.data.get(SPARSE_PROP, {}):
+        return 'OBJECT', muscle, f'modifiers["{mod.name}"]["{input_id(mod.node_group, "Value")}"]'
+    return None
+
+def key_driver(muscle, name):
+    """Driver F-curve of shape key name's value (packed or not), added if missing"""
+    target = key_value_target(muscle, name)
+    if target is None:
+        return None
+    _, idb, path = target
+    fc = idb.animation_data.drivers.find(path) if idb.animation_data else None
+    return fc or idb.driver_add(path)
+
+def drop_attributes(mesh):
+    for name in sparse_keys(mesh):
+        attr = mesh.attributes.get(ATTR_PREFIX + name)
+        if attr:
+            mesh.attributes.remove(attr)
+
+# ===================================================================
+# DRIVERS
+# ===================================================================
+def copy_driver(src_fc, dst_fc):
+    src, dst = src_fc.driver, dst_fc.driver
+    dst.type = src.type
+    dst.expression = src.expression
+    while dst.variables:
+        dst.variables.remove(dst.variables[0])
+    for var in src.variables:
+        new_var = dst.variables.new()
+        new_var.name = var.name
+        new_var.type = var.type
+        for i, t in enumerate(var.targets):
+            nt = new_var.targets[i]
+            if var.type == 'SINGLE_PROP':
+                nt.id_type = t.id_type
+            nt.id = t.id
+            nt.data_path = t.data_path
+            nt.bone_target = t.bone_target
+            nt.transform_type = t.transform_type
+            nt.transform_space = t.transform_space
+
+def _retarget_reads(muscle, old, new):
+    """Point driver variables reading old (id, data_path) at new (id_type, id, data_path)"""
+    key = muscle.data.shape_keys
+    for anim in (muscle.animation_data, key.animation_data if key else None):
+        for fc in anim.drivers if anim else []:
+            for var in fc.driver.variables:
+                if var.type != 'SINGLE_PROP':
+                    continue
+                t = var.targets[0]
+                if (t.id, t.data_path) == old:
+                    t.id_type, t.id, t.data_path = new
+
+# ===================================================================
+# PACK / UNPACK
+# ===================================================================
+def pack_muscle(context, muscle, tolerance=1e-5):
+    """Replace muscle's shape keys with sparse storage. Returns (keys, moved verts)."""
+    mesh = muscle.data
+    key = mesh.shape_keys
+    if not key:
+        return 0, 0
+    n = len(mesh.vertices)
+    basis = np.empty(n * 3, dtype=np.float32)
+    key.reference_key.data.foreach_get("co", basis)
+    basis = basis.reshape(-1, 3)
+    stored = {name: {"idx": idx.tobytes(), "delta": delta.tobytes()}
+              for name, (idx, delta) in sparse_keys(mesh).items()}
+    ng = sparse_group()
+    packed, moved = 0, 0
+    for kb in [kb for kb in key.key_blocks if packable(kb)]:
+        co = np.empty(n * 3, dtype=np.float32)
+        kb.data.foreach_get("co", co)
+        delta = co.reshape(-1, 3) - basis
+        idx = np.flatnonzero(np.abs(delta).max(axis=1) > tolerance).astype(np.int32)
+        stored[kb.name] = {"idx": idx.tobytes(), "delta": np.ascontiguousarray(delta[idx]).tobytes()}
+        materialize(mesh, kb.name, idx, delta[idx])
+
+        mod = muscle.modifiers.new(MOD_PREFIX + kb.name, 'NODES')
+        mod.node_group = ng
+        mod[input_id(ng, "Attribute")] = ATTR_PREFIX + kb.name
+        value_id = input_id(ng, "Value")
+        mod[value_id] = kb.value
+        path = f'key_blocks["{kb.name}"].value'
+        src_fc = key.animation_data.drivers.find(path) if key.animation_data else None
+        if src_fc:
+            dst_fc = mod.driver_add(f'["{value_id}"]')
+            copy_driver(src_fc, dst_fc)
+            write_activation(dst_fc, muscle)
+        _retarget_reads(muscle, (key, path), ('OBJECT', muscle, f'modifiers["{mod.name}"]["{value_id}"]'))
+        if src_fc:
+            key.driver_remove(path)
+        muscle.shape_key_remove(kb)
+        packed += 1
+        moved += len(idx)
+
+    if packed:
+        mesh[SPARSE_PROP] = stored
+        if len(mesh.shape_keys.key_blocks) == 1:
+            muscle.shape_key_clear()    # a lone Basis is one more full copy
+        order_stack(context, muscle)
+    return packed, moved
+
+def unpack_muscle(context, muscle):
+    """Materialize packed keys as shape keys again. Returns the number of keys."""
+    mesh = muscle.data
+    keys = sparse_keys(mesh)
+    if not keys:
+        return 0
+    if not mesh.shape_keys:
+        muscle.shape_key_add(name="Basis")
+    key = mesh.shape_keys
+    basis = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    key.reference_key.data.foreach_get("co", basis)
+    basis = basis.reshape(-1, 3)
+    ng = sparse_group()
+    value_id = input_id(ng, "Value")
+    for name, (idx, delta) in keys.items():
+        co = basis.copy()
+        co[idx] += delta
+        kb = muscle.shape_key_add(name=name, from_mix=False)
+        kb.data.foreach_set("co", co.ravel())
+        path = f'key_blocks["{name}"].value'
+        mod = muscle.modifiers.get(MOD_PREFIX + name)
+        if mod:
+            kb.value = mod[value_id]
+            src_path = f'["{value_id}"]'
+            src_fc = muscle.animation_data.drivers.find(f'modifiers["{mod.name}"]{src_path}') \
+                if muscle.animation_data else None
+            if src_fc:
+                dst_fc = kb.driver_add("value")
+                copy_driver(src_fc, dst_fc)
+                write_activation(dst_fc, muscle)
+                mod.driver_remove(src_path)
+            _retarget_reads(muscle, (muscle, f'modifiers["{mod.name}"]["{value_id}"]'), ('KEY', key, path))
+            muscle.modifiers.remove(mod)
+    drop_attributes(mesh)
+    del mesh[SPARSE_PROP]
+    return len(keys)
+
+# ===================================================================
+# HANDLERS (files hold sparse deltas only)
+# ===================================================================
+def _packed_meshes():
+    return [m for m in bpy.data.meshes if SPARSE_PROP in m]
+
+@persistent
+def sparse_save_pre(*args):
+    for mesh in _packed_meshes():
+        drop_attributes(mesh)
+
+@persistent
+def sparse_restore(*args):
+    for mesh in _packed_meshes():
+        for name, (idx, delta) in sparse_keys(mesh).items():
+            materialize(mesh, name, idx, delta)
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_sparse_keys(bpy.types.Operator):
+    """Store every muscle's shape keys as sparse deltas, or turn them back into shape keys"""
+    bl_idname = "muscle.sparse_keys"
+    bl_label = "Sparse Shape Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    pack: bpy.props.BoolProperty(name="Pack", default=True)
+    tolerance: bpy.props.FloatProperty(name="Tolerance", default=1e-5, min=0.0, max=0.01, precision=6,
+                                       description="Vertices moving less than this are dropped from a key")
+
+    def execute(self, context):
+        muscles = all_muscles(context.scene)
+        if not self.pack:
+            count = sum(unpack_muscle(context, m) for m in muscles)
+            self.report({'INFO'}, f"Restored {count} shape keys")
+            return {'FINISHED'}
+
+        dense = sparse = runtime = 0
+        print(f"\nBlendArmory: Sparse shape keys ({len(muscles)} muscles)")
+        for muscle in muscles:
+            before = dense_key_bytes(muscle.data)
+            keys, moved = pack_muscle(context, muscle, self.tolerance)
+            if not keys:
+                continue
+            after = dense_key_bytes(muscle.data)
+            dense += before - after
+            sparse += sparse_bytes(muscle.data)
+            runtime += before - after - keys * len(muscle.data.vertices) * 12
+            print(f"  {muscle.name:<24} {keys} keys, {moved:>6} of {len(muscle.data.vertices) * keys:>6} verts, "
+                  f"{(before - after) / 1024:8.1f} KB dense -> {sparse_bytes(muscle.data) / 1024:8.1f} KB sparse")
+        # In memory each packed key keeps one dense attribute: only the Basis copy is gone
+        self.report({'INFO'}, f"File: {dense / 1048576:.2f} MB of shape keys -> {sparse / 1048576:.2f} MB sparse; "
+                              f"runtime memory only {runtime / 1048576:.2f} MB less (dense attributes remain)")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MUSCLE_OT_sparse_keys,)
+
+_HANDLERS = (
+    (bpy.app.handlers.save_pre, sparse_save_pre),
+    (bpy.app.handlers.save_post, sparse_restore),
+    (bpy.app.handlers.load_post, sparse_restore),
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    register_group_rank(GROUP_NAME, SHAPE_RANK)
+    for handlers, fn in _HANDLERS:
+        handlers.append(fn)
+
+def unregister():
+    for handlers, fn in _HANDLERS:
+        if fn in handlers:
+            handlers.remove(fn)
+    register_group_rank(GROUP_NAME)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -2,20 +2,30 @@
 # BlendArmory Muscles 3.3 — No more errors, guaranteed
 
 import bpy
-from mathutils import Vector
-from math import pi, sin, cos
+import numpy as np
+from mathutils import Vector, Matrix
 from bpy.app.handlers import persistent
 from .data import (
-    MUSCLE_VERTS_BASIC, JIGGLE_IDX, PIN_IDX, STYLE_IDX, STRIP_IDX,
+    MUSCLE_VERTS_BASIC, STYLE_IDX, STRIP_IDX,
     PRESETS, NAMES
 )
-from .arp_integration import is_arp_rig
+from .rig_profiles import RIG_PROFILES, detect_profile
+from .bbone_muscles import build_bbone_muscles
+from .pins import pin_objects, add_pins, remove_pin, clear_pins, bindings_along_axis
+from .geometry import mesh_coords, principal_axis, align_axis, axial_param, attachment_weights, world_matrix, write_group_weights, belly_weights, group_weights
+from .registry import register_muscle, unregister_muscle
+from .system_collections import link_to_system
+from .modifier_stack import order_stack
+from .collision import remove_collision
+from .sparse_keys import mirror_sparse
+from .activation import activation_fcurves, write_activation, bulge_expression
 
 # ===================================================================
 # CUSTOM PROPERTY GROUP
 # ===================================================================
 class CustomProp(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(name="Pin Name")
+    pin: bpy.props.PointerProperty(name="Pin", type=bpy.types.Object)
 
 # ===================================================================
 # CUSTOM PROPERTIES (SAFE REGISTRATION)
@@ -23,27 +33,32 @@ class CustomProp(bpy.types.PropertyGroup):
 def register_properties():
     bpy.types.Object.Muscle_XID = bpy.props.BoolProperty(default=False)
     bpy.types.Object.Muscle_Type_INT = bpy.props.BoolProperty(
-        name="Flexor (0) / Extensor (1)", default=False, update=update_muscle_type)
+        name="Flexor (0) / Extensor (1)", default=False, update=mirrored("Muscle_Type_INT", update_muscle_type))
+    bpy.types.Object.Muscle_Activation = bpy.props.StringProperty(
+        name="Activation", default="", update=mirrored("Muscle_Activation", update_muscle_activation),
+        description="Activation curve mapping joint angle to bulge (empty: linear response)")
     bpy.types.Object.Base_Length_INT = bpy.props.FloatProperty(
-        name="Base Length", default=1.0, min=0.5, max=3.0, update=update_base_length)
+        name="Base Length", default=1.0, min=0.5, max=3.0, update=mirrored("Base_Length_INT", update_base_length))
     bpy.types.Object.Volume_INT = bpy.props.FloatProperty(
-        name="Volume", default=1.0, min=0.1, max=10.0, update=update_volume)
+        name="Volume", default=1.0, min=0.1, max=10.0, update=mirrored("Volume_INT", update_volume))
     bpy.types.Object.Muscle_Size = bpy.props.FloatProperty(
-        name="Muscle Size", default=0.6, min=0.05, max=3.0, update=update_muscle_size)
+        name="Muscle Size", default=0.6, min=0.05, max=3.0, update=mirrored("Muscle_Size", update_muscle_size))
     bpy.types.Object.Muscle_Offset = bpy.props.FloatProperty(
-        name="Skin Offset", default=0.0, min=-0.5, max=0.5)
-    bpy.types.Object.Jiggle_Springiness = bpy.props.FloatProperty(default=0.75, min=0.001, max=1.0, update=update_jiggle_springiness)
-    bpy.types.Object.Jiggle_Stiffness = bpy.props.FloatProperty(default=0.75, min=0.001, max=1.0, update=update_jiggle_stiffness)
-    bpy.types.Object.Jiggle_Mass = bpy.props.FloatProperty(default=0.75, min=0.001, max=2.0, update=update_jiggle_mass)
-    bpy.types.Object.Jiggle_Damping = bpy.props.FloatProperty(default=37.5, min=0.001, max=100.0, update=update_jiggle_damping)
-
-    bpy.types.Object.Muscle_Render = bpy.props.BoolProperty(default=True, update=update_muscle_render)
-    bpy.types.Object.Muscle_View3D = bpy.props.BoolProperty(default=True, update=update_muscle_view3d)
-    bpy.types.Object.Dynamics_Render = bpy.props.BoolProperty(default=True, update=update_dynamics_render)
-    bpy.types.Object.Dynamics_View3D = bpy.props.BoolProperty(default=True, update=update_dynamics_view3d)
+        name="Skin Offset", default=0.0, min=-0.5, max=0.5, update=mirrored("Muscle_Offset"))
+    bpy.types.Object.Jiggle_Springiness = bpy.props.FloatProperty(default=0.75, min=0.001, max=1.0, update=mirrored("Jiggle_Springiness", update_jiggle_springiness))
+    bpy.types.Object.Jiggle_Stiffness = bpy.props.FloatProperty(default=0.75, min=0.001, max=1.0, update=mirrored("Jiggle_Stiffness", update_jiggle_stiffness))
+    bpy.types.Object.Jiggle_Mass = bpy.props.FloatProperty(default=0.75, min=0.001, max=2.0, update=mirrored("Jiggle_Mass", update_jiggle_mass))
+    bpy.types.Object.Jiggle_Damping = bpy.props.FloatProperty(default=37.5, min=0.001, max=100.0, update=mirrored("Jiggle_Damping", update_jiggle_damping))
+
+    bpy.types.Object.Muscle_Render = bpy.props.BoolProperty(default=True, update=mirrored("Muscle_Render", update_muscle_render))
+    bpy.types.Object.Muscle_View3D = bpy.props.BoolProperty(default=True, update=mirrored("Muscle_View3D", update_muscle_view3d))
+    bpy.types.Object.Dynamics_Render = bpy.props.BoolProperty(default=True, update=mirrored("Dynamics_Render", update_dynamics_render))
+    bpy.types.Object.Dynamics_View3D = bpy.props.BoolProperty(default=True, update=mirrored("Dynamics_View3D", update_dynamics_view3d))
     bpy.types.Object.Pinning_Render = bpy.props.BoolProperty(default=True, update=update_pinning_render)
     bpy.types.Object.Pinning_View3D = bpy.props.BoolProperty(default=True, update=update_pinning_view3d)
     bpy.types.Object.Pin_Size = bpy.props.FloatProperty(default=0.1, min=0.01, max=1.0, update=update_pin_size)
+    bpy.types.Object.Muscle_Mirror = bpy.props.PointerProperty(
+        name="Mirror", type=bpy.types.Object, description="Opposite-side muscle kept in sync with this one")
 
     bpy.types.Scene.Muscle_Scale = bpy.props.FloatProperty(default=1.0, min=0.1, max=5.0)
     bpy.types.Scene.Create_Type = bpy.props.EnumProperty(
@@ -52,6 +67,11 @@ def register_properties():
     bpy.types.Scene.Muscle_Name = bpy.props.StringProperty(default="Muscle")
     bpy.types.Scene.Prefix = bpy.props.StringProperty(default="XMSL_")
     bpy.types.Scene.Suffix = bpy.props.StringProperty(default=".L")
+    bpy.types.Scene.Muscle_Skin = bpy.props.PointerProperty(
+        name="Skin", type=bpy.types.Object, poll=lambda self, obj: obj.type == 'MESH' and "Muscle_XID" not in obj,
+        description="Skin mesh that new muscles shrinkwrap to")
+    bpy.types.Scene.Muscle_Mirror_Mode = bpy.props.BoolProperty(
+        name="Mirror", default=False, description="Also create the opposite-side muscle by reflecting this one")
 
     # Pinning List
     bpy.types.Object.custom = bpy.props.CollectionProperty(type=CustomProp)
@@ -59,16 +79,16 @@ def register_properties():
 
 def unregister_properties():
     props = [
-        "Muscle_XID", "Muscle_Type_INT", "Base_Length_INT", "Volume_INT",
+        "Muscle_XID", "Muscle_Type_INT", "Muscle_Activation", "Base_Length_INT", "Volume_INT",
         "Muscle_Size", "Muscle_Offset", "Jiggle_Springiness", "Jiggle_Stiffness",
         "Jiggle_Mass", "Jiggle_Damping", "Muscle_Render", "Muscle_View3D",
         "Dynamics_Render", "Dynamics_View3D", "Pinning_Render", "Pinning_View3D",
-        "Pin_Size", "custom", "custom_index"
+        "Pin_Size", "Muscle_Mirror", "custom", "custom_index"
     ]
     for prop in props:
         if hasattr(bpy.types.Object, prop):
             delattr(bpy.types.Object, prop)
-    scene_props = ["Muscle_Scale", "Create_Type", "use_Affixes", "Muscle_Name", "Prefix", "Suffix"]
+    scene_props = ["Muscle_Scale", "Create_Type", "use_Affixes", "Muscle_Name", "Prefix", "Suffix", "Muscle_Mirror_Mode", "Muscle_Skin"]
     for prop in scene_props:
         if hasattr(bpy.types.Scene, prop):
             delattr(bpy.types.Scene, prop)
@@ -76,13 +96,33 @@ def unregister_properties():
 # ===================================================================
 # CALLBACKS
 # ===================================================================
+_mirror_syncing = False
+
+def mirrored(prop, update=None):
+    """Wrap an update callback so the edit is also applied to the linked mirror"""
+    def _update(self, context):
+        global _mirror_syncing
+        if update:
+            update(self, context)
+        other = getattr(self, "Muscle_Mirror", None)
+        if _mirror_syncing or other is None or getattr(other, prop) == getattr(self, prop):
+            return
+        _mirror_syncing = True
+        try:
+            setattr(other, prop, getattr(self, prop))
+        finally:
+            _mirror_syncing = False
+    return _update
+
 def update_muscle_type(self, context):
     if not (hasattr(self, "parent") and self.parent.type == 'ARMATURE'):
         return
-    for sk in self.data.shape_keys.key_blocks if self.data.shape_keys else []:
-        if sk.name == "Bulge" and sk.driver_add("value").driver:
-            drv = sk.driver_add("value").driver
-            drv.expression = "max(-a,0)" if self.Muscle_Type_INT else "max(a,0)"
+    for fc in activation_fcurves(self):
+        fc.driver.expression = bulge_expression(self, fc.driver)
+
+def update_muscle_activation(self, context):
+    for fc in activation_fcurves(self):
+        write_activation(fc, self)
 
 def update_base_length(self, context):
     if self.parent and self.parent.type == 'ARMATURE':
@@ -136,22 +176,423 @@ def update_dynamics_view3d(self, context):
         sb.show_viewport = self.Dynamics_View3D
 
 def update_pinning_render(self, context):
-    for item in self.custom:
-        pin = bpy.data.objects.get(item.name)
-        if pin:
-            pin.hide_render = not self.Pinning_Render
+    for pin in pin_objects(self):
+        pin.hide_render = not self.Pinning_Render
 
 def update_pinning_view3d(self, context):
-    for item in self.custom:
-        pin = bpy.data.objects.get(item.name)
-        if pin:
-            pin.hide_viewport = not self.Pinning_View3D
+    for pin in pin_objects(self):
+        pin.hide_viewport = not self.Pinning_View3D
 
 def update_pin_size(self, context):
-    for item in self.custom:
-        pin = bpy.data.objects.get(item.name)
-        if pin:
-            pin.empty_display_size = self.Pin_Size
+    for pin in pin_objects(self):
+        pin.empty_display_size = self.Pin_Size
+
+def hook_bones(muscle):
+    """(armature, origin bone, insertion bone) the muscle is hooked to, or Nones"""
+    hooks = {m.name: m for m in muscle.modifiers if m.type == 'HOOK'}
+    o, i = hooks.get("Hook_Origin"), hooks.get("Hook_Insertion")
+    if not (o and i and o.object and o.object == i.object and o.subtarget and i.subtarget):
+        return None, None, None
+    return o.object, o.subtarget, i.subtarget
+
+# ===================================================================
+# MUSCLE BUILDER (shared by every creation path — no selection needed)
+# ===================================================================
+TRACK_AXIS = (0.0, 0.0, 1.0)   # local axis aimed from the origin bone to the insertion bone
+
+def plan_muscle(preset, length):
+    """Geometry, bulge shape and group weights of one muscle as NumPy arrays.
+
+    Touches no bpy data, so it is safe on a worker thread; commit_muscle()
+    writes the result on the main thread.
+    """
+    pr = PRESETS[preset]
+    verts_type = pr["verts"]
+
+    # Verts selection based on type (fallback to all if truncated)
+    if verts_type == "STYLE":
+        idx = STYLE_IDX
+    elif verts_type == "STRIP":
+        idx = STRIP_IDX
+    else:
+        idx = range(len(MUSCLE_VERTS_BASIC))
+    verts = [MUSCLE_VERTS_BASIC[i] for i in idx if i < len(MUSCLE_VERTS_BASIC)]  # Safe for truncation
+
+    # If verts are few/incomplete, use fallback cylinder mesh
+    if len(verts) < 10:  # Arbitrary threshold for truncation check
+        verts, edges, faces = create_cylinder_mesh(0.5, length, 16, 10)   # already along Z
+        co = np.asarray(verts, dtype=np.float32).reshape(-1, 3)
+    else:
+        edges = []  # Assume no edges if using point data; add remesh if needed
+        faces = []
+        # The shape data is long along its own X; the object tracks local Z
+        # to the insertion bone, so turn the measured long axis onto Z
+        co = np.array(verts, dtype=np.float32).reshape(-1, 3)
+        _, axis, _ = principal_axis(co)
+        if axis[np.argmax(np.abs(axis))] < 0.0:
+            axis = -axis
+        co = align_axis(co, axis, TRACK_AXIS)
+
+    return {
+        "co": co,
+        "edges": edges,
+        "faces": faces,
+        "bulge": co * (1.0 + pr["bulge"]),  # Simple scale; add volume preservation later
+        "weights": muscle_weights(co, axis=TRACK_AXIS),
+    }
+
+def muscle_weights(co, toward=(0.0, 0.0, 1.0), axis=None):
+    """Jiggle, origin and insertion weights for local coords co, by group name.
+
+    Topology-independent: each vertex is weighted by its normalized position
+    along axis (origin to insertion). Without a known axis the principal
+    axis of co is used, oriented toward the insertion end; a stubby shape
+    can be wider than it is long, so pass the axis whenever it is known.
+    """
+    if axis is None:
+        _, axis, _ = principal_axis(co)
+        if axis @ np.asarray(toward, dtype=np.float32) < 0.0:
+            axis = -axis
+    origin, insertion, jiggle = attachment_weights(axial_param(co, axis))
+    return {NAMES["vertexGroupName"]: jiggle, "origin": origin, "insertion": insertion}
+
+def hook_axis(muscle):
+    """Local unit axis from the origin hook's bone to the insertion hook's, or None"""
+    ends = []
+    for name in ("Hook_Origin", "Hook_Insertion"):
+        hook = muscle.modifiers.get(name)
+        if hook is None or hook.object is None or hook.object.type != 'ARMATURE' \
+                or hook.subtarget not in hook.object.pose.bones:
+            return None
+        ends.append(world_matrix(hook.object) @ hook.object.pose.bones[hook.subtarget].head)
+    to_local = world_matrix(muscle).inverted()
+    d = (to_local @ ends[1]) - (to_local @ ends[0])
+    return tuple(d.normalized()) if d.length > 1e-6 else None
+
+def build_muscle(context, arm, b1, b2, preset, name=None):
+    """Build one muscle between pose bones b1 and b2 of armature arm"""
+    length = ((arm.matrix_world @ b2.head) - (arm.matrix_world @ b1.head)).length
+    return commit_muscle(context, arm, b1, b2, preset, plan_muscle(preset, length), name)
+
+# Builders by Scene.Muscle_Mode, all (context, arm, b1, b2, preset, name=None).
+# Modules with other deformers add theirs with register_builder().
+MUSCLE_BUILDERS = {'MESH': build_muscle}
+
+def register_builder(mode, builder):
+    if builder is None:
+        MUSCLE_BUILDERS.pop(mode, None)
+    else:
+        MUSCLE_BUILDERS[mode] = builder
+
+def commit_muscle(context, arm, b1, b2, preset, plan, name=None):
+    """Create the muscle object and its rig from a plan_muscle() result (main thread)"""
+    p1 = arm.matrix_world @ b1.head
+    p2 = arm.matrix_world @ b2.head
+    direction = p2 - p1
+    mid = p1 + direction * 0.5
+    pr = PRESETS[preset]
+
+    mesh = bpy.data.meshes.new("MuscleMesh")
+    mesh.from_pydata(plan["co"], plan["edges"], plan["faces"])
+    mesh.update()
+
+    muscle = bpy.data.objects.new(name or f"Muscle_{preset}", mesh)
+    muscle["Muscle_Preset"] = preset
+    link_to_system(context, muscle, arm, "muscles")
+    muscle.location = mid
+    muscle.rotation_quaternion = direction.to_track_quat('Z', 'Y')
+    muscle.parent = arm
+
+    # Apply preset properties (size last: it resets the volume scale)
+    muscle.Muscle_Type_INT = pr["type"] == "EXTENSOR"
+    muscle.Base_Length_INT = pr["length"]
+    muscle.Volume_INT = pr["bulge"]
+    muscle.Muscle_Size = 0.6
+
+    rig_muscle(context, muscle, arm, b1.name, b2.name, plan["weights"], plan["bulge"])
+    muscle.Muscle_Activation = preset
+    return muscle
+
+def rig_muscle(context, muscle, arm, origin, insertion, weights, bulge_co):
+    """Groups, hooks, Bulge key + driver and modifier stack on an existing mesh.
+
+    Shared by muscle creation and mesh conversion; origin and insertion are
+    bone names of arm, weights as returned by muscle_weights().
+    """
+    muscle["Muscle_XID"] = True
+
+    # Jiggle, origin and insertion groups
+    for group, w in weights.items():
+        write_group_weights(muscle.vertex_groups.new(name=group), w, replace=False)
+
+    # Hook modifiers for attachment
+    hook_origin = muscle.modifiers.new("Hook_Origin", 'HOOK')
+    hook_origin.object = arm
+    hook_origin.subtarget = origin
+    hook_origin.vertex_group = "origin"
+
+    hook_insertion = muscle.modifiers.new("Hook_Insertion", 'HOOK')
+    hook_insertion.object = arm
+    hook_insertion.subtarget = insertion
+    hook_insertion.vertex_group = "insertion"
+    # Bind at the current pose so hooked vertices stay where they are
+    mw = world_matrix(muscle)
+    for hook in (hook_origin, hook_insertion):
+        hook.matrix_inverse = (world_matrix(arm) @ arm.pose.bones[hook.subtarget].matrix).inverted() @ mw
+
+    # Bulge key + driver
+    if not muscle.data.shape_keys:
+        muscle.shape_key_add(name="Basis")
+    bulge = muscle.shape_key_add(name="Bulge")
+    bulge.data.foreach_set("co", np.asarray(bulge_co, dtype=np.float32).ravel())
+
+    drv = bulge.driver_add("value").driver
+    drv.type = 'SCRIPTED'
+    var = drv.variables.new()
+    var.name = "a"
+    var.type = 'ROTATION_DIFF'
+    var.targets[0].id = arm
+    var.targets[0].bone_target = origin
+    var.targets[1].id = arm
+    var.targets[1].bone_target = insertion
+    drv.expression = bulge_expression(muscle, drv)
+
+    # Dynamics follow the hooked, bulged shape (stack order: see modifier_stack.py)
+    sb = muscle.modifiers.new("Jiggle", 'SOFT_BODY')
+    s = sb.settings
+    s.mass = 0.3
+    s.use_goal = True
+    s.goal_vertex_group = NAMES["vertexGroupName"]
+    s.goal_default = 1.0  # High for unpinned
+    s.goal_min = 0.0
+    s.goal_max = 1.0
+    s.pull = s.push = 0.99
+    s.bend = 0.8
+    s.use_self_collision = context.scene.Muscle_Self_Collision
+
+    # Additional modifiers for volume preservation and skin
+    corrective = muscle.modifiers.new("Corrective", 'CORRECTIVE_SMOOTH')
+    corrective.iterations = 10
+    corrective.smooth_type = 'LENGTH_WEIGHTED'
+
+    # Shrinkwrap only when there is a skin to wrap to; a targetless one still evaluates
+    skin = context.scene.Muscle_Skin
+    if skin:
+        shrinkwrap = muscle.modifiers.new("Shrinkwrap", 'SHRINKWRAP')
+        shrinkwrap.target = skin
+
+    register_muscle(context.scene, muscle, arm)
+    return muscle
+
+
+
+# ===================================================================
+# CONVERSION (any mesh -> fully rigged muscle)
+# ===================================================================
+def bone_segments(arm):
+    """World heads, tails, names and hierarchy depths of arm's deform bones"""
+    bones = [pb for pb in arm.pose.bones if pb.bone.use_deform] or list(arm.pose.bones)
+    mw = world_matrix(arm)
+    heads = np.array([mw @ pb.head for pb in bones], dtype=np.float32).reshape(-1, 3)
+    tails = np.array([mw @ pb.tail for pb in bones], dtype=np.float32).reshape(-1, 3)
+    return {"heads": heads, "tails": tails,
+            "names": [pb.name for pb in bones],
+            "depth": [len(pb.parent_recursive) for pb in bones]}
+
+def nearest_bone(segments, point, exclude=None):
+    """Index of the bone segment closest to point"""
+    h, t = segments["heads"], segments["tails"]
+    ht = t - h
+    f = np.clip(np.einsum('ij,ij->i', point - h, ht) / np.maximum(np.einsum('ij,ij->i', ht, ht), 1e-12), 0.0, 1.0)
+    d = np.linalg.norm(h + ht * f[:, None] - point, axis=1)
+    if exclude is not None and len(d) > 1:
+        d[exclude] = np.inf
+    return int(np.argmin(d))
+
+def convert_to_muscle(context, obj, arm, preset, segments=None):
+    """Rig mesh obj as a muscle of arm, keeping its shape and world transform.
+
+    The principal axis of the vertices gives the two ends; each end hooks to
+    its nearest bone, and the end nearer the root of the hierarchy is the
+    origin. Returns (origin bone, insertion bone).
+    """
+    segments = segments or bone_segments(arm)
+    if obj.data.users > 1:
+        obj.data = obj.data.copy()
+    co = mesh_coords(obj.data)
+    center, axis, proj = principal_axis(co)
+    mw = world_matrix(obj)
+    ends = [center + axis * float(proj.min()), center + axis * float(proj.max())]
+    world_ends = [np.array(mw @ Vector(e), dtype=np.float32) for e in ends]
+
+    i1 = nearest_bone(segments, world_ends[0])
+    i2 = nearest_bone(segments, world_ends[1], exclude=i1)
+    toward = axis
+    if segments["depth"][i2] < segments["depth"][i1]:
+        i1, i2 = i2, i1
+        toward = -axis
+    origin, insertion = segments["names"][i1], segments["names"][i2]
+
+    obj.parent = arm
+    obj.matrix_parent_inverse = world_matrix(arm).inverted()
+    obj.matrix_basis = mw
+    link_to_system(context, obj, arm, "muscles")
+
+    # Preset values without their update callbacks: those rescale the object
+    pr = PRESETS[preset]
+    obj["Muscle_Type_INT"] = pr["type"] == "EXTENSOR"
+    obj["Base_Length_INT"] = pr["length"]
+    obj["Volume_INT"] = pr["bulge"]
+
+    had_modifiers = len(obj.modifiers) > 0
+    bulge_co = center + (co - center) * (1.0 + pr["bulge"])
+    rig_muscle(context, obj, arm, origin, insertion, muscle_weights(co, toward), bulge_co)
+    obj.Muscle_Activation = preset
+    if had_modifiers:
+        order_stack(context, obj)
+    return origin, insertion
+
+
+# ===================================================================
+# MIRRORING (reflect a finished muscle instead of rebuilding it)
+# ===================================================================
+FLIP_X = Matrix.Scale(-1.0, 4, (1.0, 0.0, 0.0))
+
+def _flip_x(coords):
+    coords[0::3] = [-x for x in coords[0::3]]
+    return coords
+
+def twin_name(muscle, origin):
+    """muscle's name flipped, or named after the twin's origin bone when the name has no side"""
+    flipped = bpy.utils.flip_name(muscle.name)
+    return flipped if flipped != muscle.name else f"{muscle.name}_{origin}"
+
+def mirror_muscle(context, muscle, bone_names=None, name=None):
+    """Create the opposite-side twin of muscle by reflecting its geometry.
+
+    Geometry and shape keys are reflected in the muscle's local X, the object
+    is reflected across the armature's YZ plane, and vertex groups carry over
+    unchanged because vertex order is preserved. bone_names maps this side's
+    bone names to the other side's; anything not in it goes through
+    bpy.utils.flip_name.
+    """
+    bone_names = bone_names or {}
+    flip = lambda n: bone_names.get(n) or bpy.utils.flip_name(n)
+
+    mesh = muscle.data.copy()
+    count = len(mesh.vertices)
+    co = [0.0] * (count * 3)
+    mesh.vertices.foreach_get("co", co)
+    mesh.vertices.foreach_set("co", _flip_x(co))
+    if mesh.shape_keys:
+        for kb in mesh.shape_keys.key_blocks:
+            kb.data.foreach_get("co", co)
+            kb.data.foreach_set("co", _flip_x(co))
+    mirror_sparse(mesh)
+    mesh.flip_normals()  # Reflection reverses winding
+    mesh.update()
+
+    twin = muscle.copy()
+    twin.data = mesh
+    twin.name = name or bpy.utils.flip_name(muscle.name)
+    for coll in muscle.users_collection:
+        coll.objects.link(twin)
+    remove_collision(twin)    # its colliders are this side's; Refresh Neighbours rebuilds it
+
+    # Pins and the micro handle came along with copy() but belong to this
+    # side: drop them from the twin, which gets mirrored pins of its own
+    # below (Add Micro Controllers gives it a handle)
+    mw = world_matrix(muscle)
+    pins = pin_objects(muscle)
+    pin_bindings = []
+    for pin in pins:
+        point = mw.inverted() @ pin.matrix_world.translation
+        pin_bindings.append(((-point.x, point.y, point.z), group_weights(muscle, pin.name)))
+    for mod in [m for m in twin.modifiers if m.type == 'HOOK' and (m.object in pins or m.name == "Hook_Micro")]:
+        twin.modifiers.remove(mod)
+    for group in [p.name for p in pins] + [NAMES["microGroupName"]]:
+        if group in twin.vertex_groups:
+            twin.vertex_groups.remove(twin.vertex_groups[group])
+    twin.custom.clear()
+    twin.custom_index = 0
+    if "Micro_Ctrl" in twin:
+        del twin["Micro_Ctrl"]
+    # Object drivers came along with copy() (packed keys, smoothing): point
+    # them at the twin, its key and the other side's bones
+    src_key = muscle.data.shape_keys
+    for fc in twin.animation_data.drivers if twin.animation_data else []:
+        for var in fc.driver.variables:
+            for t in var.targets:
+                if t.id == muscle:
+                    t.id = twin
+                elif src_key and t.id == src_key:
+                    t.id = mesh.shape_keys
+                if t.bone_target:
+                    t.bone_target = flip(t.bone_target)
+
+    # Parent-space reflection keeps a proper (non-negative) rotation
+    pinv = muscle.matrix_parent_inverse
+    twin.matrix_basis = pinv.inverted() @ FLIP_X @ pinv @ muscle.matrix_basis @ FLIP_X
+
+    tw = world_matrix(twin)
+    for mod in twin.modifiers:
+        if mod.type == 'HOOK' and mod.subtarget:
+            mod.subtarget = flip(mod.subtarget)
+            if mod.object and mod.object.type == 'ARMATURE' and mod.subtarget in mod.object.pose.bones:
+                bone = mod.object.pose.bones[mod.subtarget]
+                mod.matrix_inverse = (world_matrix(mod.object) @ bone.matrix).inverted() @ tw
+
+    src_key, dst_key = muscle.data.shape_keys, mesh.shape_keys
+    if src_key and src_key.animation_data:
+        for src_fc in src_key.animation_data.drivers:
+            src, dst = src_fc.driver, dst_key.driver_add(src_fc.data_path).driver
+            dst.type = src.type
+            dst.expression = src.expression
+            while dst.variables:
+                dst.variables.remove(dst.variables[0])
+            for var in src.variables:
+                new_var = dst.variables.new()
+                new_var.name = var.name
+                new_var.type = var.type
+                for i, t in enumerate(var.targets):
+                    nt = new_var.targets[i]
+                    nt.id = t.id
+                    nt.bone_target = flip(t.bone_target) if t.bone_target else ""
+                    nt.transform_type = t.transform_type
+                    nt.transform_space = t.transform_space
+
+    for fc in activation_fcurves(twin):
+        if "c" in fc.driver.variables:
+            fc.driver.variables.remove(fc.driver.variables["c"])
+    update_muscle_activation(twin, context)  # twin shares the profile; its drivers are new
+    if pin_bindings:
+        add_pins(context, twin, pin_bindings)
+    if "Muscle_Key" in muscle:
+        twin["Muscle_Key"] = bpy.utils.flip_name(muscle["Muscle_Key"])
+    twin.Muscle_Mirror = muscle
+    muscle.Muscle_Mirror = twin
+    register_muscle(context.scene, twin)
+    return twin
+
+
+def create_cylinder_mesh(radius, height, segments, rings):
+    """Tapered open cylinder along Z, centred at 0: ((N, 3) float32 coords, edges, faces)"""
+    r = np.arange(rings + 1, dtype=np.float32)
+    ring_radius = radius * (1 - np.abs(2 * r / rings - 1) * 0.5)  # Taper ends
+    angle = 2 * np.pi * np.arange(segments, dtype=np.float32) / segments
+    co = np.empty((rings + 1, segments, 3), dtype=np.float32)
+    co[..., 0] = ring_radius[:, None] * np.cos(angle)
+    co[..., 1] = ring_radius[:, None] * np.sin(angle)
+    co[..., 2] = (height * r / rings - height / 2)[:, None]
+    # Edges and faces, ring r and segment s
+    rr, ss = np.meshgrid(np.arange(rings), np.arange(segments), indexing='ij')
+    i = rr * segments + ss
+    i1 = (ss + 1) % segments + rr * segments
+    i2, i3 = i + segments, i1 + segments
+    edges = np.stack([np.stack([i, i2], -1), np.stack([i, i1], -1)], axis=2).reshape(-1, 2)
+    faces = np.stack([i, i1, i3, i2], -1).reshape(-1, 4)
+    return co.reshape(-1, 3), edges.tolist(), faces.tolist()
+
 
 # ===================================================================
 # OPERATORS
@@ -173,143 +614,38 @@ class MUSCLE_OT_create(bpy.types.Operator):
             self.report({'ERROR'}, "Select 2 pose bones")
             return {'CANCELLED'}
 
-        if is_arp_rig(arm):
-            self.report({'INFO'}, "Auto-Rig Pro detected!")
+        profile = detect_profile(arm, context.scene.Rig_Profile)
+        if profile:
+            self.report({'INFO'}, f"{RIG_PROFILES[profile]['label']} detected!")
 
         b1, b2 = sel_bones
-        p1 = arm.matrix_world @ b1.head
-        p2 = arm.matrix_world @ b2.head
-        direction = p2 - p1
-        length = direction.length
-        mid = p1 + direction * 0.5
-
-        # Use preset parameters
-        pr = PRESETS[self.preset]
-        verts_type = pr["verts"]
-
-        # Verts selection based on type (fallback to all if truncated)
-        if verts_type == "STYLE":
-            idx = STYLE_IDX
-        elif verts_type == "STRIP":
-            idx = STRIP_IDX
-        else:
-            idx = range(len(MUSCLE_VERTS_BASIC))
-        verts = [MUSCLE_VERTS_BASIC[i] for i in idx if i < len(MUSCLE_VERTS_BASIC)]  # Safe for truncation
+        if context.scene.Muscle_Mode == 'BBONE':
+            build_bbone_muscles(context, arm, [(self.preset, b1.name, b2.name, self.preset)])
+            self.report({'INFO'}, f"{self.preset} bendy muscle created!")
+            return {'FINISHED'}
+
+        builder = MUSCLE_BUILDERS.get(context.scene.Muscle_Mode, build_muscle)
+        muscle = builder(context, arm, b1, b2, self.preset)
+
+        if context.scene.Muscle_Mirror_Mode:
+            flipped = [bpy.utils.flip_name(b.name) for b in sel_bones]
+            if flipped != [b1.name, b2.name] and all(n in arm.pose.bones for n in flipped):
+                # "Muscle_<preset>" has no side to flip; name the twin after its bones
+                name = twin_name(muscle, flipped[0])
+                if builder is build_muscle:
+                    mirror_muscle(context, muscle, name=name)
+                else:
+                    # Other deformers are cheap to build; their drivers live on the object
+                    twin = builder(context, arm, arm.pose.bones[flipped[0]], arm.pose.bones[flipped[1]],
+                                   self.preset, name)
+                    twin.Muscle_Mirror = muscle
+                    muscle.Muscle_Mirror = twin
+            else:
+                self.report({'WARNING'}, "No opposite-side bones — mirror skipped")
 
-        # If verts are few/incomplete, use fallback cylinder mesh
-        if len(verts) < 10:  # Arbitrary threshold for truncation check
-            verts, edges, faces = self.create_cylinder_mesh(0.5, length, 16, 10)
-        else:
-            edges = []  # Assume no edges if using point data; add remesh if needed
-            faces = []
-
-        mesh = bpy.data.meshes.new("MuscleMesh")
-        mesh.from_pydata(verts, edges, faces)
-        mesh.update()
-
-        muscle = bpy.data.objects.new(f"Muscle_{self.preset}", mesh)
-        context.collection.objects.link(muscle)
-        muscle.location = mid
-        muscle.rotation_quaternion = direction.to_track_quat('Z', 'Y')
-        muscle.parent = arm
-        muscle["Muscle_XID"] = True
-
-        # Apply preset properties
-        muscle.Muscle_Type_INT = pr["type"] == "EXTENSOR"
-        muscle.Base_Length_INT = pr["length"]
-        muscle.Volume_INT = pr["bulge"]
-
-        # Jiggle group (low weight for middle jiggle)
-        vg = muscle.vertex_groups.new(name=NAMES["vertexGroupName"])
-        jiggle_verts = [i for i in JIGGLE_IDX if i < len(muscle.data.vertices)]
-        vg.add(jiggle_verts, 0.2, 'REPLACE')  # Low goal for jiggle
-
-        # Soft Body
-        sb = muscle.modifiers.new("Jiggle", 'SOFT_BODY')
-        s = sb.settings
-        s.mass = 0.3
-        s.use_goal = True
-        s.goal_vertex_group = NAMES["vertexGroupName"]
-        s.goal_default = 1.0  # High for unpinned
-        s.goal_min = 0.0
-        s.goal_max = 1.0
-        s.pull = s.push = 0.99
-        s.bend = 0.8
-        s.use_self_collision = True
-
-        # Hook modifiers for attachment
-        vg_origin = muscle.vertex_groups.new(name="origin")
-        origin_verts = PIN_IDX if len(PIN_IDX) < len(muscle.data.vertices) else range(0, len(muscle.data.vertices)//10)  # Ends
-        vg_origin.add(origin_verts, 1.0, 'REPLACE')
-
-        vg_insertion = muscle.vertex_groups.new(name="insertion")
-        insertion_verts = [len(muscle.data.vertices) - i - 1 for i in origin_verts]
-        vg_insertion.add(insertion_verts, 1.0, 'REPLACE')
-
-        hook_origin = muscle.modifiers.new("Hook_Origin", 'HOOK')
-        hook_origin.object = arm
-        hook_origin.subtarget = b1.name
-        hook_origin.vertex_group = "origin"
-
-        hook_insertion = muscle.modifiers.new("Hook_Insertion", 'HOOK')
-        hook_insertion.object = arm
-        hook_insertion.subtarget = b2.name
-        hook_insertion.vertex_group = "insertion"
-
-        # Bulge key + driver
-        basis = muscle.shape_key_add(name="Basis")
-        bulge = muscle.shape_key_add(name="Bulge")
-        bulge_scale = 1.0 + pr["bulge"]
-        for i, v in enumerate(muscle.data.vertices):
-            bulge.data[i].co = v.co * bulge_scale  # Simple scale; add volume preservation later
-
-        drv = bulge.driver_add("value").driver
-        drv.type = 'SCRIPTED'
-        var = drv.variables.new()
-        var.name = "a"
-        var.type = 'ROTATION_DIFF'
-        var.targets[0].id = arm
-        var.targets[0].bone_target = b1.name
-        var.targets[1].id = arm
-        var.targets[1].bone_target = b2.name
-        drv.expression = "max(a,0)" if not muscle.Muscle_Type_INT else "max(-a,0)"
-
-        # Additional modifiers for volume preservation and skin
-        corrective = muscle.modifiers.new("Corrective", 'CORRECTIVE_SMOOTH')
-        corrective.iterations = 10
-        corrective.smooth_type = 'LENGTH_WEIGHTED'
-
-        shrinkwrap = muscle.modifiers.new("Shrinkwrap", 'SHRINKWRAP')  # Assume skin mesh is selected later
-        shrinkwrap.target = None  # Set manually
-
-        muscle.Muscle_Size = 0.6
         self.report({'INFO'}, f"{self.preset} created!")
         return {'FINISHED'}
 
-    def create_cylinder_mesh(self, radius, height, segments, rings):
-        verts = []
-        edges = []
-        faces = []
-        for r in range(rings + 1):
-            z = height * (r / rings) - height / 2  # Center at 0
-            current_radius = radius * (1 - abs(2 * r / rings - 1) * 0.5)  # Taper ends
-            for s in range(segments):
-                angle = 2 * pi * s / segments
-                x = current_radius * cos(angle)
-                y = current_radius * sin(angle)
-                verts.append(Vector((x, y, z)))
-        # Edges and faces
-        for r in range(rings):
-            for s in range(segments):
-                i = r * segments + s
-                edges.append((i, i + segments))
-                edges.append((i, (i + 1) % segments + r * segments))
-                i1 = (i + 1) % segments + r * segments
-                i2 = i + segments
-                i3 = i1 + segments
-                faces.append((i, i1, i3, i2))
-        return verts, edges, faces
-
 
 class MUSCLE_OT_add_basic(bpy.types.Operator):
     bl_idname = "muscle.add_basic"
@@ -336,14 +672,32 @@ class MUSCLE_OT_add_strip(bpy.types.Operator):
 
 
 class MUSCLE_OT_convert(bpy.types.Operator):
+    """Turn the selected meshes into fully rigged muscles of the active (or parent) armature"""
     bl_idname = "muscle.convert"
     bl_label = "Convert to Muscle"
+    bl_options = {'REGISTER', 'UNDO'}
+    preset: bpy.props.EnumProperty(items=[(k,k,"") for k in PRESETS], default="Biceps")
+
     def execute(self, context):
-        obj = context.active_object
-        if obj.type == 'MESH':
-            obj["Muscle_XID"] = True
-            obj.modifiers.new("Jiggle", 'SOFT_BODY')
-            self.report({'INFO'}, "Converted!")
+        active = context.active_object
+        meshes = [o for o in context.selected_objects if o.type == 'MESH' and "Muscle_XID" not in o]
+        segments = {}
+        converted = skipped = 0
+        for obj in meshes:
+            arm = active if active and active.type == 'ARMATURE' else obj.parent
+            if not arm or arm.type != 'ARMATURE' or len(arm.pose.bones) < 2:
+                skipped += 1
+                continue
+            # Bone segments are gathered once per armature for the whole batch
+            if arm.name not in segments:
+                segments[arm.name] = bone_segments(arm)
+            convert_to_muscle(context, obj, arm, self.preset, segments[arm.name])
+            converted += 1
+        if not converted:
+            self.report({'ERROR'}, "Select meshes and an armature (active) to convert")
+            return {'CANCELLED'}
+        self.report({'WARNING'} if skipped else {'INFO'},
+                    f"Converted {converted} meshes" + (f", {skipped} without an armature" if skipped else ""))
         return {'FINISHED'}
 
 
@@ -354,17 +708,31 @@ class MUSCLE_OT_pin_action(bpy.types.Operator):
     def execute(self, context):
         obj = context.object
         if self.action == 'ADD':
-            item = obj.custom.add()
-            item.name = f"Pin_{len(obj.custom):03d}"
-            empty = bpy.data.objects.new(item.name, None)
-            empty.empty_display_type = 'PLAIN_AXES'
-            empty.empty_display_size = obj.Pin_Size
-            context.collection.objects.link(empty)
-            empty.parent = obj
+            # Single pin at the belly; muscle.pin_add_bulk places many at once
+            add_pins(context, obj, bindings_along_axis(mesh_coords(obj.data), 1))
         else:
             if obj.custom_index < len(obj.custom):
-                bpy.data.objects.remove(bpy.data.objects[obj.custom[obj.custom_index].name])
-                obj.custom.remove(obj.custom_index)
+                remove_pin(obj, obj.custom_index)
+        return {'FINISHED'}
+
+
+class MUSCLE_OT_mirror(bpy.types.Operator):
+    bl_idname = "muscle.mirror"
+    bl_label = "Mirror Muscle"
+    bl_description = "Create the opposite-side muscle by reflecting this one and link the pair"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return obj and "Muscle_XID" in obj and obj.Muscle_Mirror is None
+
+    def execute(self, context):
+        muscle = context.object
+        _, origin, _ = hook_bones(muscle)
+        name = twin_name(muscle, bpy.utils.flip_name(origin)) if origin else None
+        twin = mirror_muscle(context, muscle, name=name)
+        self.report({'INFO'}, f"Mirrored to {twin.name}")
         return {'FINISHED'}
 
 
@@ -392,12 +760,34 @@ class MUSCLE_OT_smart_update(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class MUSCLE_OT_reweight(bpy.types.Operator):
+    """Recompute jiggle, origin and insertion weights of the selected muscles from their shape"""
+    bl_idname = "muscle.reweight"
+    bl_label = "Recompute Muscle Weights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        muscles = [o for o in context.selected_objects if "Muscle_XID" in o and o.type == 'MESH']
+        for muscle in muscles:
+            weights = muscle_weights(mesh_coords(muscle.data), axis=hook_axis(muscle))
+            for group, w in weights.items():
+                vg = muscle.vertex_groups.get(group) or muscle.vertex_groups.new(name=group)
+                write_group_weights(vg, w)
+            micro = muscle.vertex_groups.get(NAMES["microGroupName"])
+            if micro:
+                write_group_weights(micro, belly_weights(weights[NAMES["vertexGroupName"]]))
+        self.report({'INFO'}, f"Reweighted {len(muscles)} muscles")
+        return {'FINISHED'}
+
+
 class MUSCLE_OT_delete(bpy.types.Operator):
     bl_idname = "muscle.delete"
     bl_label = "Delete Muscle"
     def execute(self, context):
         obj = context.object
         if obj:
+            clear_pins(obj)
+            unregister_muscle(context.scene, obj)
             bpy.data.objects.remove(obj)
             self.report({'INFO'}, "Muscle deleted!")
         return {'FINISHED'}
@@ -425,7 +815,9 @@ classes = (
     MUSCLE_OT_add_strip,
     MUSCLE_OT_convert,
     MUSCLE_OT_pin_action,
+    MUSCLE_OT_mirror,
     MUSCLE_OT_smart_update,
+    MUSCLE_OT_reweight,
     MUSCLE_OT_delete,
 )
 
@@ -0,0 +1,122 @@
+# system_collections.py — Muscle System Collections
+# BlendArmory Muscles 3.3 — One collection flag instead of n object writes
+
+import bpy
+from .data import NAMES
+from .registry import all_muscles
+
+# ===================================================================
+# PROPERTY GROUP (stored on the armature)
+# ===================================================================
+class MuscleSystemCollections(bpy.types.PropertyGroup):
+    root: bpy.props.PointerProperty(type=bpy.types.Collection)
+    muscles: bpy.props.PointerProperty(type=bpy.types.Collection)
+    pins: bpy.props.PointerProperty(type=bpy.types.Collection)
+    controllers: bpy.props.PointerProperty(type=bpy.types.Collection)
+
+KINDS = {
+    "muscles": "Muscles",
+    "pins": "Pins",
+    "controllers": "Controllers",
+}
+
+# ===================================================================
+# LOOKUP / CREATE
+# ===================================================================
+def system_collection(context, arm, kind):
+    """The arm's muscle system child collection for kind, created on demand"""
+    colls = arm.Muscle_Collections
+    coll = getattr(colls, kind)
+    if coll is not None:
+        return coll
+
+    root = colls.root
+    if root is None:
+        root = bpy.data.collections.new(arm.name + NAMES["musculatureName"])
+        parent = arm.users_collection[0] if arm.users_collection else context.scene.collection
+        parent.children.link(root)
+        colls.root = root
+    coll = bpy.data.collections.new(f"{arm.name} {KINDS[kind]}")
+    root.children.link(coll)
+    setattr(colls, kind, coll)
+    return coll
+
+def link_to_system(context, obj, arm, kind):
+    """Link obj into the system collection only (unlinking it elsewhere).
+    Returns True if any link changed."""
+    if arm is None or arm.type != 'ARMATURE':
+        if not obj.users_collection:
+            context.collection.objects.link(obj)
+            return True
+        return False
+    coll = system_collection(context, arm, kind)
+    changed = coll not in obj.users_collection
+    if changed:
+        coll.objects.link(obj)
+    for other in obj.users_collection:
+        if other != coll:
+            other.objects.unlink(obj)
+            changed = True
+    return changed
+
+def find_layer_collection(layer_coll, coll):
+    if layer_coll.collection == coll:
+        return layer_coll
+    for child in layer_coll.children:
+        found = find_layer_collection(child, coll)
+        if found:
+            return found
+    return None
+
+def system_armature(obj):
+    """The armature owning obj's muscle system (obj itself if an armature)"""
+    if obj is None:
+        return None
+    if obj.type == 'ARMATURE' and obj.Muscle_Collections.root:
+        return obj
+    parent = obj.parent
+    while parent:
+        if parent.type == 'ARMATURE' and parent.Muscle_Collections.root:
+            return parent
+        parent = parent.parent
+    return None
+
+# ===================================================================
+# OPERATORS
+# ===================================================================
+class MUSCLE_OT_organize(bpy.types.Operator):
+    """Move every muscle, pin and controller into its armature's system collections"""
+    bl_idname = "muscle.organize"
+    bl_label = "Organize Muscle Systems"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        moved = 0
+        for muscle in all_muscles(context.scene):
+            arm = muscle.parent if muscle.parent and muscle.parent.type == 'ARMATURE' else None
+            if arm is None:
+                continue
+            moved += link_to_system(context, muscle, arm, "muscles")
+            for item in muscle.custom:
+                if item.pin:
+                    moved += link_to_system(context, item.pin, arm, "pins")
+            ctrl = bpy.data.objects.get(f"{arm.name}_{NAMES['micro_SysName']}")
+            if ctrl:
+                moved += link_to_system(context, ctrl, arm, "controllers")
+        self.report({'INFO'}, f"Organized {moved} objects")
+        return {'FINISHED'}
+
+# ===================================================================
+# REGISTER
+# ===================================================================
+classes = (MuscleSystemCollections, MUSCLE_OT_organize)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Object.Muscle_Collections = bpy.props.PointerProperty(type=MuscleSystemCollections)
+
+def unregister():
+    del bpy.types.Object.Muscle_Collections
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)